@@ -0,0 +1,46 @@
+"""add_user_balances
+
+Revision ID: 007_add_user_balances
+Revises: 006_add_alerts
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007_add_user_balances'
+down_revision = '006_add_alerts'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create user_balances ledger table
+    op.create_table(
+        'user_balances',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('total_income', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('total_expense', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Backfill totals from existing savings rows
+    op.execute(
+        """
+        INSERT INTO user_balances (user_id, total_income, total_expense, updated_at)
+        SELECT user_id,
+               COALESCE(SUM(CASE WHEN type = 'IN' THEN amount ELSE 0 END), 0),
+               COALESCE(SUM(CASE WHEN type = 'OUT' THEN amount ELSE 0 END), 0),
+               CURRENT_TIMESTAMP
+        FROM savings
+        GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_balances')
@@ -0,0 +1,71 @@
+"""add_savings_monthly_rollup
+
+Revision ID: 008_add_savings_monthly_rollup
+Revises: 007_add_user_balances
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008_add_savings_monthly_rollup'
+down_revision = '007_add_user_balances'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create monthly rollup table
+    op.create_table(
+        'savings_monthly_rollup',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=False),
+        sa.Column('income', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('expense', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('tx_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'year', 'month')
+    )
+
+    # Backfill from existing savings rows (portable across PostgreSQL and SQLite).
+    # For very large tables run `python -m app.db.backfill_monthly_rollup` instead.
+    savings = sa.table(
+        'savings',
+        sa.column('id', sa.Integer),
+        sa.column('user_id', sa.Integer),
+        sa.column('date', sa.Date),
+        sa.column('type', sa.String),
+        sa.column('amount', sa.Float),
+    )
+    rollup = sa.table(
+        'savings_monthly_rollup',
+        sa.column('user_id', sa.Integer),
+        sa.column('year', sa.Integer),
+        sa.column('month', sa.Integer),
+        sa.column('income', sa.Float),
+        sa.column('expense', sa.Float),
+        sa.column('tx_count', sa.Integer),
+    )
+    year = sa.cast(sa.extract('year', savings.c.date), sa.Integer)
+    month = sa.cast(sa.extract('month', savings.c.date), sa.Integer)
+    grouped = sa.select(
+        savings.c.user_id,
+        year,
+        month,
+        sa.func.coalesce(sa.func.sum(sa.case((savings.c.type == 'IN', savings.c.amount), else_=0.0)), 0.0),
+        sa.func.coalesce(sa.func.sum(sa.case((savings.c.type == 'OUT', savings.c.amount), else_=0.0)), 0.0),
+        sa.func.count(savings.c.id),
+    ).group_by(savings.c.user_id, year, month)
+    op.execute(
+        rollup.insert().from_select(
+            ['user_id', 'year', 'month', 'income', 'expense', 'tx_count'],
+            grouped
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('savings_monthly_rollup')
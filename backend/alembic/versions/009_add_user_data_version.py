@@ -0,0 +1,25 @@
+"""Add user data_version counter
+
+Revision ID: 009_add_user_data_version
+Revises: 008_add_savings_monthly_rollup
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009_add_user_data_version'
+down_revision = '008_add_savings_monthly_rollup'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Counter bumped by every write to a user's data, used as response cache key
+    op.add_column('users', sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    op.drop_column('users', 'data_version')
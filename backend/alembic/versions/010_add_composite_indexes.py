@@ -0,0 +1,59 @@
+"""add_composite_indexes
+
+Revision ID: 010_add_composite_indexes
+Revises: 009_add_user_data_version
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '010_add_composite_indexes'
+down_revision = '009_add_user_data_version'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, postgresql INCLUDE columns) - keep in sync with model __table_args__
+INDEXES = [
+    ('ix_savings_user_id_date', 'savings', ['user_id', 'date', 'id'], ['type', 'amount']),
+    ('ix_loans_user_id_status', 'loans', ['user_id', 'status'], None),
+    ('ix_loans_user_id_start_date', 'loans', ['user_id', 'start_date', 'id'], None),
+    ('ix_alerts_user_id_is_read_created_at', 'alerts', ['user_id', 'is_read', 'created_at'], None),
+    ('ix_alerts_user_id_created_at', 'alerts', ['user_id', 'created_at', 'id'], None),
+    ('ix_bank_accounts_user_id_is_active_is_primary', 'bank_accounts', ['user_id', 'is_active', 'is_primary'], None),
+    ('ix_targets_user_id_deadline', 'targets', ['user_id', 'deadline'], None),
+    ('ix_users_created_at', 'users', ['created_at', 'id'], None),
+]
+
+# Single-column user_id indexes now covered by the leftmost column of a composite
+REDUNDANT_INDEXES = [
+    ('ix_savings_user_id', 'savings'),
+    ('ix_loans_user_id', 'loans'),
+    ('ix_targets_user_id', 'targets'),
+    ('ix_alerts_user_id', 'alerts'),
+    ('ix_bank_accounts_user_id', 'bank_accounts'),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps the tables writable while Postgres builds the indexes;
+    # it cannot run inside a transaction, hence the autocommit block
+    with op.get_context().autocommit_block():
+        for name, table, columns, include in INDEXES:
+            op.create_index(
+                name, table, columns,
+                unique=False,
+                postgresql_include=include or [],
+                postgresql_concurrently=True
+            )
+        for name, table in REDUNDANT_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table in REDUNDANT_INDEXES:
+            op.create_index(name, table, ['user_id'], unique=False, postgresql_concurrently=True)
+        for name, table, columns, include in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,35 @@
+"""Add per-user read state for fan-out-on-read broadcasts
+
+Revision ID: 012_add_broadcast_read_state
+Revises: 011_add_jobs_and_outbox
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '012_add_broadcast_read_state'
+down_revision = '011_add_jobs_and_outbox'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Broadcast alerts (user_id NULL) with id <= this are read for the user
+    op.add_column('users', sa.Column('broadcast_read_id', sa.Integer(), nullable=False, server_default='0'))
+    op.create_table(
+        'broadcast_receipts',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('alert_id', sa.Integer(), nullable=False),
+        sa.Column('read_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['alert_id'], ['alerts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'alert_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('broadcast_receipts')
+    op.drop_column('users', 'broadcast_read_id')
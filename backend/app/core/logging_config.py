@@ -1,16 +1,37 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
 from datetime import datetime
-from typing import Any
+from typing import Dict, Optional
 import json
 
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encoding
+    orjson = None
+
+# Extra fields passed by callers that are copied into the JSON line
+LOG_EXTRA_FIELDS = ("user_id", "request_id", "method", "path", "status_code", "client", "duration_ms")
+
+
+def _json_dumps(data: dict) -> str:
+    if orjson is not None and settings.LOG_USE_ORJSON:
+        return orjson.dumps(data, default=str).decode("utf-8")
+    return json.dumps(data, default=str)
+
 
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging"""
 
     def format(self, record: logging.LogRecord) -> str:
         log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
+            # Time of the log call, not of formatting (which happens later on the listener thread)
+            "timestamp": datetime.utcfromtimestamp(record.created).isoformat(),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -21,30 +42,113 @@ class JSONFormatter(logging.Formatter):
 
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_data["exception"] = record.exc_text
+
+        for field in LOG_EXTRA_FIELDS:
+            if hasattr(record, field):
+                log_data[field] = getattr(record, field)
+
+        return _json_dumps(log_data)
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """Parse "/health=0.01,/metrics=0.1" into {path: fraction of records kept}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        path, _, rate = item.partition("=")
+        rates[path.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of INFO/DEBUG records for the given request paths
+
+    Deterministic (every n-th record per path) so a rate of 0.01 logs exactly
+    one request in a hundred; warnings and errors are always kept.
+    """
 
-        if hasattr(record, "user_id"):
-            log_data["user_id"] = record.user_id
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
 
-        if hasattr(record, "request_id"):
-            log_data["request_id"] = record.request_id
+    def filter(self, record: logging.LogRecord) -> bool:
+        path = getattr(record, "path", None)
+        rate = self.rates.get(path) if path is not None else None
+        if rate is None or record.levelno >= logging.WARNING:
+            return True
+        if rate <= 0:
+            return False
+        with self._lock:
+            seen = self._counters.get(path, 0)
+            self._counters[path] = seen + 1
+        return seen % round(1 / rate) == 0
 
-        if hasattr(record, "duration_ms"):
-            log_data["duration_ms"] = record.duration_ms
 
-        return json.dumps(log_data)
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hand records to the listener thread without formatting them here
+
+    The queue is in-process, so records are passed as they are (the stock
+    prepare() formats on the caller's thread). If the queue is full the record
+    is dropped and counted rather than blocking the request.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message now, while its arguments still hold their values
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def flush_logging() -> None:
+    """Write out every queued record (restarts the listener thread)"""
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
+
+
+def _stop_listener() -> None:
+    if _listener is not None:
+        _listener.stop()
 
 
 def setup_logging():
-    """Configure application-wide logging"""
+    """Configure application-wide logging; safe to call more than once"""
+    global _listener
     logger = logging.getLogger("app")
+    if _listener is not None:
+        return logger
     logger.setLevel(logging.INFO)
 
-    # Console handler with JSON formatter
+    # Console handler with JSON formatter, run by a background listener thread
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(JSONFormatter())
 
-    logger.addHandler(console_handler)
+    queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    queue_handler.addFilter(SamplingFilter(parse_sample_rates(settings.LOG_SAMPLE_RATES)))
+    logger.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, console_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_stop_listener)
 
     # Suppress noisy loggers
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
@@ -54,4 +158,3 @@ def setup_logging():
 
 
 app_logger = setup_logging()
-
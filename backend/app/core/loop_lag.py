@@ -0,0 +1,82 @@
+"""
+Event loop lag detector (debug aid)
+
+A watchdog thread pings the event loop every threshold. When a ping is not
+answered within the threshold, something is running on the loop without
+yielding - typically a blocking call in an async def handler. The loop
+thread's stack is captured at that moment and logged together with the
+total time the loop was blocked, pointing straight at the offending code.
+
+Enable with LOOP_LAG_MONITOR_ENABLED=true (see LOOP_LAG_THRESHOLD_MS).
+"""
+import asyncio
+import os
+import sys
+import threading
+import traceback
+from time import monotonic
+from typing import List, Optional
+
+from app.core.logging_config import app_logger
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _blocking_location(stack: List[traceback.FrameSummary]) -> str:
+    """Innermost frame in our own code, else the innermost frame"""
+    for frame in reversed(stack):
+        if frame.filename.startswith(_BACKEND_DIR) and frame.filename != __file__:
+            return f"{os.path.relpath(frame.filename, _BACKEND_DIR)}:{frame.lineno} in {frame.name}"
+    if stack:
+        return f"{stack[-1].filename}:{stack[-1].lineno} in {stack[-1].name}"
+    return "unknown"
+
+
+class LoopLagMonitor:
+    """Log a warning with a stack trace whenever the event loop is blocked longer than threshold_ms"""
+
+    def __init__(self, threshold_ms: float = 100.0):
+        self.threshold = threshold_ms / 1000
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """Start watching the running loop; call from the loop thread"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="loop-lag-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.threshold * 2 + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            answered = threading.Event()
+            sent_at = monotonic()
+            try:
+                self._loop.call_soon_threadsafe(answered.set)
+            except RuntimeError:
+                return  # loop closed
+            if not answered.wait(self.threshold):
+                # Capture the stack while the loop is still stuck in the blocking code
+                frame = sys._current_frames().get(self._loop_thread_id)
+                stack = traceback.extract_stack(frame) if frame is not None else []
+                while not answered.wait(self.threshold):
+                    if self._stopped.is_set():
+                        return
+                self._report((monotonic() - sent_at) * 1000, stack)
+            self._stopped.wait(self.threshold)
+
+    def _report(self, lag_ms: float, stack: List[traceback.FrameSummary]) -> None:
+        app_logger.warning(
+            f"Event loop blocked for {lag_ms:.0f} ms at {_blocking_location(stack)}\n"
+            + "".join(traceback.format_list(stack)),
+            extra={"duration_ms": round(lag_ms, 2)}
+        )
@@ -0,0 +1,107 @@
+"""
+Maintenance mode state shared by all workers
+
+The flag lives in MAINTENANCE_FILE (present and non-empty = on, its content is
+the message) so every uvicorn worker and the admin API agree on it. Each
+process keeps the current value in memory; a background thread stats the file
+every MAINTENANCE_POLL_SECONDS and rereads it only when its mtime, size or
+inode changed, so requests never touch the filesystem.
+"""
+import os
+import tempfile
+import threading
+from typing import Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging_config import app_logger
+
+DEFAULT_MESSAGE = "System is under maintenance. Please try again later."
+
+
+class MaintenanceState:
+    """In-memory maintenance flag kept in sync with a file"""
+
+    def __init__(self, path: str, poll_seconds: float = 0.5):
+        self.path = path
+        self.poll_seconds = poll_seconds
+        # (is_maintenance, message), replaced as a whole so readers need no lock
+        self._status: Tuple[bool, str] = (False, "")
+        self._signature = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refresh()
+
+    def status(self) -> Tuple[bool, str]:
+        """(is_maintenance, message) from memory"""
+        return self._status
+
+    def refresh(self) -> bool:
+        """Reread the file if it changed since the last check; returns whether it did"""
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+                signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            except FileNotFoundError:
+                signature = None
+            if signature == self._signature:
+                return False
+
+            content = ""
+            if signature is not None:
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        content = f.read().strip()
+                except FileNotFoundError:
+                    signature = None
+            self._signature = signature
+            self._status = (bool(content), content)
+            return True
+
+    def set(self, enabled: bool, message: Optional[str] = None) -> Tuple[bool, str]:
+        """Turn maintenance on or off for every worker"""
+        if enabled:
+            # Write then rename, so pollers never read a half-written file
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".maintenance-")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(message or DEFAULT_MESSAGE)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+        else:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+        self.refresh()
+        return self.status()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                if self.refresh():
+                    app_logger.info(f"Maintenance mode {'enabled' if self._status[0] else 'disabled'}")
+            except Exception as e:
+                app_logger.error(f"Maintenance file check failed: {str(e)}", exc_info=True)
+
+    def start(self) -> None:
+        """Start polling the file in a daemon thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="maintenance-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+
+maintenance = MaintenanceState(settings.MAINTENANCE_FILE, settings.MAINTENANCE_POLL_SECONDS)
@@ -0,0 +1,18 @@
+"""
+Bounded executor for bcrypt work
+
+Hashing and verifying passwords is deliberately slow CPU work. All password
+work goes through this pool: PASSWORD_HASH_WORKERS threads (bcrypt releases
+the GIL) or processes, with at most PASSWORD_HASH_MAX_QUEUE calls waiting, so
+a burst of logins gets 503s instead of stalling unrelated requests.
+"""
+from app.core.bounded_pool import BoundedPool
+from app.core.config import settings
+
+password_pool = BoundedPool(
+    settings.PASSWORD_HASH_POOL,
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_MAX_QUEUE,
+    busy_detail="Too many sign-in requests. Please try again shortly.",
+    name="password"
+)
@@ -0,0 +1,82 @@
+"""
+Rebuild savings_monthly_rollup from raw savings rows in batches
+Setiap batch memproses sekelompok user dan di-commit sendiri, jadi aman
+dijalankan ulang dan tidak memuat baris savings ke memori Python.
+
+Usage:
+    cd /var/www/botaxxx/backend
+    source venv/bin/activate
+    python -m app.db.backfill_monthly_rollup                  # all users
+    python -m app.db.backfill_monthly_rollup --batch-size 200
+    python -m app.db.backfill_monthly_rollup --user-id 42     # single user
+"""
+import sys
+import os
+import time
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.services.ledger_service import rebuild_monthly_rollups
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def backfill_monthly_rollup(db: Session, batch_size: int = DEFAULT_BATCH_SIZE, user_id: int = None) -> int:
+    """
+    Rebuild rollups for all users (or one user), batch_size users per transaction
+
+    Returns:
+        Number of users processed
+    """
+    if user_id is not None:
+        rebuild_monthly_rollups(db, user_id, user_id)
+        db.commit()
+        return 1
+
+    processed = 0
+    last_id = 0
+    while True:
+        # Keyset pagination over users.id keeps each batch query cheap
+        ids = [row[0] for row in db.query(User.id).filter(
+            User.id > last_id
+        ).order_by(User.id).limit(batch_size).all()]
+        if not ids:
+            break
+
+        rebuild_monthly_rollups(db, ids[0], ids[-1])
+        db.commit()
+
+        processed += len(ids)
+        last_id = ids[-1]
+        print(f"Processed {processed} users (up to id {last_id})")
+
+    return processed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild savings_monthly_rollup from savings")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Users per transaction")
+    parser.add_argument("--user-id", type=int, default=None, help="Only rebuild this user")
+    args = parser.parse_args(argv)
+
+    db: Session = SessionLocal()
+    try:
+        started = time.time()
+        processed = backfill_monthly_rollup(db, args.batch_size, args.user_id)
+        print(f"Successfully rebuilt monthly rollups for {processed} users in {time.time() - started:.1f}s")
+        return 0
+    except Exception as e:
+        db.rollback()
+        print(f"Error rebuilding monthly rollups: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,6 +13,10 @@ def import_models():
         from app.models.target import Target  # noqa: F401
         from app.models.user_telegram import UserTelegramID  # noqa: F401
         from app.models.bank import Bank, BankAccount  # noqa: F401
+        from app.models.alert import Alert, BroadcastReceipt  # noqa: F401
+        from app.models.user_balance import UserBalance  # noqa: F401
+        from app.models.savings_rollup import SavingsMonthlyRollup  # noqa: F401
+        from app.models.job import Job, JobOutbox  # noqa: F401
     except ImportError as e:
         # Silently fail if models not yet available (during initial setup)
         pass
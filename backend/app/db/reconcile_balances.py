@@ -0,0 +1,145 @@
+"""
+Reconcile the user_balances ledger and savings_monthly_rollup against raw savings rows
+Jalankan setelah migrasi atau edit manual di database
+
+A user whose totals or any month differ is reported; --fix rebuilds both
+their totals and all their monthly rollups.
+
+Usage:
+    cd /var/www/botaxxx/backend
+    source venv/bin/activate
+    python -m app.db.reconcile_balances           # verify only, exit 1 on mismatch
+    python -m app.db.reconcile_balances --fix     # rebuild mismatched rows
+    python -m app.db.reconcile_balances --rebuild # rebuild every row
+"""
+import sys
+import os
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.models.savings import Savings
+from app.models.user_balance import UserBalance
+from app.models.savings_rollup import SavingsMonthlyRollup
+from app.services.ledger_service import rebuild_monthly_rollups, savings_by_month
+
+# Float totals are compared with a tolerance to ignore rounding drift
+TOLERANCE = 0.005
+
+
+def compute_expected_totals(db: Session) -> dict:
+    """Aggregate income/expense for every user in one grouped query"""
+    rows = db.query(
+        Savings.user_id,
+        func.coalesce(func.sum(case((Savings.type == "IN", Savings.amount), else_=0.0)), 0.0),
+        func.coalesce(func.sum(case((Savings.type == "OUT", Savings.amount), else_=0.0)), 0.0)
+    ).group_by(Savings.user_id).all()
+    return {user_id: (float(income), float(expense)) for user_id, income, expense in rows}
+
+
+def _months_by_user(rows) -> dict:
+    months = {}
+    for user_id, year, month, income, expense, count in rows:
+        months.setdefault(user_id, {})[(int(year), int(month))] = (float(income), float(expense), int(count))
+    return months
+
+
+def _months_match(expected: dict, actual: dict) -> bool:
+    # Buckets emptied by deletes stay behind as zero rows
+    for key in set(expected) | set(actual):
+        income, expense, count = expected.get(key, (0.0, 0.0, 0))
+        actual_income, actual_expense, actual_count = actual.get(key, (0.0, 0.0, 0))
+        if (abs(actual_income - income) > TOLERANCE or abs(actual_expense - expense) > TOLERANCE
+                or actual_count != count):
+            return False
+    return True
+
+
+def reconcile_balances(db: Session, fix: bool = False, rebuild: bool = False) -> list:
+    """
+    Compare ledger rows and monthly rollups with raw savings totals
+
+    Returns:
+        List of (user_id, expected, actual, months_match) tuples for mismatched users
+    """
+    expected = compute_expected_totals(db)
+    ledgers = {ledger.user_id: ledger for ledger in db.query(UserBalance).all()}
+    user_ids = [row[0] for row in db.query(User.id).all()]
+    if not user_ids:
+        return []
+    first_id, last_id = min(user_ids), max(user_ids)
+    expected_months = _months_by_user(db.execute(savings_by_month(first_id, last_id)).all())
+    actual_months = _months_by_user(db.query(
+        SavingsMonthlyRollup.user_id, SavingsMonthlyRollup.year, SavingsMonthlyRollup.month,
+        SavingsMonthlyRollup.income, SavingsMonthlyRollup.expense, SavingsMonthlyRollup.tx_count
+    ).all())
+
+    mismatches = []
+    for user_id in user_ids:
+        income, expense = expected.get(user_id, (0.0, 0.0))
+        ledger = ledgers.get(user_id)
+        actual = (ledger.total_income, ledger.total_expense) if ledger else None
+
+        # A missing row is created lazily on first read (rollups included),
+        # so only flag it if it has savings
+        compare = actual if actual is not None else (0.0, 0.0)
+        totals_match = abs(compare[0] - income) <= TOLERANCE and abs(compare[1] - expense) <= TOLERANCE
+        months_match = ledger is None or _months_match(
+            expected_months.get(user_id, {}), actual_months.get(user_id, {})
+        )
+        is_match = totals_match and months_match
+        if not is_match:
+            mismatches.append((user_id, (income, expense), actual, months_match))
+
+        if fix and not rebuild and not is_match:
+            rebuild_monthly_rollups(db, user_id, user_id)
+        if rebuild or (fix and not is_match):
+            if ledger is None:
+                ledger = UserBalance(user_id=user_id)
+                db.add(ledger)
+            ledger.total_income = income
+            ledger.total_expense = expense
+
+    if rebuild:
+        rebuild_monthly_rollups(db, first_id, last_id)
+    if fix or rebuild:
+        db.commit()
+    return mismatches
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Verify or rebuild user_balances and monthly rollups from savings")
+    parser.add_argument("--fix", action="store_true", help="Rebuild rows that do not match")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild all rows")
+    args = parser.parse_args(argv)
+
+    db: Session = SessionLocal()
+    try:
+        mismatches = reconcile_balances(db, fix=args.fix, rebuild=args.rebuild)
+        for user_id, expected, actual, months_match in mismatches:
+            months = "" if months_match else ", monthly rollups differ"
+            print(f"User {user_id}: expected (in={expected[0]}, out={expected[1]}), ledger={actual}{months}")
+
+        if not mismatches:
+            print("All balances match.")
+            return 0
+        if args.fix or args.rebuild:
+            print(f"Fixed {len(mismatches)} balance(s).")
+            return 0
+        print(f"{len(mismatches)} balance(s) do not match. Run with --fix to rebuild them.")
+        return 1
+    except Exception as e:
+        db.rollback()
+        print(f"Error reconciling balances: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
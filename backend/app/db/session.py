@@ -1,6 +1,8 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from app.core.config import settings
 
@@ -15,6 +17,40 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Sync drivers and the async driver used for the same database
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Swap a sync database URL's driver for its async counterpart"""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def create_async_db_engine(url: str):
+    """Create an async engine with the same pooling as the sync one"""
+    if make_url(url).get_backend_name() == "sqlite":
+        return create_async_engine(url, echo=False)
+    return create_async_engine(url, pool_pre_ping=True, pool_size=10, max_overflow=20, echo=False)
+
+
+# Only built when enabled, so the async drivers are not needed otherwise
+async_engine = create_async_db_engine(
+    settings.ASYNC_DATABASE_URL or to_async_url(settings.DATABASE_URL)
+) if settings.DB_ASYNC_ENABLED else None
+
+# Objects stay loaded after commit: an async session cannot lazy-load them
+# again once the route has returned them for serialization
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 
 def get_db() -> Generator[Session, None, None]:
     """Dependency for getting database session"""
@@ -23,3 +59,9 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency for getting an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
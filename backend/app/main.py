@@ -1,26 +1,61 @@
-import time
-from fastapi import FastAPI, Request
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
 
-from app.routers import auth, users, overview, savings, loans, targets, banks, admin
+from app.routers import include_api_routers
 from app.core.config import settings
-from app.core.logging_config import app_logger, setup_logging
-from app.middlewares.rate_limit_middleware import RateLimitMiddleware
+from app.core.logging_config import app_logger
+from app.core.maintenance import maintenance
+from app.core.password_pool import password_pool
+from app.middlewares import LoggingMiddleware, MaintenanceMiddleware, RateLimitMiddleware
+from app.core.loop_lag import LoopLagMonitor
+from app.services.avatar_service import avatar_pool
+from app.services.telegram_service import close_delivery_engine
+from app.settings.oauth_google import close_google_oauth
+from app.worker import JobWorker
 
 # Import base to ensure all models are registered
 from app.db.base import Base  # noqa: F401
 # Models are auto-imported via base.py
 
-# Setup logging
-setup_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background helpers with the app"""
+    monitor = None
+    if settings.LOOP_LAG_MONITOR_ENABLED:
+        monitor = LoopLagMonitor(settings.LOOP_LAG_THRESHOLD_MS)
+        monitor.start()
+        app_logger.info(f"Loop lag monitor enabled (threshold {settings.LOOP_LAG_THRESHOLD_MS} ms)")
+    maintenance.start()
+    worker_stop = asyncio.Event()
+    worker_task = None
+    if settings.JOB_WORKER_IN_PROCESS:
+        worker_task = asyncio.create_task(JobWorker().run(worker_stop))
+    yield
+    if worker_task is not None:
+        worker_stop.set()
+        await worker_task
+    await close_delivery_engine()
+    await close_google_oauth()
+    maintenance.stop()
+    password_pool.shutdown()
+    avatar_pool.shutdown()
+    if monitor is not None:
+        monitor.stop()
+
 
 app = FastAPI(
     title="BOTAXXX API",
     description="Backend API for BOTAXXX Tabungan System",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Maintenance gate (inside CORS so its 503s carry CORS headers)
+app.add_middleware(MaintenanceMiddleware)
+
 # CORS for dashboard
 cors_origins = settings.CORS_ORIGINS.split(",") if settings.CORS_ORIGINS else ["*"]
 app.add_middleware(
@@ -35,65 +70,11 @@ app.add_middleware(
 if settings.RATE_LIMIT_ENABLED:
     app.add_middleware(RateLimitMiddleware)
 
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to log all requests"""
-
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        
-        # Log request
-        app_logger.info(
-            f"Request: {request.method} {request.url.path}",
-            extra={
-                "method": request.method,
-                "path": request.url.path,
-                "client": request.client.host if request.client else "unknown"
-            }
-        )
-
-        try:
-            response = await call_next(request)
-            process_time = time.time() - start_time
-
-            # Log response
-            app_logger.info(
-                f"Response: {request.method} {request.url.path} - {response.status_code}",
-                extra={
-                    "method": request.method,
-                    "path": request.url.path,
-                    "status_code": response.status_code,
-                    "duration_ms": round(process_time * 1000, 2)
-                }
-            )
-
-            response.headers["X-Process-Time"] = str(process_time)
-            return response
-        except Exception as e:
-            process_time = time.time() - start_time
-            app_logger.error(
-                f"Error: {request.method} {request.url.path} - {str(e)}",
-                extra={
-                    "method": request.method,
-                    "path": request.url.path,
-                    "duration_ms": round(process_time * 1000, 2)
-                },
-                exc_info=True
-            )
-            raise
-
-
+# Request logging (outermost, so rate-limited requests are logged too)
 app.add_middleware(LoggingMiddleware)
 
-# API ROUTES
-app.include_router(auth.router, prefix="/auth", tags=["Auth"])
-app.include_router(users.router, prefix="/users", tags=["Users"])
-app.include_router(overview.router, prefix="/overview", tags=["Overview"])
-app.include_router(savings.router, prefix="/savings", tags=["Savings"])
-app.include_router(loans.router, prefix="/loans", tags=["Loans"])
-app.include_router(targets.router, prefix="/targets", tags=["Targets"])
-app.include_router(banks.router, prefix="/banks", tags=["Banks"])
-app.include_router(admin.router, prefix="/admin", tags=["Admin"])
+# API ROUTES (auth, savings, loans, targets and overview run on AsyncSession if DB_ASYNC_ENABLED)
+include_api_routers(app, use_async=settings.DB_ASYNC_ENABLED)
 
 
 @app.get("/")
@@ -127,22 +108,7 @@ def health():
 @app.get("/maintenance")
 def get_maintenance_status():
     """Public endpoint to check maintenance mode status (no auth required)"""
-    import os
-    import pathlib
-    # Use absolute path for maintenance file (same as admin endpoint)
-    project_root = pathlib.Path(__file__).parent.parent.parent
-    maintenance_file = project_root / "maintenance_mode.txt"
-    
-    is_maintenance = False
-    message = ""
-    
-    if maintenance_file.exists():
-        with open(maintenance_file, "r", encoding="utf-8") as f:
-            content = f.read().strip()
-            if content:
-                is_maintenance = True
-                message = content
-    
+    is_maintenance, message = maintenance.status()
     return {
         "is_maintenance": is_maintenance,
         "message": message
@@ -1,4 +1,5 @@
+from app.middlewares.logging_middleware import LoggingMiddleware
+from app.middlewares.maintenance_middleware import MaintenanceMiddleware
 from app.middlewares.rate_limit_middleware import RateLimitMiddleware
 
-__all__ = ["RateLimitMiddleware"]
-
+__all__ = ["LoggingMiddleware", "MaintenanceMiddleware", "RateLimitMiddleware"]
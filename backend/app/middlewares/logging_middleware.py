@@ -0,0 +1,75 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.logging_config import app_logger
+
+
+class LoggingMiddleware:
+    """
+    Middleware to log all requests
+
+    Plain ASGI: the response is passed through untouched (streaming included)
+    apart from the X-Process-Time header added to its start message.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.time()
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
+
+        # Log request
+        app_logger.info(
+            f"Request: {method} {path}",
+            extra={
+                "method": method,
+                "path": path,
+                "client": client[0] if client else "unknown"
+            }
+        )
+
+        response_start = {}
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                process_time = time.time() - start_time
+                response_start["status_code"] = message["status"]
+                response_start["process_time"] = process_time
+                MutableHeaders(scope=message)["X-Process-Time"] = str(process_time)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            process_time = time.time() - start_time
+            app_logger.error(
+                f"Error: {method} {path} - {str(e)}",
+                extra={
+                    "method": method,
+                    "path": path,
+                    "duration_ms": round(process_time * 1000, 2)
+                },
+                exc_info=True
+            )
+            raise
+
+        if response_start:
+            # Log response
+            app_logger.info(
+                f"Response: {method} {path} - {response_start['status_code']}",
+                extra={
+                    "method": method,
+                    "path": path,
+                    "status_code": response_start["status_code"],
+                    "duration_ms": round(response_start["process_time"] * 1000, 2)
+                }
+            )
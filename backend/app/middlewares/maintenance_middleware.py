@@ -0,0 +1,80 @@
+import json
+from typing import Any, Callable, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.maintenance import MaintenanceState, maintenance
+from app.core.security import verify_token
+from app.db.session import SessionLocal
+from app.utils.jwt import load_user
+from app.utils.principal_cache import principal_cache
+
+# Reachable during maintenance: status, docs, login (admins only, checked by
+# the auth service) and the admin API (checked by get_current_admin)
+MAINTENANCE_ALLOWED_PREFIXES = ("/health", "/maintenance", "/docs", "/redoc", "/openapi.json", "/auth/", "/admin/")
+
+
+def _load_user_columns(session_factory: Callable, user_id: int) -> Optional[Dict[str, Any]]:
+    """Role and status of a user, read on a new session"""
+    db = session_factory()
+    try:
+        user = load_user(db, user_id)
+        return {"role": user.role, "is_active": user.is_active} if user is not None else None
+    finally:
+        db.close()
+
+
+class MaintenanceMiddleware:
+    """
+    Reject non-admin requests with 503 while maintenance mode is on
+
+    Reads the in-memory flag; while it is off nothing else is checked. While it
+    is on, admins are recognised by their current role, read through the
+    principal cache (one users lookup per admin on a miss), not by the token's
+    role claim: a demoted or suspended admin is shut out as soon as the change
+    commits on this host, and within AUTH_CACHE_TTL_SECONDS on other hosts.
+    """
+
+    def __init__(self, app: ASGIApp, state: MaintenanceState = maintenance, session_factory: Optional[Callable] = None):
+        self.app = app
+        self.state = state
+        # None: app.db.session.SessionLocal, looked up per request
+        self.session_factory = session_factory
+
+    async def _is_admin(self, token: str) -> bool:
+        payload = verify_token(token)
+        try:
+            user_id = int(payload["sub"])
+        except (TypeError, KeyError, ValueError):
+            return False
+        user = principal_cache.snapshot(user_id) if settings.AUTH_CACHE_ENABLED else None
+        if user is None:
+            user = await run_in_threadpool(_load_user_columns, self.session_factory or SessionLocal, user_id)
+        return user is not None and user["role"] == "admin" and user["is_active"]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        is_maintenance, message = self.state.status()
+        path = scope["path"]
+        if not is_maintenance or path == "/" or path.startswith(MAINTENANCE_ALLOWED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        authorization = Headers(scope=scope).get("authorization") or ""
+        if authorization.lower().startswith("bearer ") and await self._is_admin(authorization[7:].strip()):
+            await self.app(scope, receive, send)
+            return
+
+        response = Response(
+            content=json.dumps({"detail": message}),
+            status_code=503,
+            media_type="application/json"
+        )
+        await response(scope, receive, send)
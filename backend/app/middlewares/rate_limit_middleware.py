@@ -1,43 +1,43 @@
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from app.utils.rate_limit import get_client_identifier, _rate_limit_store
-from time import time
+import json
+from math import ceil
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.utils.rate_limit import RateLimiter, get_rate_limiter
 from app.core.logging_config import app_logger
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Middleware for global rate limiting"""
+class RateLimitMiddleware:
+    """Middleware for global rate limiting (per route, per user, per IP), as plain ASGI"""
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter = None):
+        self.app = app
+        self.limiter = limiter
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
         # Skip rate limiting for certain paths
-        if request.url.path.startswith("/docs") or request.url.path.startswith("/openapi.json"):
-            return await call_next(request)
-
-        identifier = get_client_identifier(request)
-        now = time()
-        window_seconds = 60
-        max_requests = 100  # Global limit per minute
-
-        # Clean old entries
-        _rate_limit_store[identifier] = [
-            (ts, count) for ts, count in _rate_limit_store[identifier]
-            if now - ts < window_seconds
-        ]
-
-        # Count requests in window
-        total_requests = sum(count for _, count in _rate_limit_store[identifier])
-
-        if total_requests >= max_requests:
-            app_logger.warning(f"Rate limit exceeded for {identifier}")
-            return Response(
-                content='{"detail": "Rate limit exceeded"}',
+        if scope["type"] != "http" or path.startswith("/docs") or path.startswith("/openapi.json"):
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiter or get_rate_limiter()
+        client = scope.get("client")
+        identifier = client[0] if client else "unknown"
+        authorization = Headers(scope=scope).get("authorization")
+        retry_after = await limiter.check(path, identifier, authorization)
+
+        if retry_after is not None:
+            app_logger.warning(f"Rate limit exceeded for {identifier} on {path}")
+            response = Response(
+                content=json.dumps({"detail": "Rate limit exceeded"}),
                 status_code=429,
-                media_type="application/json"
+                media_type="application/json",
+                headers={"Retry-After": str(max(1, ceil(retry_after)))}
             )
+            await response(scope, receive, send)
+            return
 
-        # Add current request
-        _rate_limit_store[identifier].append((now, 1))
-
-        response = await call_next(request)
-        return response
-
+        await self.app(scope, receive, send)
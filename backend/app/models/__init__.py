@@ -4,6 +4,9 @@ from app.models.loan import Loan, LoanPayment
 from app.models.target import Target
 from app.models.user_telegram import UserTelegramID
 from app.models.bank import Bank, BankAccount
-from app.models.alert import Alert
+from app.models.alert import Alert, BroadcastReceipt
+from app.models.user_balance import UserBalance
+from app.models.savings_rollup import SavingsMonthlyRollup
+from app.models.job import Job, JobOutbox
 
-__all__ = ["User", "Savings", "Loan", "LoanPayment", "Target", "UserTelegramID", "Bank", "BankAccount", "Alert"]
+__all__ = ["User", "Savings", "Loan", "LoanPayment", "Target", "UserTelegramID", "Bank", "BankAccount", "Alert", "BroadcastReceipt", "UserBalance", "SavingsMonthlyRollup", "Job", "JobOutbox"]
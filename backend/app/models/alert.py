@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import Base
@@ -7,9 +7,13 @@ from app.db.base import Base
 class Alert(Base):
     """Model for storing alerts/notifications for users"""
     __tablename__ = "alerts"
+    __table_args__ = (
+        Index("ix_alerts_user_id_is_read_created_at", "user_id", "is_read", "created_at"),
+        Index("ix_alerts_user_id_created_at", "user_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True)  # None for broadcast
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)  # None for broadcast (stored once)
     title = Column(String, nullable=True)
     message = Column(String, nullable=False)
     is_read = Column(Boolean, default=False, nullable=False)
@@ -18,3 +22,11 @@ class Alert(Base):
     # Relationship
     user = relationship("User", back_populates="alerts")
 
+
+class BroadcastReceipt(Base):
+    """A broadcast alert read by one user above their users.broadcast_read_id watermark"""
+    __tablename__ = "broadcast_receipts"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    alert_id = Column(Integer, ForeignKey("alerts.id", ondelete="CASCADE"), primary_key=True)
+    read_at = Column(DateTime, default=datetime.utcnow, nullable=False)
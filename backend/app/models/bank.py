@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import Base
@@ -27,9 +27,12 @@ class Bank(Base):
 class BankAccount(Base):
     """Rekening bank milik user"""
     __tablename__ = "bank_accounts"
+    __table_args__ = (
+        Index("ix_bank_accounts_user_id_is_active_is_primary", "user_id", "is_active", "is_primary"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # indexed via ix_bank_accounts_user_id_is_active_is_primary
     bank_id = Column(Integer, ForeignKey("banks.id"), nullable=False, index=True)
     account_holder_name = Column(String, nullable=False)  # Nama pemilik rekening
     account_number = Column(String, nullable=False)  # Nomor rekening
@@ -0,0 +1,50 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, JSON
+from datetime import datetime
+from app.db.base import Base
+
+
+class Job(Base):
+    """Background job (broadcast, user alert) processed by the job worker"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_status_id", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    type = Column(String, nullable=False)  # broadcast, user_alert
+    status = Column(String, default="queued", nullable=False)  # queued, running, done, failed
+    payload = Column(JSON, nullable=False)
+    result = Column(JSON, nullable=True)  # Summary written when the job is expanded
+    total = Column(Integer, default=0, nullable=False)  # Outbox messages
+    sent = Column(Integer, default=0, nullable=False)
+    failed = Column(Integer, default=0, nullable=False)
+    error = Column(String, nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    locked_by = Column(String, nullable=True)  # Worker currently expanding the job
+    locked_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    @property
+    def pending(self) -> int:
+        return self.total - self.sent - self.failed
+
+
+class JobOutbox(Base):
+    """One Telegram message to deliver for a job"""
+    __tablename__ = "job_outbox"
+    __table_args__ = (
+        Index("ix_job_outbox_status_id", "status", "id"),
+        Index("ix_job_outbox_job_id_status", "job_id", "status"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
+    chat_id = Column(String, nullable=False)
+    status = Column(String, default="pending", nullable=False)  # pending, sent, failed
+    attempts = Column(Integer, default=0, nullable=False)
+    error = Column(String, nullable=True)
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
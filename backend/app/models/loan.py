@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import Base
@@ -6,9 +6,13 @@ from app.db.base import Base
 
 class Loan(Base):
     __tablename__ = "loans"
+    __table_args__ = (
+        Index("ix_loans_user_id_status", "user_id", "status"),
+        Index("ix_loans_user_id_start_date", "user_id", "start_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # indexed via the composite indexes above
     borrower_name = Column(String, nullable=False)
     principal = Column(Float, nullable=False)
     start_date = Column(Date, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import Base
@@ -6,9 +6,14 @@ from app.db.base import Base
 
 class Savings(Base):
     __tablename__ = "savings"
+    __table_args__ = (
+        # Per-user listing, date-range sums and keyset pages; type/amount are
+        # included on Postgres so the aggregates are index-only scans
+        Index("ix_savings_user_id_date", "user_id", "date", "id", postgresql_include=["type", "amount"]),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # indexed via ix_savings_user_id_date
     date = Column(Date, nullable=False, index=True)
     type = Column(String, nullable=False)  # IN / OUT
     category = Column(String, nullable=True)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey
+from app.db.base import Base
+
+
+class SavingsMonthlyRollup(Base):
+    """Income/expense totals per user per calendar month, maintained by the savings service"""
+    __tablename__ = "savings_monthly_rollup"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    income = Column(Float, default=0.0, nullable=False)
+    expense = Column(Float, default=0.0, nullable=False)
+    tx_count = Column(Integer, default=0, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import Base
@@ -6,6 +6,10 @@ from app.db.base import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Admin user list is ordered (and keyset paged) by (created_at, id)
+        Index("ix_users_created_at", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -16,6 +20,8 @@ class User(Base):
     telegram_id = Column(String, unique=True, nullable=True, index=True)  # Keep for backward compatibility
     role = Column(String, default="user", nullable=False)  # "user" or "admin"
     is_active = Column(Boolean, default=True, nullable=False)  # For suspend/unsuspend
+    data_version = Column(Integer, default=0, nullable=False)  # Bumped on every data write (cache key)
+    broadcast_read_id = Column(Integer, default=0, nullable=False)  # Broadcast alerts with id <= this are read
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
@@ -25,3 +31,5 @@ class User(Base):
     telegram_ids = relationship("UserTelegramID", back_populates="user", cascade="all, delete-orphan")
     bank_accounts = relationship("BankAccount", back_populates="user", cascade="all, delete-orphan")
     alerts = relationship("Alert", back_populates="user", cascade="all, delete-orphan")
+    balance = relationship("UserBalance", back_populates="user", uselist=False, cascade="all, delete-orphan")
+    monthly_rollups = relationship("SavingsMonthlyRollup", cascade="all, delete-orphan")
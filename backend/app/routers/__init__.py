@@ -1,3 +1,42 @@
+from fastapi import APIRouter, FastAPI
+
 from app.routers import auth, users, overview, savings, loans, targets, banks, admin
 
-__all__ = ["auth", "users", "overview", "savings", "loans", "targets", "banks", "admin"]
+# (module, prefix, tag) in mount order
+API_ROUTERS = [
+    (auth, "/auth", "Auth"),
+    (users, "/users", "Users"),
+    (overview, "/overview", "Overview"),
+    (savings, "/savings", "Savings"),
+    (loans, "/loans", "Loans"),
+    (targets, "/targets", "Targets"),
+    (banks, "/banks", "Banks"),
+    (admin, "/admin", "Admin"),
+]
+
+
+def with_async_routes(router: APIRouter, async_router: APIRouter) -> APIRouter:
+    """
+    Return router with each route replaced by its async twin (same path and method)
+
+    Routes keep their original position, so e.g. /savings/export still matches
+    before the async /savings/{savings_id}; routes without a twin stay sync.
+    """
+    twins = {(route.path, method): route for route in async_router.routes for method in route.methods}
+    merged = APIRouter()
+    for route in router.routes:
+        twin = next((twins[(route.path, method)] for method in route.methods if (route.path, method) in twins), None)
+        merged.routes.append(twin or route)
+    return merged
+
+
+def include_api_routers(app: FastAPI, use_async: bool = False) -> None:
+    """Mount the API routers, using the AsyncSession routes where available if use_async"""
+    for module, prefix, tag in API_ROUTERS:
+        router = module.router
+        if use_async and hasattr(module, "async_router"):
+            router = with_async_routes(module.router, module.async_router)
+        app.include_router(router, prefix=prefix, tags=[tag])
+
+
+__all__ = ["auth", "users", "overview", "savings", "loans", "targets", "banks", "admin", "include_api_routers"]
@@ -1,15 +1,19 @@
 """
 Admin Router - Dashboard Admin Features
 All endpoints require admin role
+
+Handlers are plain def (run in the threadpool) unless they await something;
+async handlers keep database work off the event loop with run_in_threadpool.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Optional
 from datetime import datetime
 
 from app.db.session import get_db
 from app.models.user import User
-from app.models.bank import Bank
+from app.models.bank import Bank, BankAccount
 from app.utils.jwt import get_current_admin
 from app.schemas.admin import (
     UserListResponse,
@@ -22,10 +26,16 @@ from app.schemas.admin import (
     SendAlertToUserRequest,
     BankLogoUpdateRequest,
     BankCreateRequest,
-    AdminStatsResponse
+    AdminStatsResponse,
+    JobResponse
 )
 from app.core.config import settings
+from app.utils.response_cache import response_cache, bump_data_version, bump_data_versions
+from app.utils.pagination import keyset_page
+from app.services.admin_service import get_dashboard_stats, invalidate_admin_stats
+from app.services.jobs_service import enqueue_job, get_job, telegram_chat_ids
 from app.core.logging_config import app_logger
+from app.core.maintenance import maintenance
 import os
 import shutil
 
@@ -33,33 +43,32 @@ router = APIRouter()
 
 
 @router.get("/stats", response_model=AdminStatsResponse)
-async def get_admin_stats(
+def get_admin_stats(
     db: Session = Depends(get_db),
     admin: User = Depends(get_current_admin)
 ):
-    """Get admin dashboard statistics"""
-    total_users = db.query(User).count()
-    active_users = db.query(User).filter(User.is_active == True).count()
-    suspended_users = db.query(User).filter(User.is_active == False).count()
-    admin_users = db.query(User).filter(User.role == "admin").count()
-    
-    return {
-        "total_users": total_users,
-        "active_users": active_users,
-        "suspended_users": suspended_users,
-        "admin_users": admin_users
-    }
+    """Get admin dashboard statistics (one aggregate query, cached briefly)"""
+    return get_dashboard_stats(db)
+
+
+@router.get("/cache/stats")
+def get_cache_stats(
+    admin: User = Depends(get_current_admin)
+):
+    """Get response cache hit/miss statistics for this worker"""
+    return response_cache.stats()
 
 
 @router.get("/users", response_model=UserListResponse)
-async def list_users(
+def list_users(
     skip: int = 0,
     limit: int = 100,
     search: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Keyset cursor; send an empty value for the first page"),
     db: Session = Depends(get_db),
     admin: User = Depends(get_current_admin)
 ):
-    """List all users (admin only)"""
+    """List all users (admin only); pages by cursor instead of skip when cursor is given"""
     query = db.query(User)
     
     if search:
@@ -69,18 +78,26 @@ async def list_users(
         )
     
     total = query.count()
-    users = query.order_by(User.created_at.desc()).offset(skip).limit(limit).all()
+    next_cursor = None
+    if cursor is not None:
+        skip = 0
+        users, next_cursor = keyset_page(
+            query, [User.created_at, User.id], lambda u: (u.created_at, u.id), cursor, limit
+        )
+    else:
+        users = query.order_by(User.created_at.desc(), User.id.desc()).offset(skip).limit(limit).all()
     
     return {
         "users": users,
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": next_cursor
     }
 
 
 @router.get("/users/{user_id}", response_model=UserDetailResponse)
-async def get_user_detail(
+def get_user_detail(
     user_id: int,
     db: Session = Depends(get_db),
     admin: User = Depends(get_current_admin)
@@ -96,7 +113,7 @@ async def get_user_detail(
 
 
 @router.put("/users/{user_id}/suspend")
-async def suspend_user(
+def suspend_user(
     user_id: int,
     request: UserSuspendRequest,
     db: Session = Depends(get_db),
@@ -118,6 +135,7 @@ async def suspend_user(
     
     user.is_active = not request.suspend  # If suspend=True, set is_active=False
     db.commit()
+    invalidate_admin_stats()
     db.refresh(user)
     
     return {
@@ -127,7 +145,7 @@ async def suspend_user(
 
 
 @router.put("/users/{user_id}/role", response_model=UserDetailResponse)
-async def update_user_role(
+def update_user_role(
     user_id: int,
     request: UserRoleUpdateRequest,
     db: Session = Depends(get_db),
@@ -157,6 +175,7 @@ async def update_user_role(
         old_role = user.role
         user.role = request.role
         db.commit()
+        invalidate_admin_stats()
         db.refresh(user)
         
         app_logger.info(f"User {user_id} role changed from {old_role} to {request.role} by admin {admin.id}")
@@ -174,7 +193,7 @@ async def update_user_role(
 
 
 @router.delete("/users/{user_id}")
-async def delete_user(
+def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
     admin: User = Depends(get_current_admin)
@@ -196,6 +215,7 @@ async def delete_user(
     # Delete user (cascade will handle related data)
     db.delete(user)
     db.commit()
+    invalidate_admin_stats()
     
     return {
         "message": "User deleted successfully",
@@ -204,25 +224,11 @@ async def delete_user(
 
 
 @router.get("/maintenance", response_model=MaintenanceModeResponse)
-async def get_maintenance_mode(
+def get_maintenance_mode(
     admin: User = Depends(get_current_admin)
 ):
     """Get current maintenance mode status"""
-    # Use absolute path for maintenance file
-    import pathlib
-    project_root = pathlib.Path(__file__).parent.parent.parent.parent
-    maintenance_file = project_root / "maintenance_mode.txt"
-    
-    is_maintenance = False
-    message = ""
-    
-    if maintenance_file.exists():
-        with open(maintenance_file, "r", encoding="utf-8") as f:
-            content = f.read().strip()
-            if content:
-                is_maintenance = True
-                message = content
-    
+    is_maintenance, message = maintenance.status()
     return {
         "is_maintenance": is_maintenance,
         "message": message
@@ -230,171 +236,125 @@ async def get_maintenance_mode(
 
 
 @router.put("/maintenance", response_model=MaintenanceModeResponse)
-async def set_maintenance_mode(
+def set_maintenance_mode(
     request: MaintenanceModeRequest,
     admin: User = Depends(get_current_admin)
 ):
-    """Enable or disable maintenance mode"""
-    # Use absolute path for maintenance file
-    import pathlib
-    project_root = pathlib.Path(__file__).parent.parent.parent.parent
-    maintenance_file = project_root / "maintenance_mode.txt"
-    
-    if request.enabled:
-        message = request.message or "System is under maintenance. Please try again later."
-        with open(maintenance_file, "w", encoding="utf-8") as f:
-            f.write(message)
-        return {
-            "is_maintenance": True,
-            "message": message
-        }
-    else:
-        if maintenance_file.exists():
-            maintenance_file.unlink()
-        return {
-            "is_maintenance": False,
-            "message": ""
-        }
+    """Enable or disable maintenance mode (all workers pick it up within MAINTENANCE_POLL_SECONDS)"""
+    is_maintenance, message = maintenance.set(request.enabled, request.message)
+    app_logger.info(f"Maintenance mode {'enabled' if is_maintenance else 'disabled'} by {admin.email}")
+    return {
+        "is_maintenance": is_maintenance,
+        "message": message
+    }
 
 
-@router.post("/broadcast")
-async def broadcast_alert(
+@router.post("/broadcast", status_code=status.HTTP_202_ACCEPTED)
+def broadcast_alert(
     request: BroadcastAlertRequest,
     db: Session = Depends(get_db),
     admin: User = Depends(get_current_admin)
 ):
-    """Broadcast alert/notification to all active users via Telegram"""
-    from app.services.telegram_service import send_telegram_broadcast
-    from app.models.user_telegram import UserTelegramID
-    from app.models.alert import Alert
-    
-    # Get all active users
-    users = db.query(User).filter(User.is_active == True).all()
-    
-    # Collect all Telegram IDs (from both new multi-ID system and old single ID)
-    telegram_ids = []
-    for user in users:
-        # Get from new multi-ID system
-        user_telegram_ids = db.query(UserTelegramID).filter(
-            UserTelegramID.user_id == user.id
-        ).all()
-        for ut_id in user_telegram_ids:
-            if ut_id.telegram_id not in telegram_ids:
-                telegram_ids.append(ut_id.telegram_id)
-        
-        # Fallback to old single telegram_id field
-        if user.telegram_id and user.telegram_id not in telegram_ids:
-            telegram_ids.append(user.telegram_id)
-    
-    # Send broadcast via Telegram
-    result = await send_telegram_broadcast(
-        telegram_ids=telegram_ids,
-        message=request.message,
-        title=request.title
+    """Queue an alert/notification for all active users; a job worker saves and sends it"""
+    job = enqueue_job(
+        db,
+        "broadcast",
+        {"title": request.title, "message": request.message},
+        created_by=admin.id
     )
-    
-    # Save alert to database for each user
-    alerts_created = 0
-    for user in users:
-        alert = Alert(
-            user_id=user.id,
-            title=request.title,
-            message=request.message,
-            is_read=False
-        )
-        db.add(alert)
-        alerts_created += 1
-    
-    db.commit()
+    users_count = db.query(User).filter(User.is_active == True).count()
+    app_logger.info(f"Broadcast job {job.id} queued by admin {admin.id}")
     
     return {
-        "message": "Broadcast sent successfully",
-        "users_count": len(users),
-        "alerts_created": alerts_created,
-        "telegram_sent": result["success_count"],
-        "telegram_failed": result["failed_count"],
-        "telegram_total": result["total"],
+        "message": "Broadcast queued",
+        "job_id": job.id,
+        "status": job.status,
+        "users_count": users_count,
         "content": request.message
     }
 
 
-@router.post("/send-alert")
-async def send_alert_to_user(
-    request: SendAlertToUserRequest,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin)
-):
-    """Send alert/notification to a specific user via Telegram"""
-    from app.services.telegram_service import send_telegram_message
-    from app.models.user_telegram import UserTelegramID
-    from app.models.alert import Alert
-    
+def _get_user_with_telegram_ids(db: Session, user_id: int):
+    """Return (user, the user's unique Telegram IDs)"""
     # Get user
-    user = db.query(User).filter(User.id == request.user_id).first()
+    user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    # Get user's Telegram IDs
-    telegram_ids = []
-    
-    # Get from new multi-ID system
-    user_telegram_ids = db.query(UserTelegramID).filter(
-        UserTelegramID.user_id == user.id
-    ).all()
-    for ut_id in user_telegram_ids:
-        telegram_ids.append(ut_id.telegram_id)
-    
-    # Fallback to old single telegram_id field
-    if user.telegram_id:
-        telegram_ids.append(user.telegram_id)
-    
-    # Send message to all Telegram IDs of the user (if available)
-    success_count = 0
-    failed_count = 0
-    
-    if telegram_ids:
-        for telegram_id in telegram_ids:
-            success = await send_telegram_message(
-                telegram_id=telegram_id,
-                message=request.message,
-                title=request.title
-            )
-            if success:
-                success_count += 1
-            else:
-                failed_count += 1
-    else:
-        # Still save alert even if no Telegram ID
-        pass
-    
-    # Save alert to database
+    return user, telegram_chat_ids(db, User.id == user.id)
+
+
+def _save_user_alert(db: Session, user_id: int, title: Optional[str], message: str):
+    """Add an alert for one user; committed by the caller"""
+    from app.models.alert import Alert
+
     alert = Alert(
-        user_id=user.id,
-        title=request.title,
-        message=request.message,
+        user_id=user_id,
+        title=title,
+        message=message,
         is_read=False
     )
     db.add(alert)
-    db.commit()
-    db.refresh(alert)
+    bump_data_version(db, user_id)
+    db.flush()
+    return alert
+
+
+@router.post("/send-alert", status_code=status.HTTP_202_ACCEPTED)
+def send_alert_to_user(
+    request: SendAlertToUserRequest,
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_current_admin)
+):
+    """Save an alert for a specific user and queue its Telegram delivery"""
+    user, telegram_ids = _get_user_with_telegram_ids(db, request.user_id)
+    
+    # Save alert to database (even if the user has no Telegram ID)
+    alert = _save_user_alert(db, user.id, request.title, request.message)
+    
+    # Telegram messages go straight to the outbox; the worker sends them.
+    # Committed together with the alert, so a saved alert is always delivered
+    job = enqueue_job(
+        db,
+        "user_alert",
+        {"user_id": user.id, "title": request.title, "message": request.message},
+        created_by=admin.id,
+        chat_ids=telegram_ids
+    )
     
     return {
-        "message": "Alert sent successfully" if success_count > 0 or not telegram_ids else "Alert saved (no Telegram ID)",
+        "message": "Alert queued" if telegram_ids else "Alert saved (no Telegram ID)",
         "user_id": user.id,
         "user_name": user.name,
         "user_email": user.email,
         "alert_id": alert.id,
-        "telegram_sent": success_count,
-        "telegram_failed": failed_count,
+        "job_id": job.id,
         "telegram_total": len(telegram_ids)
     }
 
 
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+def get_job_status(
+    job_id: int,
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_current_admin)
+):
+    """Get progress and delivery counts of a background job"""
+    return get_job(db, job_id)
+
+
+def _bump_bank_account_holders(db: Session, bank_id: int) -> None:
+    """Bank data is embedded in cached account lists, so invalidate every holder"""
+    bump_data_versions(db, User.id.in_(
+        select(BankAccount.user_id).where(BankAccount.bank_id == bank_id)
+    ))
+
+
 @router.get("/banks")
-async def list_banks_for_admin(
+def list_banks_for_admin(
     db: Session = Depends(get_db),
     admin: User = Depends(get_current_admin)
 ):
@@ -404,7 +364,7 @@ async def list_banks_for_admin(
 
 
 @router.put("/banks/{bank_id}/logo")
-async def update_bank_logo(
+def update_bank_logo(
     bank_id: int,
     logo_file: UploadFile = File(...),
     db: Session = Depends(get_db),
@@ -441,6 +401,7 @@ async def update_bank_logo(
     
     # Update bank record
     bank.logo_filename = logo_filename
+    _bump_bank_account_holders(db, bank_id)
     db.commit()
     db.refresh(bank)
     
@@ -452,7 +413,7 @@ async def update_bank_logo(
 
 
 @router.post("/banks", status_code=status.HTTP_201_CREATED)
-async def create_bank(
+def create_bank(
     request: BankCreateRequest,
     db: Session = Depends(get_db),
     admin: User = Depends(get_current_admin)
@@ -490,7 +451,7 @@ async def create_bank(
 
 
 @router.put("/banks/{bank_id}")
-async def update_bank_settings(
+def update_bank_settings(
     bank_id: int,
     request: BankLogoUpdateRequest,
     db: Session = Depends(get_db),
@@ -515,6 +476,7 @@ async def update_bank_settings(
     if request.is_active is not None:
         bank.is_active = request.is_active
     
+    _bump_bank_account_holders(db, bank_id)
     db.commit()
     db.refresh(bank)
     
@@ -525,7 +487,7 @@ async def update_bank_settings(
 
 
 @router.delete("/banks/{bank_id}")
-async def delete_bank(
+def delete_bank(
     bank_id: int,
     db: Session = Depends(get_db),
     admin: User = Depends(get_current_admin)
@@ -1,26 +1,35 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
 from typing import Annotated
 
 from app.schemas.auth import RegisterRequest, LoginRequest, TelegramLoginRequest, TokenResponse
-from app.services.auth_service import register_user, login_user, telegram_login, get_or_create_google_user
-from app.db.session import get_db
-from app.settings.oauth_google import get_google_oauth_url, get_google_user_info_sync
+from app.services.auth_service import (
+    register_user,
+    login_user,
+    throttled_login,
+    telegram_login,
+    get_or_create_google_user,
+    create_user_token,
+)
+from app.routers.dual_routes import DualRouter, SessionRunner, session_runner
+from app.settings.oauth_google import EmailNotVerified, get_google_oauth_url, get_google_user_info
 from app.core.logging_config import app_logger
 
 router = APIRouter()
+# AsyncSession versions of the shared handlers, used when DB_ASYNC_ENABLED is set
+async_router = APIRouter()
+routes = DualRouter(router, async_router)
 
 
-@router.post("/register", status_code=status.HTTP_201_CREATED)
+@routes.post("/register", status_code=status.HTTP_201_CREATED)
 async def register(
     request: Request,
     data: RegisterRequest,
-    db: Session = Depends(get_db)
+    run: SessionRunner = Depends(session_runner)
 ):
     """Register a new user"""
     try:
-        user = register_user(db, data)
+        user = await run(register_user, data)
         app_logger.info(f"User registered: {user.email}", extra={"user_id": user.id})
         return {"message": "User registered successfully", "user_id": user.id}
     except HTTPException:
@@ -33,15 +42,16 @@ async def register(
         )
 
 
-@router.post("/login", response_model=TokenResponse)
+@routes.post("/login", response_model=TokenResponse)
 async def login(
     request: Request,
     data: LoginRequest,
-    db: Session = Depends(get_db)
+    run: SessionRunner = Depends(session_runner)
 ):
     """Login with email and password"""
     try:
-        result = login_user(db, data)
+        client_ip = request.client.host if request.client else None
+        result = await throttled_login(lambda: run(login_user, data), data.email, client_ip)
         app_logger.info(f"User logged in: {data.email}")
         return result
     except HTTPException:
@@ -54,15 +64,15 @@ async def login(
         )
 
 
-@router.post("/telegram-login", response_model=TokenResponse)
+@routes.post("/telegram-login", response_model=TokenResponse)
 async def telegram_login_endpoint(
     request: Request,
     data: TelegramLoginRequest,
-    db: Session = Depends(get_db)
+    run: SessionRunner = Depends(session_runner)
 ):
     """Login via Telegram ID"""
     try:
-        result = telegram_login(db, data)
+        result = await run(telegram_login, data)
         app_logger.info(f"Telegram login: {data.telegram_id}")
         return result
     except HTTPException:
@@ -79,7 +89,7 @@ async def telegram_login_endpoint(
 async def google_login():
     """Initiate Google OAuth login"""
     try:
-        auth_url = get_google_oauth_url()
+        auth_url = await get_google_oauth_url()
         return RedirectResponse(url=auth_url)
     except ValueError as e:
         # Configuration error
@@ -96,11 +106,11 @@ async def google_login():
         )
 
 
-@router.get("/google/callback")
+@routes.get("/google/callback")
 async def google_callback(
     code: str = None,
     error: str = None,
-    db: Session = Depends(get_db)
+    run: SessionRunner = Depends(session_runner)
 ):
     """Handle Google OAuth callback"""
     if error:
@@ -116,17 +126,16 @@ async def google_callback(
         return RedirectResponse(url=frontend_url, status_code=status.HTTP_302_FOUND)
     
     try:
-        user_info = get_google_user_info_sync(code)
-        user = get_or_create_google_user(
-            db,
+        user_info = await get_google_user_info(code)
+        user = await run(
+            get_or_create_google_user,
             google_id=user_info["id"],
             email=user_info["email"],
             name=user_info["name"],
             avatar_url=user_info.get("picture")
         )
 
-        from app.core.security import create_access_token
-        access_token = create_access_token(data={"sub": str(user.id)})
+        access_token = create_user_token(user)
 
         app_logger.info(f"Google OAuth login: {user.email}", extra={"user_id": user.id})
 
@@ -137,6 +146,11 @@ async def google_callback(
             url=f"{frontend_url}?token={access_token}",
             status_code=status.HTTP_302_FOUND
         )
+    except EmailNotVerified as e:
+        app_logger.warning(f"Google OAuth login refused: {str(e)}")
+        from app.core.config import settings
+        frontend_url = f"{settings.FRONTEND_URL}/login?error=email_not_verified"
+        return RedirectResponse(url=frontend_url, status_code=status.HTTP_302_FOUND)
     except ValueError as e:
         app_logger.error(f"Google OAuth configuration error: {str(e)}", exc_info=True)
         from app.core.config import settings
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -20,22 +20,28 @@ from app.services.banks_service import (
     delete_bank_account,
 )
 from app.utils.jwt import get_current_user
+from app.utils.response_cache import cached_response, etag_response
 from app.db.session import get_db
 from app.core.logging_config import app_logger
 
 router = APIRouter()
 
+# Bank master data only changes through the admin panel and is not user specific
+BANK_CACHE_CONTROL = "public, max-age=3600"
+
 
 # Bank Master Data Endpoints
 @router.get("/banks", response_model=BankListResponse)
 def list_banks(
+    request: Request,
     country: str = Query(None, description="Filter by country code (e.g., 'ID', 'KH')"),
     db: Session = Depends(get_db)
 ):
     """Get list of all available banks"""
     try:
         banks = get_all_banks(db, country)
-        return BankListResponse(banks=banks)
+        return etag_response(
+            request, {"banks": banks}, schema=BankListResponse, cache_control=BANK_CACHE_CONTROL)
     except Exception as e:
         app_logger.error(f"List banks error: {str(e)}", exc_info=True)
         raise
@@ -43,12 +49,14 @@ def list_banks(
 
 @router.get("/banks/{bank_id}", response_model=BankBase)
 def get_bank(
+    request: Request,
     bank_id: int,
     db: Session = Depends(get_db)
 ):
     """Get bank details by ID"""
     try:
-        return get_bank_by_id(db, bank_id)
+        return etag_response(
+            request, get_bank_by_id(db, bank_id), schema=BankBase, cache_control=BANK_CACHE_CONTROL)
     except Exception as e:
         app_logger.error(f"Get bank error: {str(e)}", exc_info=True)
         raise
@@ -57,6 +65,7 @@ def get_bank(
 # Bank Account Endpoints
 @router.get("/accounts", response_model=BankAccountListResponse)
 def list_bank_accounts(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
@@ -64,8 +73,12 @@ def list_bank_accounts(
 ):
     """List all bank accounts for the current user"""
     try:
-        accounts = get_bank_accounts(db, user.id, skip, limit)
-        return BankAccountListResponse(bank_accounts=accounts)
+        return cached_response(
+            request, user, "banks.accounts",
+            lambda: {"bank_accounts": get_bank_accounts(db, user.id, skip, limit)},
+            schema=BankAccountListResponse,
+            params={"skip": skip, "limit": limit}
+        )
     except Exception as e:
         app_logger.error(f"List bank accounts error for user {user.id}: {str(e)}", exc_info=True)
         raise
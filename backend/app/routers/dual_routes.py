@@ -0,0 +1,122 @@
+"""
+Route handlers written once for both database modes
+
+A shared handler is an async def that takes `run: SessionRunner =
+Depends(session_runner)` instead of a session and calls services as
+`await run(service, *args)`. DualRouter registers it on the sync router as is
+and on the async router with its dependencies swapped for their AsyncSession
+twins, so include_api_routers(use_async=True) picks the AsyncSession version.
+"""
+import inspect
+import sys
+from functools import lru_cache
+from typing import Any, Callable, Dict, List
+
+from fastapi import APIRouter, Depends
+from fastapi.params import Depends as DependsParam
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.db.session import get_db, get_async_db
+from app.utils.jwt import get_current_user, get_current_user_async
+
+
+@lru_cache(maxsize=None)
+def _async_twin(service: Callable) -> Callable:
+    """The <name>_async function next to service in its module"""
+    name = f"{service.__name__}_async"
+    twin = getattr(sys.modules[service.__module__], name, None)
+    if twin is None:
+        raise LookupError(f"{service.__module__} has no {name}")
+    return twin
+
+
+class SessionRunner:
+    """
+    Calls service functions with the request's session
+
+    On a sync Session the service runs in the threadpool; on an AsyncSession
+    its <name>_async twin from the same module is awaited instead.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.is_async = isinstance(db, AsyncSession)
+
+    async def __call__(self, service: Callable, *args, **kwargs) -> Any:
+        if self.is_async:
+            return await _async_twin(service)(self.db, *args, **kwargs)
+        return await run_in_threadpool(service, self.db, *args, **kwargs)
+
+
+async def session_runner(db: Session = Depends(get_db)):
+    # The handler and the response serialization run on the loop, where an
+    # expired attribute would be reloaded with a blocking query; async
+    # sessions never expire on commit either
+    expire_on_commit = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        yield SessionRunner(db)
+    finally:
+        db.expire_on_commit = expire_on_commit
+
+
+async def async_session_runner(db: AsyncSession = Depends(get_async_db)) -> SessionRunner:
+    return SessionRunner(db)
+
+
+# Sync dependency -> the one used in the handler's AsyncSession version
+ASYNC_DEPENDENCIES: Dict[Callable, Callable] = {
+    session_runner: async_session_runner,
+    get_current_user: get_current_user_async,
+}
+
+
+def with_async_dependencies(handler: Callable) -> Callable:
+    """Copy of handler (named <name>_async) with its dependencies swapped per ASYNC_DEPENDENCIES"""
+    signature = inspect.signature(handler)
+    parameters = []
+    for parameter in signature.parameters.values():
+        default = parameter.default
+        if isinstance(default, DependsParam) and default.dependency in ASYNC_DEPENDENCIES:
+            parameter = parameter.replace(
+                default=Depends(ASYNC_DEPENDENCIES[default.dependency], use_cache=default.use_cache)
+            )
+        parameters.append(parameter)
+
+    async def endpoint(*args, **kwargs):
+        return await handler(*args, **kwargs)
+
+    endpoint.__signature__ = signature.replace(parameters=parameters)
+    endpoint.__name__ = endpoint.__qualname__ = f"{handler.__name__}_async"
+    endpoint.__doc__ = handler.__doc__
+    endpoint.__module__ = handler.__module__
+    return endpoint
+
+
+class DualRouter:
+    """Registers shared handlers on router and, for the async mode, on async_router"""
+
+    def __init__(self, router: APIRouter, async_router: APIRouter):
+        self.router = router
+        self.async_router = async_router
+
+    def api_route(self, path: str, methods: List[str], **kwargs) -> Callable:
+        def decorator(handler: Callable) -> Callable:
+            self.router.add_api_route(path, handler, methods=methods, **kwargs)
+            self.async_router.add_api_route(path, with_async_dependencies(handler), methods=methods, **kwargs)
+            return handler
+        return decorator
+
+    def get(self, path: str, **kwargs) -> Callable:
+        return self.api_route(path, ["GET"], **kwargs)
+
+    def post(self, path: str, **kwargs) -> Callable:
+        return self.api_route(path, ["POST"], **kwargs)
+
+    def put(self, path: str, **kwargs) -> Callable:
+        return self.api_route(path, ["PUT"], **kwargs)
+
+    def delete(self, path: str, **kwargs) -> Callable:
+        return self.api_route(path, ["DELETE"], **kwargs)
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from datetime import date
+from typing import List, Optional, Union
 
 from app.db.session import get_db
 from app.utils.jwt import get_current_user
+from app.models.user import User
 from app.schemas.loan import (
     LoanBase,
     LoanCreateRequest,
@@ -14,45 +16,71 @@ from app.schemas.loan import (
 from app.services.loans_service import (
     create_loan,
     get_loans,
+    get_loans_page,
     get_loan_by_id,
     update_loan,
     delete_loan,
     add_payment,
     get_payments,
 )
+from app.schemas.pagination import CursorPage
+from app.services.export_service import (
+    LOAN_EXPORT_COLUMNS,
+    validate_export_params,
+    iter_loan_export_rows,
+    export_response,
+)
+from app.routers.dual_routes import DualRouter, SessionRunner, session_runner
+from app.utils.response_cache import cached_response_async
 from app.core.logging_config import app_logger
 
 router = APIRouter()
+# AsyncSession versions of the shared handlers, used when DB_ASYNC_ENABLED is set
+async_router = APIRouter()
+routes = DualRouter(router, async_router)
 
 
-@router.get("/", response_model=List[LoanBase])
-def list_loans(
+@routes.get("/", response_model=Union[List[LoanBase], CursorPage[LoanBase]])
+async def list_loans(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     status_filter: Optional[str] = None,
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Keyset cursor; send an empty value for the first page"),
+    run: SessionRunner = Depends(session_runner),
+    user: User = Depends(get_current_user)
 ):
     """List all loans for the current user"""
     try:
-        loans = get_loans(db, user.id, skip, limit)
-        if status_filter:
-            loans = [loan for loan in loans if loan.status == status_filter]
-        return loans
+        if cursor is not None:
+            async def build_page():
+                items, next_cursor = await run(get_loans_page, user.id, cursor, limit, status_filter)
+                return {"items": items, "next_cursor": next_cursor}
+
+            return await cached_response_async(
+                request, user, "loans.page", build_page, schema=CursorPage[LoanBase],
+                params={"cursor": cursor, "limit": limit, "status_filter": status_filter}
+            )
+        return await cached_response_async(
+            request, user, "loans.list",
+            lambda: run(get_loans, user.id, skip, limit, status_filter),
+            schema=List[LoanBase],
+            params={"skip": skip, "limit": limit, "status_filter": status_filter}
+        )
     except Exception as e:
         app_logger.error(f"List loans error for user {user.id}: {str(e)}", exc_info=True)
         raise
 
 
-@router.post("/", response_model=LoanBase, status_code=status.HTTP_201_CREATED)
-def create_loan_endpoint(
+@routes.post("/", response_model=LoanBase, status_code=status.HTTP_201_CREATED)
+async def create_loan_endpoint(
     data: LoanCreateRequest,
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user)
+    run: SessionRunner = Depends(session_runner),
+    user: User = Depends(get_current_user)
 ):
     """Create a new loan"""
     try:
-        loan = create_loan(db, user.id, data)
+        loan = await run(create_loan, user.id, data)
         app_logger.info(f"Loan created: {loan.id} by user {user.id}")
         return loan
     except HTTPException:
@@ -65,26 +93,42 @@ def create_loan_endpoint(
         )
 
 
-@router.get("/{loan_id}", response_model=LoanBase)
-def get_loan_endpoint(
-    loan_id: int,
+@router.get("/export")
+def export_loans_endpoint(
+    file_format: str = Query("csv", alias="format", description="csv or ndjson"),
+    start_date: Optional[date] = Query(None, description="Only loans started on or after this date"),
+    end_date: Optional[date] = Query(None, description="Only loans started on or before this date"),
+    gzip: bool = Query(False, description="Compress the stream with gzip"),
     db: Session = Depends(get_db),
-    user = Depends(get_current_user)
+    user: User = Depends(get_current_user)
+):
+    """Download the current user's loans with paid and remaining amounts as CSV or NDJSON"""
+    validate_export_params(file_format, start_date, end_date)
+    app_logger.info(f"Loans export by user {user.id} ({file_format}, {start_date} - {end_date})")
+    rows = iter_loan_export_rows(db, user.id, start_date, end_date)
+    return export_response(rows, LOAN_EXPORT_COLUMNS, "loans", file_format, start_date, end_date, gzip)
+
+
+@routes.get("/{loan_id}", response_model=LoanBase)
+async def get_loan_endpoint(
+    loan_id: int,
+    run: SessionRunner = Depends(session_runner),
+    user: User = Depends(get_current_user)
 ):
     """Get a specific loan"""
-    return get_loan_by_id(db, loan_id, user.id)
+    return await run(get_loan_by_id, loan_id, user.id)
 
 
-@router.put("/{loan_id}", response_model=LoanBase)
-def update_loan_endpoint(
+@routes.put("/{loan_id}", response_model=LoanBase)
+async def update_loan_endpoint(
     loan_id: int,
     data: LoanUpdateRequest,
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user)
+    run: SessionRunner = Depends(session_runner),
+    user: User = Depends(get_current_user)
 ):
     """Update a loan"""
     try:
-        return update_loan(db, loan_id, user.id, data)
+        return await run(update_loan, loan_id, user.id, data)
     except HTTPException:
         raise
     except Exception as e:
@@ -95,15 +139,15 @@ def update_loan_endpoint(
         )
 
 
-@router.delete("/{loan_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_loan_endpoint(
+@routes.delete("/{loan_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_loan_endpoint(
     loan_id: int,
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user)
+    run: SessionRunner = Depends(session_runner),
+    user: User = Depends(get_current_user)
 ):
     """Delete a loan"""
     try:
-        delete_loan(db, loan_id, user.id)
+        await run(delete_loan, loan_id, user.id)
         app_logger.info(f"Loan deleted: {loan_id} by user {user.id}")
     except HTTPException:
         raise
@@ -112,16 +156,16 @@ def delete_loan_endpoint(
         raise
 
 
-@router.post("/{loan_id}/payments", response_model=LoanPaymentBase, status_code=status.HTTP_201_CREATED)
-def add_payment_endpoint(
+@routes.post("/{loan_id}/payments", response_model=LoanPaymentBase, status_code=status.HTTP_201_CREATED)
+async def add_payment_endpoint(
     loan_id: int,
     data: LoanPaymentCreateRequest,
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user)
+    run: SessionRunner = Depends(session_runner),
+    user: User = Depends(get_current_user)
 ):
     """Add a payment to a loan"""
     try:
-        payment = add_payment(db, loan_id, user.id, data)
+        payment = await run(add_payment, loan_id, user.id, data)
         app_logger.info(f"Payment added to loan {loan_id} by user {user.id}")
         return payment
     except HTTPException:
@@ -134,15 +178,15 @@ def add_payment_endpoint(
         )
 
 
-@router.get("/{loan_id}/payments", response_model=List[LoanPaymentBase])
-def get_payments_endpoint(
+@routes.get("/{loan_id}/payments", response_model=List[LoanPaymentBase])
+async def get_payments_endpoint(
     loan_id: int,
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user)
+    run: SessionRunner = Depends(session_runner),
+    user: User = Depends(get_current_user)
 ):
     """Get all payments for a loan"""
     try:
-        payments = get_payments(db, loan_id, user.id)
+        payments = await run(get_payments, loan_id, user.id)
         return payments
     except HTTPException:
         raise
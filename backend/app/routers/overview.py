@@ -1,90 +1,48 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
-from datetime import datetime, date, timedelta
-from typing import List, Dict
+from fastapi import APIRouter, Depends, Request
+from datetime import date
+from typing import Optional
 
-from app.models.savings import Savings
-from app.models.loan import Loan
-from app.models.target import Target
 from app.utils.jwt import get_current_user
-from app.db.session import get_db
-from app.services.savings_service import get_balance
-from app.services.loans_service import get_total_active_loans_amount
-from app.services.targets_service import get_total_target_current_amount
-from app.utils.calculations import get_monthly_summary
+from app.models.user import User
+from app.services.overview_service import get_overview as build_overview
+from app.services.ledger_service import get_yearly_summary
+from app.routers.dual_routes import DualRouter, SessionRunner, session_runner
+from app.utils.response_cache import cached_response_async
 from app.core.logging_config import app_logger
 
 router = APIRouter()
+# AsyncSession versions of the shared handlers, used when DB_ASYNC_ENABLED is set
+async_router = APIRouter()
+routes = DualRouter(router, async_router)
 
 
-@router.get("/")
-def get_overview(
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user)
+@routes.get("/")
+async def get_overview(
+    request: Request,
+    run: SessionRunner = Depends(session_runner),
+    user: User = Depends(get_current_user)
 ):
     """Get financial overview for the current user"""
     try:
-        # Total balance from savings
-        balance_info = get_balance(db, user.id)
-        total_balance = balance_info["total_balance"]
-
-        # Total active loans amount
-        total_active_loans_amount = get_total_active_loans_amount(db, user.id)
-
-        # Total target current amount
-        total_target_current_amount = get_total_target_current_amount(db, user.id)
-
-        # Monthly income and expense (current month)
-        now = datetime.now()
-        monthly_info = get_monthly_summary(db, user.id, now.year, now.month)
-        total_income_month = monthly_info["income"]
-        total_expense_month = monthly_info["expense"]
-
-        # Get last 6 months summary for chart
-        monthly_summaries = []
-        for i in range(6):
-            month = now.month - i
-            year = now.year
-            if month <= 0:
-                month += 12
-                year -= 1
-            monthly_info = get_monthly_summary(db, user.id, year, month)
-            monthly_summaries.append({
-                "month": month,
-                "year": year,
-                "income": monthly_info["income"],
-                "expense": monthly_info["expense"],
-                "net": monthly_info["net"]
-            })
-        monthly_summaries.reverse()
+        return await cached_response_async(request, user, "overview", lambda: run(build_overview, user.id))
+    except Exception as e:
+        app_logger.error(f"Overview error for user {user.id}: {str(e)}", exc_info=True)
+        raise
 
-        # Daily trend (last 7 days)
-        daily_trend = []
-        for i in range(7):
-            day = date.today() - timedelta(days=6-i)
-            day_savings = db.query(Savings).filter(
-                Savings.user_id == user.id,
-                Savings.date == day
-            ).all()
-            day_income = sum(s.amount for s in day_savings if s.type == "IN")
-            day_expense = sum(s.amount for s in day_savings if s.type == "OUT")
-            daily_trend.append({
-                "date": day.isoformat(),
-                "income": day_income,
-                "expense": day_expense,
-                "net": day_income - day_expense
-            })
 
-        return {
-            "total_balance": total_balance,
-            "total_active_loans_amount": total_active_loans_amount,
-            "total_target_current_amount": total_target_current_amount,
-            "total_income_month": total_income_month,
-            "total_expense_month": total_expense_month,
-            "monthly_summaries": monthly_summaries,
-            "daily_trend": daily_trend
-        }
+@routes.get("/yearly")
+async def get_yearly_overview(
+    request: Request,
+    year: Optional[int] = None,
+    run: SessionRunner = Depends(session_runner),
+    user: User = Depends(get_current_user)
+):
+    """Get monthly income and expense for a whole year (defaults to current year)"""
+    try:
+        year = year or date.today().year
+        return await cached_response_async(
+            request, user, "overview.yearly", lambda: run(get_yearly_summary, user.id, year), params={"year": year}
+        )
     except Exception as e:
-        app_logger.error(f"Overview error for user {user.id}: {str(e)}", exc_info=True)
+        app_logger.error(f"Yearly overview error for user {user.id}: {str(e)}", exc_info=True)
         raise
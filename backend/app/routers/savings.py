@@ -1,52 +1,90 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile, status
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import date
+from typing import List, Optional, Union
 
 from app.schemas.savings import (
     SavingsBase,
     SavingsCreateRequest,
     SavingsUpdateRequest,
-    BalanceResponse
+    BalanceResponse,
+    SavingsImportResponse
 )
+from app.schemas.pagination import CursorPage
 from app.services.savings_service import (
     create_savings,
     get_savings,
+    get_savings_page,
     get_savings_by_id,
     update_savings,
     delete_savings,
     get_balance,
 )
+from app.services.export_service import (
+    SAVINGS_EXPORT_COLUMNS,
+    validate_export_params,
+    iter_savings_export_rows,
+    export_response,
+)
+from app.services.savings_import_service import (
+    IMPORT_FORMATS,
+    check_import_size,
+    detect_import_format,
+    iter_csv_records,
+    iter_ndjson_records,
+    import_savings,
+)
 from app.utils.jwt import get_current_user
+from app.models.user import User
 from app.db.session import get_db
+from app.routers.dual_routes import DualRouter, SessionRunner, session_runner
+from app.utils.response_cache import cached_response_async
 from app.core.logging_config import app_logger
 
 router = APIRouter()
+# AsyncSession versions of the shared handlers, used when DB_ASYNC_ENABLED is set
+async_router = APIRouter()
+routes = DualRouter(router, async_router)
 
 
-@router.get("/", response_model=List[SavingsBase])
-def list_savings(
+@routes.get("/", response_model=Union[List[SavingsBase], CursorPage[SavingsBase]])
+async def list_savings(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Keyset cursor; send an empty value for the first page"),
+    run: SessionRunner = Depends(session_runner),
+    user: User = Depends(get_current_user)
 ):
-    """List all savings transactions for the current user"""
+    """List savings transactions; returns {items, next_cursor} when cursor is given"""
     try:
-        return get_savings(db, user.id, skip, limit)
+        if cursor is not None:
+            async def build_page():
+                items, next_cursor = await run(get_savings_page, user.id, cursor, limit)
+                return {"items": items, "next_cursor": next_cursor}
+
+            return await cached_response_async(
+                request, user, "savings.page", build_page,
+                schema=CursorPage[SavingsBase], params={"cursor": cursor, "limit": limit}
+            )
+        return await cached_response_async(
+            request, user, "savings.list", lambda: run(get_savings, user.id, skip, limit),
+            schema=List[SavingsBase], params={"skip": skip, "limit": limit}
+        )
     except Exception as e:
         app_logger.error(f"List savings error for user {user.id}: {str(e)}", exc_info=True)
         raise
 
 
-@router.post("/", response_model=SavingsBase, status_code=status.HTTP_201_CREATED)
-def create_savings_endpoint(
+@routes.post("/", response_model=SavingsBase, status_code=status.HTTP_201_CREATED)
+async def create_savings_endpoint(
     data: SavingsCreateRequest,
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user)
+    run: SessionRunner = Depends(session_runner),
+    user: User = Depends(get_current_user)
 ):
     """Create a new savings transaction"""
     try:
-        savings = create_savings(db, user.id, data)
+        savings = await run(create_savings, user.id, data)
         app_logger.info(f"Savings created: {savings.id} by user {user.id}")
         return savings
     except HTTPException:
@@ -59,26 +97,92 @@ def create_savings_endpoint(
         )
 
 
-@router.get("/{savings_id}", response_model=SavingsBase)
-def get_savings_endpoint(
-    savings_id: int,
+@router.post("/bulk", response_model=SavingsImportResponse)
+def bulk_import_savings_endpoint(
+    file: UploadFile = File(...),
+    file_format: Optional[str] = Query(
+        None, alias="format", description="csv or ndjson; detected from the file name if omitted"
+    ),
     db: Session = Depends(get_db),
-    user = Depends(get_current_user)
+    user: User = Depends(get_current_user)
+):
+    """Import savings transactions from a CSV or NDJSON file, reporting invalid rows"""
+    import_format = file_format or detect_import_format(file.filename, file.content_type)
+    if import_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unsupported file format. Upload a .csv or .ndjson file or pass ?format="
+        )
+
+    check_import_size(file.file)
+    records = iter_csv_records(file.file) if import_format == "csv" else iter_ndjson_records(file.file)
+    try:
+        result = import_savings(db, user.id, records)
+        app_logger.info(
+            f"Savings import by user {user.id}: {result['imported']} imported, {result['failed']} failed"
+        )
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        app_logger.error(f"Savings import error for user {user.id}: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to import savings"
+        )
+
+
+@router.get("/export")
+def export_savings_endpoint(
+    file_format: str = Query("csv", alias="format", description="csv or ndjson"),
+    start_date: Optional[date] = Query(None, description="Only transactions on or after this date"),
+    end_date: Optional[date] = Query(None, description="Only transactions on or before this date"),
+    gzip: bool = Query(False, description="Compress the stream with gzip"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """Download the current user's savings transactions as CSV or NDJSON, oldest first"""
+    validate_export_params(file_format, start_date, end_date)
+    app_logger.info(f"Savings export by user {user.id} ({file_format}, {start_date} - {end_date})")
+    rows = iter_savings_export_rows(db, user.id, start_date, end_date)
+    return export_response(rows, SAVINGS_EXPORT_COLUMNS, "savings", file_format, start_date, end_date, gzip)
+
+
+@routes.get("/balance", response_model=BalanceResponse)
+async def get_balance_endpoint(
+    request: Request,
+    run: SessionRunner = Depends(session_runner),
+    user: User = Depends(get_current_user)
+):
+    """Get balance information for the current user"""
+    try:
+        return await cached_response_async(
+            request, user, "savings.balance", lambda: run(get_balance, user.id), schema=BalanceResponse)
+    except Exception as e:
+        app_logger.error(f"Get balance error for user {user.id}: {str(e)}", exc_info=True)
+        raise
+
+
+@routes.get("/{savings_id}", response_model=SavingsBase)
+async def get_savings_endpoint(
+    savings_id: int,
+    run: SessionRunner = Depends(session_runner),
+    user: User = Depends(get_current_user)
 ):
     """Get a specific savings transaction"""
-    return get_savings_by_id(db, savings_id, user.id)
+    return await run(get_savings_by_id, savings_id, user.id)
 
 
-@router.put("/{savings_id}", response_model=SavingsBase)
-def update_savings_endpoint(
+@routes.put("/{savings_id}", response_model=SavingsBase)
+async def update_savings_endpoint(
     savings_id: int,
     data: SavingsUpdateRequest,
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user)
+    run: SessionRunner = Depends(session_runner),
+    user: User = Depends(get_current_user)
 ):
     """Update a savings transaction"""
     try:
-        return update_savings(db, savings_id, user.id, data)
+        return await run(update_savings, savings_id, user.id, data)
     except HTTPException:
         raise
     except Exception as e:
@@ -89,32 +193,18 @@ def update_savings_endpoint(
         )
 
 
-@router.delete("/{savings_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_savings_endpoint(
+@routes.delete("/{savings_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_savings_endpoint(
     savings_id: int,
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user)
+    run: SessionRunner = Depends(session_runner),
+    user: User = Depends(get_current_user)
 ):
     """Delete a savings transaction"""
     try:
-        delete_savings(db, savings_id, user.id)
+        await run(delete_savings, savings_id, user.id)
         app_logger.info(f"Savings deleted: {savings_id} by user {user.id}")
     except HTTPException:
         raise
     except Exception as e:
         app_logger.error(f"Delete savings error for user {user.id}: {str(e)}", exc_info=True)
         raise
-
-
-@router.get("/balance", response_model=BalanceResponse)
-def get_balance_endpoint(
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user)
-):
-    """Get balance information for the current user"""
-    try:
-        balance_info = get_balance(db, user.id)
-        return BalanceResponse(**balance_info)
-    except Exception as e:
-        app_logger.error(f"Get balance error for user {user.id}: {str(e)}", exc_info=True)
-        raise
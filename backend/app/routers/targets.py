@@ -1,9 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import List, Optional, Union
 
-from app.db.session import get_db
 from app.utils.jwt import get_current_user
+from app.models.user import User
 from app.models.target import Target
 from app.schemas.target import (
     TargetBase,
@@ -13,43 +12,63 @@ from app.schemas.target import (
 from app.services.targets_service import (
     create_target,
     get_targets,
+    get_targets_page,
     get_target_by_id,
     update_target,
     delete_target,
 )
+from app.schemas.pagination import CursorPage
+from app.routers.dual_routes import DualRouter, SessionRunner, session_runner
+from app.utils.response_cache import cached_response_async
 from app.core.logging_config import app_logger
 
 router = APIRouter()
+# AsyncSession versions of the shared handlers, used when DB_ASYNC_ENABLED is set
+async_router = APIRouter()
+routes = DualRouter(router, async_router)
 
 
-@router.get("/", response_model=List[TargetBase])
-def list_targets(
+@routes.get("/", response_model=Union[List[TargetBase], CursorPage[TargetBase]])
+async def list_targets(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     status_filter: Optional[str] = None,
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Keyset cursor; send an empty value for the first page"),
+    run: SessionRunner = Depends(session_runner),
+    user: User = Depends(get_current_user)
 ):
     """List all targets for the current user"""
     try:
-        targets = get_targets(db, user.id, skip, limit)
-        if status_filter:
-            targets = [t for t in targets if t.status == status_filter]
-        return targets
+        if cursor is not None:
+            async def build_page():
+                items, next_cursor = await run(get_targets_page, user.id, cursor, limit, status_filter)
+                return {"items": items, "next_cursor": next_cursor}
+
+            return await cached_response_async(
+                request, user, "targets.page", build_page, schema=CursorPage[TargetBase],
+                params={"cursor": cursor, "limit": limit, "status_filter": status_filter}
+            )
+        return await cached_response_async(
+            request, user, "targets.list",
+            lambda: run(get_targets, user.id, skip, limit, status_filter),
+            schema=List[TargetBase],
+            params={"skip": skip, "limit": limit, "status_filter": status_filter}
+        )
     except Exception as e:
         app_logger.error(f"List targets error for user {user.id}: {str(e)}", exc_info=True)
         raise
 
 
-@router.post("/", response_model=TargetBase, status_code=status.HTTP_201_CREATED)
-def create_target_endpoint(
+@routes.post("/", response_model=TargetBase, status_code=status.HTTP_201_CREATED)
+async def create_target_endpoint(
     data: TargetCreateRequest,
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user)
+    run: SessionRunner = Depends(session_runner),
+    user: User = Depends(get_current_user)
 ):
     """Create a new target"""
     try:
-        target = create_target(db, user.id, data)
+        target = await run(create_target, user.id, data)
         app_logger.info(f"Target created: {target.id} by user {user.id}")
         return target
     except HTTPException:
@@ -62,26 +81,26 @@ def create_target_endpoint(
         )
 
 
-@router.get("/{target_id}", response_model=TargetBase)
-def get_target_endpoint(
+@routes.get("/{target_id}", response_model=TargetBase)
+async def get_target_endpoint(
     target_id: int,
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user)
+    run: SessionRunner = Depends(session_runner),
+    user: User = Depends(get_current_user)
 ):
     """Get a specific target"""
-    return get_target_by_id(db, target_id, user.id)
+    return await run(get_target_by_id, target_id, user.id)
 
 
-@router.put("/{target_id}", response_model=TargetBase)
-def update_target_endpoint(
+@routes.put("/{target_id}", response_model=TargetBase)
+async def update_target_endpoint(
     target_id: int,
     data: TargetUpdateRequest,
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user)
+    run: SessionRunner = Depends(session_runner),
+    user: User = Depends(get_current_user)
 ):
     """Update a target"""
     try:
-        return update_target(db, target_id, user.id, data)
+        return await run(update_target, target_id, user.id, data)
     except HTTPException:
         raise
     except Exception as e:
@@ -92,15 +111,15 @@ def update_target_endpoint(
         )
 
 
-@router.delete("/{target_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_target_endpoint(
+@routes.delete("/{target_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_target_endpoint(
     target_id: int,
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user)
+    run: SessionRunner = Depends(session_runner),
+    user: User = Depends(get_current_user)
 ):
     """Delete a target"""
     try:
-        delete_target(db, target_id, user.id)
+        await run(delete_target, target_id, user.id)
         app_logger.info(f"Target deleted: {target_id} by user {user.id}")
     except HTTPException:
         raise
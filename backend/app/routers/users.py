@@ -1,9 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, UploadFile, File
 from sqlalchemy.orm import Session
-from typing import List
-import os
-import shutil
-import pathlib
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
 
 from app.schemas.user import (
     UserBase, UpdateUserRequest, UpdateTelegramIDRequest,
@@ -12,7 +10,10 @@ from app.schemas.user import (
 from app.utils.jwt import get_current_user
 from app.models.user import User
 from app.models.user_telegram import UserTelegramID
-from app.models.alert import Alert
+from app.schemas.alert import AlertListResponse
+from app.utils.response_cache import cached_response
+from app.services.avatar_service import update_avatar
+from app.services.alerts_service import get_alerts_page, latest_broadcast_id, mark_alert_read, mark_all_alerts_read
 from app.db.session import get_db
 from app.core.logging_config import app_logger
 
@@ -59,74 +60,13 @@ async def upload_avatar(
     """Upload user avatar image"""
     try:
         app_logger.info(f"Avatar upload request received for user {user.id}, filename: {avatar_file.filename}")
-        
-        # Validate file type
-        if not avatar_file.filename:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No file provided"
-            )
-        
-        file_ext = os.path.splitext(avatar_file.filename)[1].lower()
-        if file_ext not in ['.png', '.jpg', '.jpeg', '.gif', '.webp']:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid file type. Only PNG, JPG, JPEG, GIF, WEBP allowed. Got: {file_ext}"
-            )
-        
-        # Validate file size (max 5MB)
-        contents = await avatar_file.read()
-        file_size = len(contents)
-        app_logger.info(f"File size: {file_size} bytes")
-        
-        if file_size > 5 * 1024 * 1024:  # 5MB
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File size too large. Maximum size is 5MB."
-            )
-        
-        if file_size == 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File is empty"
-            )
-        
-        # Save avatar file - use absolute path from project root
-        project_root = pathlib.Path(__file__).parent.parent.parent.parent
-        avatar_dir = project_root / "dashboard" / "public" / "avatars"
-        avatar_dir.mkdir(parents=True, exist_ok=True)
-        app_logger.info(f"Avatar directory: {avatar_dir}")
-        
-        # Use user ID as filename
-        avatar_filename = f"user_{user.id}{file_ext}"
-        file_path = avatar_dir / avatar_filename
-        
-        # Delete old avatar if exists
-        if file_path.exists():
-            try:
-                file_path.unlink()
-                app_logger.info(f"Deleted old avatar: {file_path}")
-            except Exception as e:
-                app_logger.warning(f"Could not delete old avatar: {e}")
-        
-        # Write file
-        with open(str(file_path), "wb") as buffer:
-            buffer.write(contents)
-        
-        app_logger.info(f"Avatar file saved to: {file_path}")
-        
-        # Update user record with avatar URL
-        avatar_url = f"/avatars/{avatar_filename}"
-        user.avatar_url = avatar_url
-        db.commit()
-        db.refresh(user)
-        
-        app_logger.info(f"Avatar uploaded successfully for user {user.id}: {avatar_url}")
+        user = await update_avatar(db, user, avatar_file)
+        app_logger.info(f"Avatar uploaded successfully for user {user.id}: {user.avatar_url}")
         return user
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await run_in_threadpool(db.rollback)
         error_msg = f"Upload avatar error for user {user.id}: {str(e)}"
         app_logger.error(error_msg, exc_info=True)
         raise HTTPException(
@@ -258,32 +198,30 @@ def delete_telegram_id(
         )
 
 
-@router.get("/me/alerts")
+@router.get("/me/alerts", response_model=AlertListResponse)
 def get_alerts(
+    request: Request,
     skip: int = 0,
     limit: int = 50,
     unread_only: bool = False,
+    cursor: Optional[str] = Query(None, description="Keyset cursor; send an empty value for the first page"),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    """Get alerts for current user"""
+    """Get personal and broadcast alerts for current user"""
     try:
-        query = db.query(Alert).filter(Alert.user_id == user.id)
-        
-        if unread_only:
-            query = query.filter(Alert.is_read == False)
-        
-        total = query.count()
-        alerts = query.order_by(Alert.created_at.desc()).offset(skip).limit(limit).all()
-        
-        return {
-            "alerts": alerts,
-            "total": total,
-            "unread_count": db.query(Alert).filter(
-                Alert.user_id == user.id,
-                Alert.is_read == False
-            ).count()
-        }
+        return cached_response(
+            request, user, "alerts.list",
+            lambda: get_alerts_page(db, user, unread_only, skip, limit, cursor),
+            schema=AlertListResponse,
+            # Broadcasts do not touch users' data_version, so the newest one is part of the key
+            params={
+                "skip": skip, "limit": limit, "unread_only": unread_only, "cursor": cursor,
+                "broadcast": latest_broadcast_id(db)
+            }
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         app_logger.error(f"Get alerts error for user {user.id}: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -300,22 +238,7 @@ def mark_alert_as_read(
 ):
     """Mark an alert as read"""
     try:
-        alert = db.query(Alert).filter(
-            Alert.id == alert_id,
-            Alert.user_id == user.id
-        ).first()
-        
-        if not alert:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Alert not found"
-            )
-        
-        alert.is_read = True
-        db.commit()
-        db.refresh(alert)
-        
-        return {"success": True, "alert": alert}
+        return {"success": True, "alert": mark_alert_read(db, user, alert_id)}
     except HTTPException:
         raise
     except Exception as e:
@@ -334,11 +257,7 @@ def mark_all_alerts_as_read(
 ):
     """Mark all alerts as read for current user"""
     try:
-        db.query(Alert).filter(
-            Alert.user_id == user.id,
-            Alert.is_read == False
-        ).update({"is_read": True})
-        db.commit()
+        mark_all_alerts_read(db, user)
         
         return {"success": True, "message": "All alerts marked as read"}
     except Exception as e:
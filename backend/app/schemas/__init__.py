@@ -1,6 +1,9 @@
 from app.schemas.auth import RegisterRequest, LoginRequest, TelegramLoginRequest, TokenResponse
 from app.schemas.user import UserBase, UpdateUserRequest, UpdateTelegramIDRequest
-from app.schemas.savings import SavingsBase, SavingsCreateRequest, SavingsUpdateRequest, BalanceResponse
+from app.schemas.savings import (
+    SavingsBase, SavingsCreateRequest, SavingsUpdateRequest, BalanceResponse,
+    SavingsImportError, SavingsImportResponse
+)
 from app.schemas.loan import (
     LoanBase, LoanCreateRequest, LoanUpdateRequest,
     LoanPaymentBase, LoanPaymentCreateRequest
@@ -11,6 +14,7 @@ from app.schemas.bank import (
     BankAccountCreateRequest, BankAccountUpdateRequest,
     BankListResponse, BankAccountListResponse
 )
+from app.schemas.alert import AlertBase, AlertListResponse
 from app.schemas.admin import (
     UserListResponse, UserDetailResponse, UserSuspendRequest,
     MaintenanceModeRequest, MaintenanceModeResponse,
@@ -22,12 +26,14 @@ __all__ = [
     "RegisterRequest", "LoginRequest", "TelegramLoginRequest", "TokenResponse",
     "UserBase", "UpdateUserRequest", "UpdateTelegramIDRequest",
     "SavingsBase", "SavingsCreateRequest", "SavingsUpdateRequest", "BalanceResponse",
+    "SavingsImportError", "SavingsImportResponse",
     "LoanBase", "LoanCreateRequest", "LoanUpdateRequest",
     "LoanPaymentBase", "LoanPaymentCreateRequest",
     "TargetBase", "TargetCreateRequest", "TargetUpdateRequest",
     "BankBase", "BankAccountBase", "BankAccountResponse",
     "BankAccountCreateRequest", "BankAccountUpdateRequest",
     "BankListResponse", "BankAccountListResponse",
+    "AlertBase", "AlertListResponse",
     "UserListResponse", "UserDetailResponse", "UserSuspendRequest",
     "MaintenanceModeRequest", "MaintenanceModeResponse",
     "BroadcastAlertRequest", "SendAlertToUserRequest",
@@ -1,7 +1,7 @@
 """
 Admin Schemas
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from datetime import datetime
 
@@ -13,6 +13,7 @@ class UserListResponse(BaseModel):
     total: int
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
 
 
 class UserDetailResponse(UserBase):
@@ -48,6 +49,23 @@ class SendAlertToUserRequest(BaseModel):
     title: Optional[str] = Field(None, max_length=200, description="Alert title")
 
 
+class JobResponse(BaseModel):
+    id: int
+    type: str
+    status: str
+    total: int
+    sent: int
+    failed: int
+    pending: int
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class BankLogoUpdateRequest(BaseModel):
     brand_color: Optional[str] = Field(None, description="Bank brand color (hex)")
     logo_background: Optional[str] = Field(None, description="Logo background color (hex)")
@@ -71,4 +89,11 @@ class AdminStatsResponse(BaseModel):
     active_users: int
     suspended_users: int
     admin_users: int
+    total_savings_income: float
+    total_savings_expense: float
+    savings_transactions: int
+    active_loans: int
+    active_loans_principal: float
+    total_alerts: int
+    unread_alerts: int
 
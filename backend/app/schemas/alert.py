@@ -0,0 +1,21 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from typing import List, Optional
+
+
+class AlertBase(BaseModel):
+    id: int
+    user_id: Optional[int] = None
+    title: Optional[str] = None
+    message: str
+    is_read: bool
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class AlertListResponse(BaseModel):
+    alerts: List[AlertBase]
+    total: int
+    unread_count: int
+    next_cursor: Optional[str] = None
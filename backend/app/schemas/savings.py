@@ -1,6 +1,7 @@
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 from datetime import date
-from typing import Optional
+from datetime import date as date_type
+from typing import List, Optional
 
 
 class SavingsBase(BaseModel):
@@ -31,7 +32,8 @@ class SavingsCreateRequest(BaseModel):
 
 
 class SavingsUpdateRequest(BaseModel):
-    date: Optional[date] = None
+    # date_type alias: the field name would otherwise shadow the type
+    date: Optional[date_type] = None
     type: Optional[str] = None
     category: Optional[str] = None
     amount: Optional[float] = Field(default=None, gt=0, description="Amount must be greater than 0")
@@ -45,6 +47,17 @@ class SavingsUpdateRequest(BaseModel):
         return v
 
 
+class SavingsImportError(BaseModel):
+    line: int
+    errors: List[str]
+
+
+class SavingsImportResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: List[SavingsImportError]
+
+
 class BalanceResponse(BaseModel):
     total_balance: float
     total_income: float
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, ConfigDict
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, ConfigDict, computed_field
+from typing import Dict, Optional, List
 from datetime import datetime
 
 
@@ -15,6 +15,14 @@ class UserBase(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+    @computed_field
+    @property
+    def avatar_thumbnails(self) -> Dict[int, str]:
+        """Uploaded avatars by thumbnail size, so clients can pick the smallest that fits"""
+        # Imported here: app.services imports the schemas
+        from app.services.avatar_service import avatar_thumbnails
+        return avatar_thumbnails(self.avatar_url)
+
 
 class UpdateUserRequest(BaseModel):
     name: Optional[str] = None
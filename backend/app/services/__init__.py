@@ -1,35 +1,71 @@
 from app.services.auth_service import (
     register_user,
     login_user,
+    throttled_login,
     telegram_login,
     get_or_create_google_user,
+    register_user_async,
+    login_user_async,
+    telegram_login_async,
+    get_or_create_google_user_async,
 )
 from app.services.savings_service import (
     create_savings,
     get_savings,
+    get_savings_page,
     get_savings_by_id,
     update_savings,
     delete_savings,
     get_balance,
+    create_savings_async,
+    get_savings_async,
+    get_savings_page_async,
+    get_savings_by_id_async,
+    update_savings_async,
+    delete_savings_async,
+    get_balance_async,
 )
 from app.services.loans_service import (
     create_loan,
     get_loans,
+    get_loans_page,
     get_loan_by_id,
     update_loan,
     delete_loan,
     add_payment,
     get_payments,
     get_total_active_loans_amount,
+    create_loan_async,
+    get_loans_async,
+    get_loans_page_async,
+    get_loan_by_id_async,
+    update_loan_async,
+    delete_loan_async,
+    add_payment_async,
+    get_payments_async,
+    get_total_active_loans_amount_async,
 )
 from app.services.targets_service import (
     create_target,
     get_targets,
+    get_targets_page,
     get_target_by_id,
     update_target,
     delete_target,
     get_total_target_current_amount,
+    create_target_async,
+    get_targets_async,
+    get_targets_page_async,
+    get_target_by_id_async,
+    update_target_async,
+    delete_target_async,
+    get_total_target_current_amount_async,
 )
+from app.services.savings_import_service import import_savings
+from app.services.export_service import iter_savings_export_rows, iter_loan_export_rows
+from app.services.overview_service import get_overview, get_overview_async
+from app.services.admin_service import get_dashboard_stats, invalidate_admin_stats
+from app.services.jobs_service import enqueue_job, get_job
 from app.services.banks_service import (
     get_all_banks,
     get_bank_by_id,
@@ -43,28 +79,68 @@ from app.services.banks_service import (
 __all__ = [
     "register_user",
     "login_user",
+    "throttled_login",
     "telegram_login",
     "get_or_create_google_user",
+    "register_user_async",
+    "login_user_async",
+    "telegram_login_async",
+    "get_or_create_google_user_async",
     "create_savings",
     "get_savings",
+    "get_savings_page",
     "get_savings_by_id",
     "update_savings",
     "delete_savings",
     "get_balance",
+    "create_savings_async",
+    "get_savings_async",
+    "get_savings_page_async",
+    "get_savings_by_id_async",
+    "update_savings_async",
+    "delete_savings_async",
+    "get_balance_async",
     "create_loan",
     "get_loans",
+    "get_loans_page",
     "get_loan_by_id",
     "update_loan",
     "delete_loan",
     "add_payment",
     "get_payments",
     "get_total_active_loans_amount",
+    "create_loan_async",
+    "get_loans_async",
+    "get_loans_page_async",
+    "get_loan_by_id_async",
+    "update_loan_async",
+    "delete_loan_async",
+    "add_payment_async",
+    "get_payments_async",
+    "get_total_active_loans_amount_async",
     "create_target",
     "get_targets",
+    "get_targets_page",
     "get_target_by_id",
     "update_target",
     "delete_target",
     "get_total_target_current_amount",
+    "create_target_async",
+    "get_targets_async",
+    "get_targets_page_async",
+    "get_target_by_id_async",
+    "update_target_async",
+    "delete_target_async",
+    "get_total_target_current_amount_async",
+    "import_savings",
+    "iter_savings_export_rows",
+    "iter_loan_export_rows",
+    "get_overview",
+    "get_overview_async",
+    "get_dashboard_stats",
+    "invalidate_admin_stats",
+    "enqueue_job",
+    "get_job",
     "get_all_banks",
     "get_bank_by_id",
     "create_bank_account",
@@ -0,0 +1,70 @@
+"""
+Admin Service - platform statistics for the admin dashboard
+
+All figures come from a single statement: user counts are conditional
+aggregates over one pass of the users table and the platform totals are
+uncorrelated scalar subqueries. The result is cached per worker for
+ADMIN_STATS_CACHE_TTL_SECONDS under the principal cache's users_version():
+any committed insert, change or delete of a user (registrations, suspend,
+role, delete) in any worker on the host invalidates it at once. Savings,
+loan and alert totals show up once the entry expires.
+"""
+from typing import Any, Dict
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.alert import Alert
+from app.models.loan import Loan
+from app.models.savings import Savings
+from app.models.user import User
+from app.utils.principal_cache import principal_cache
+from app.utils.response_cache import USER_SET_CHANGED, ResponseCache
+
+_STATS_KEY = "admin_stats"
+
+admin_stats_cache = ResponseCache(max_entries=1, ttl_seconds=settings.ADMIN_STATS_CACHE_TTL_SECONDS)
+
+
+def _count_where(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _scalar(column):
+    return select(column).scalar_subquery()
+
+
+def _admin_stats_statement():
+    return select(
+        func.count(User.id).label("total_users"),
+        _count_where(User.is_active == True).label("active_users"),
+        _count_where(User.is_active == False).label("suspended_users"),
+        _count_where(User.role == "admin").label("admin_users"),
+        _scalar(func.coalesce(func.sum(case((Savings.type == "IN", Savings.amount), else_=0.0)), 0.0)).label("total_savings_income"),
+        _scalar(func.coalesce(func.sum(case((Savings.type == "OUT", Savings.amount), else_=0.0)), 0.0)).label("total_savings_expense"),
+        _scalar(func.count(Savings.id)).label("savings_transactions"),
+        _scalar(_count_where(Loan.status == "active")).label("active_loans"),
+        _scalar(func.coalesce(func.sum(case((Loan.status == "active", Loan.principal), else_=0.0)), 0.0)).label("active_loans_principal"),
+        _scalar(func.count(Alert.id)).label("total_alerts"),
+        # Broadcast read state lives per user (alerts_service); count personal alerts
+        _scalar(_count_where(and_(Alert.user_id.isnot(None), Alert.is_read == False))).label("unread_alerts"),
+    ).select_from(User)
+
+
+def get_dashboard_stats(db: Session) -> Dict[str, Any]:
+    """Get dashboard statistics, served from the short-lived cache when fresh"""
+    # Taken before the query, so a user change committed meanwhile is not masked
+    version = principal_cache.table.users_version()
+    entry = admin_stats_cache.get(_STATS_KEY)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    stats = dict(db.execute(_admin_stats_statement()).one()._mapping)
+    admin_stats_cache.set(_STATS_KEY, (version, stats))
+    return stats
+
+
+def invalidate_admin_stats() -> None:
+    """Drop cached statistics in every worker on the host"""
+    admin_stats_cache.delete(_STATS_KEY)
+    principal_cache.table.bump({USER_SET_CHANGED})
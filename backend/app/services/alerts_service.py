@@ -0,0 +1,176 @@
+"""
+Alerts Service - personal alerts plus fan-out-on-read broadcasts
+
+A broadcast is stored once as an alert with user_id NULL and is visible to
+every user created before it, so broadcasting costs one row however many
+users exist. Read state for broadcasts is per user:
+- users.broadcast_read_id: every broadcast with id <= this is read
+  ("read all" just moves the watermark);
+- broadcast_receipts: broadcasts read one by one above the watermark.
+
+Listings query personal and broadcast alerts separately, each an index range
+scan on (user_id, created_at, id), and merge the two sorted pages.
+"""
+from datetime import datetime
+from heapq import merge
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, exists, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.alert import Alert, BroadcastReceipt
+from app.models.user import User
+from app.utils.pagination import encode_cursor, keyset_page
+from app.utils.response_cache import bump_data_version
+
+_SORT_COLUMNS = [Alert.created_at, Alert.id]
+
+
+def _sort_key(alert: Alert):
+    return (alert.created_at, alert.id)
+
+
+def _broadcasts_for(user: User):
+    """Broadcast alerts a user can see (sent after they signed up)"""
+    return and_(Alert.user_id.is_(None), Alert.created_at >= user.created_at)
+
+
+def _receipt_exists(user: User):
+    return exists().where(BroadcastReceipt.user_id == user.id, BroadcastReceipt.alert_id == Alert.id)
+
+
+def _unread_broadcasts_for(user: User):
+    return and_(_broadcasts_for(user), Alert.id > user.broadcast_read_id, ~_receipt_exists(user))
+
+
+def _alert_dict(alert: Alert, is_read: bool) -> Dict[str, Any]:
+    return {
+        "id": alert.id,
+        "user_id": alert.user_id,
+        "title": alert.title,
+        "message": alert.message,
+        "is_read": is_read,
+        "created_at": alert.created_at,
+    }
+
+
+def create_broadcast_alert(db: Session, title: Optional[str], message: str) -> Alert:
+    """Store a broadcast once; the caller commits"""
+    alert = Alert(user_id=None, title=title, message=message, is_read=False)
+    db.add(alert)
+    db.flush()
+    return alert
+
+
+def latest_broadcast_id(db: Session) -> int:
+    """Id of the newest broadcast; part of the alert list cache key"""
+    return db.query(func.max(Alert.id)).filter(Alert.user_id.is_(None)).scalar() or 0
+
+
+def _alert_counts(db: Session, user: User) -> Dict[str, int]:
+    def count(*criteria):
+        return select(func.count(Alert.id)).where(*criteria).scalar_subquery()
+
+    row = db.execute(select(
+        count(Alert.user_id == user.id).label("personal"),
+        count(Alert.user_id == user.id, Alert.is_read == False).label("personal_unread"),
+        count(_broadcasts_for(user)).label("broadcast"),
+        count(_unread_broadcasts_for(user)).label("broadcast_unread"),
+    )).one()
+    return {
+        "total": row.personal + row.broadcast,
+        "unread": row.personal_unread + row.broadcast_unread,
+    }
+
+
+def _broadcast_read_ids(db: Session, user: User, alerts: List[Alert]) -> set:
+    ids = [a.id for a in alerts if a.id > user.broadcast_read_id]
+    if not ids:
+        return set()
+    return set(db.execute(
+        select(BroadcastReceipt.alert_id).where(BroadcastReceipt.user_id == user.id, BroadcastReceipt.alert_id.in_(ids))
+    ).scalars().all())
+
+
+def get_alerts_page(
+    db: Session,
+    user: User,
+    unread_only: bool = False,
+    skip: int = 0,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    """Personal and broadcast alerts newest first, by cursor when given, else by skip"""
+    personal = db.query(Alert).filter(Alert.user_id == user.id)
+    broadcasts = db.query(Alert).filter(_unread_broadcasts_for(user) if unread_only else _broadcasts_for(user))
+    if unread_only:
+        personal = personal.filter(Alert.is_read == False)
+
+    if cursor is not None:
+        personal_rows, personal_next = keyset_page(personal, _SORT_COLUMNS, _sort_key, cursor, limit)
+        broadcast_rows, broadcast_next = keyset_page(broadcasts, _SORT_COLUMNS, _sort_key, cursor, limit)
+        merged = list(merge(personal_rows, broadcast_rows, key=_sort_key, reverse=True))
+        page = merged[:limit]
+        has_more = len(merged) > limit or personal_next is not None or broadcast_next is not None
+        next_cursor = encode_cursor(_sort_key(page[-1])) if page and has_more else None
+    else:
+        # Each side needs skip + limit rows to place the requested slice
+        order = (Alert.created_at.desc(), Alert.id.desc())
+        personal_rows = personal.order_by(*order).limit(skip + limit).all()
+        broadcast_rows = broadcasts.order_by(*order).limit(skip + limit).all()
+        page = list(merge(personal_rows, broadcast_rows, key=_sort_key, reverse=True))[skip:skip + limit]
+        next_cursor = None
+
+    read_receipts = set() if unread_only else _broadcast_read_ids(db, user, [a for a in page if a.user_id is None])
+    alerts = [
+        _alert_dict(a, a.is_read if a.user_id is not None else (a.id <= user.broadcast_read_id or a.id in read_receipts))
+        for a in page
+    ]
+    counts = _alert_counts(db, user)
+    return {
+        "alerts": alerts,
+        "total": counts["unread"] if unread_only else counts["total"],
+        "next_cursor": next_cursor,
+        "unread_count": counts["unread"],
+    }
+
+
+def mark_alert_read(db: Session, user: User, alert_id: int) -> Dict[str, Any]:
+    """Mark one personal or broadcast alert as read for user"""
+    alert = db.query(Alert).filter(
+        Alert.id == alert_id,
+        or_(Alert.user_id == user.id, _broadcasts_for(user))
+    ).first()
+    if not alert:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Alert not found"
+        )
+
+    if alert.user_id is not None:
+        alert.is_read = True
+    elif alert.id > user.broadcast_read_id and db.get(BroadcastReceipt, (user.id, alert.id)) is None:
+        db.add(BroadcastReceipt(user_id=user.id, alert_id=alert.id, read_at=datetime.utcnow()))
+    bump_data_version(db, user.id)
+    db.commit()
+    return _alert_dict(alert, True)
+
+
+def mark_all_alerts_read(db: Session, user: User) -> None:
+    """Mark every alert read for user: personal rows are updated, broadcasts move the watermark"""
+    db.query(Alert).filter(
+        Alert.user_id == user.id,
+        Alert.is_read == False
+    ).update({"is_read": True})
+
+    watermark = latest_broadcast_id(db)
+    if watermark > user.broadcast_read_id:
+        db.query(User).filter(User.id == user.id).update({User.broadcast_read_id: watermark})
+        # Receipts at or below the watermark are now implied by it
+        db.query(BroadcastReceipt).filter(
+            BroadcastReceipt.user_id == user.id,
+            BroadcastReceipt.alert_id <= watermark
+        ).delete(synchronize_session=False)
+    bump_data_version(db, user.id)
+    db.commit()
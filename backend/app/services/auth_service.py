@@ -1,34 +1,91 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from app.models.user import User
+from app.models.user_telegram import UserTelegramID
 from app.schemas.auth import RegisterRequest, LoginRequest, TelegramLoginRequest
-from app.core.security import hash_password, verify_password, create_access_token
-import os
-import pathlib
+from math import ceil
+from typing import Awaitable, Callable, Optional
+
+from app.core.security import hash_password, verify_and_update_password, create_access_token
+from app.core.maintenance import maintenance
+from app.core.password_pool import password_pool
+from app.utils.rate_limit import login_throttle
 
 
 def check_maintenance_mode() -> tuple[bool, str]:
     """Check if maintenance mode is active. Returns (is_maintenance, message)"""
-    project_root = pathlib.Path(__file__).parent.parent.parent.parent
-    maintenance_file = project_root / "maintenance_mode.txt"
-    
-    if maintenance_file.exists():
-        with open(maintenance_file, "r", encoding="utf-8") as f:
-            content = f.read().strip()
-            if content:
-                return (True, content)
-    return (False, "")
+    return maintenance.status()
 
 
-def register_user(db: Session, request: RegisterRequest) -> User:
-    """Register a new user"""
-    # Check maintenance mode - block all new registrations during maintenance
+def _check_registration_open() -> None:
+    # Block all new registrations during maintenance
     is_maintenance, maintenance_message = check_maintenance_mode()
     if is_maintenance:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=maintenance_message or "System is under maintenance. Registration is temporarily disabled. Please try again later."
         )
+
+
+def _check_login_allowed(user: User) -> None:
+    # Block non-admin users during maintenance
+    is_maintenance, maintenance_message = check_maintenance_mode()
+    if is_maintenance and user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=maintenance_message or "System is under maintenance. Please try again later."
+        )
+
+
+class InvalidCredentials(HTTPException):
+    """Wrong email or password; counted by the failed-login throttle"""
+
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password"
+        )
+
+
+async def throttled_login(attempt: Callable[[], Awaitable[dict]], email: str, client_ip: Optional[str]) -> dict:
+    """
+    Run a login attempt (login_user or login_user_async) behind the failed-login throttle
+
+    Refused with 429 before any bcrypt work once too many attempts for the
+    email or client IP have failed; InvalidCredentials counts as a failure and
+    a successful login clears the email's count.
+    """
+    retry_after = await login_throttle.check(email, client_ip)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts. Please try again later.",
+            headers={"Retry-After": str(max(1, ceil(retry_after)))}
+        )
+    try:
+        result = await attempt()
+    except InvalidCredentials:
+        await login_throttle.record_failure(email, client_ip)
+        raise
+    await login_throttle.reset(email)
+    return result
+
+
+def create_user_token(user: User) -> str:
+    """Access token for user (the role claim is informational; authorization always reads the current role)"""
+    return create_access_token(data={"sub": str(user.id), "role": user.role})
+
+
+def _token_response(user: User) -> dict:
+    return {"access_token": create_user_token(user), "token_type": "bearer"}
+
+
+def register_user(db: Session, request: RegisterRequest) -> User:
+    """Register a new user"""
+    # Check maintenance mode - block all new registrations during maintenance
+    _check_registration_open()
     
     # Check if user already exists
     existing_user = db.query(User).filter(User.email == request.email).first()
@@ -42,7 +99,7 @@ def register_user(db: Session, request: RegisterRequest) -> User:
     user = User(
         name=request.name,
         email=request.email,
-        password_hash=hash_password(request.password)
+        password_hash=password_pool.run(hash_password, request.password)
     )
     db.add(user)
     db.commit()
@@ -51,21 +108,13 @@ def register_user(db: Session, request: RegisterRequest) -> User:
 
 
 def login_user(db: Session, request: LoginRequest) -> dict:
-    """Login user and return JWT token"""
+    """Login user and return JWT token (call through throttled_login)"""
     user = db.query(User).filter(User.email == request.email).first()
     if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password"
-        )
+        raise InvalidCredentials()
 
     # Check maintenance mode - block non-admin users
-    is_maintenance, maintenance_message = check_maintenance_mode()
-    if is_maintenance and user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=maintenance_message or "System is under maintenance. Please try again later."
-        )
+    _check_login_allowed(user)
 
     if not user.password_hash:
         raise HTTPException(
@@ -73,21 +122,21 @@ def login_user(db: Session, request: LoginRequest) -> dict:
             detail="Password not set. Please use Google OAuth or set password."
         )
 
-    if not verify_password(request.password, user.password_hash):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password"
-        )
+    verified, new_hash = password_pool.run(verify_and_update_password, request.password, user.password_hash)
+    if not verified:
+        raise InvalidCredentials()
+
+    # Rehash transparently when BCRYPT_ROUNDS changed
+    if new_hash:
+        user.password_hash = new_hash
+        db.commit()
 
     # Create access token
-    access_token = create_access_token(data={"sub": str(user.id)})
-    return {"access_token": access_token, "token_type": "bearer"}
+    return _token_response(user)
 
 
 def telegram_login(db: Session, request: TelegramLoginRequest) -> dict:
     """Login user via Telegram ID (supports multiple Telegram IDs)"""
-    from app.models.user_telegram import UserTelegramID
-    
     # First check in user_telegram_ids table (new multi-ID system)
     user_telegram = db.query(UserTelegramID).filter(
         UserTelegramID.telegram_id == request.telegram_id
@@ -106,16 +155,10 @@ def telegram_login(db: Session, request: TelegramLoginRequest) -> dict:
         )
 
     # Check maintenance mode - block non-admin users
-    is_maintenance, maintenance_message = check_maintenance_mode()
-    if is_maintenance and user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=maintenance_message or "System is under maintenance. Please try again later."
-        )
+    _check_login_allowed(user)
 
     # Create access token
-    access_token = create_access_token(data={"sub": str(user.id)})
-    return {"access_token": access_token, "token_type": "bearer"}
+    return _token_response(user)
 
 
 def get_or_create_google_user(db: Session, google_id: str, email: str, name: str, avatar_url: str = None) -> User:
@@ -169,3 +212,120 @@ def get_or_create_google_user(db: Session, google_id: str, email: str, name: str
     db.commit()
     db.refresh(user)
     return user
+
+
+# Async versions for AsyncSession. Password hashing is CPU-bound, so it runs
+# on the password pool instead of blocking the event loop.
+
+async def register_user_async(db: AsyncSession, request: RegisterRequest) -> User:
+    """Register a new user"""
+    _check_registration_open()
+
+    existing_user = await db.scalar(select(User).where(User.email == request.email))
+    if existing_user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+
+    user = User(
+        name=request.name,
+        email=request.email,
+        password_hash=await password_pool.run_async(hash_password, request.password)
+    )
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+async def login_user_async(db: AsyncSession, request: LoginRequest) -> dict:
+    """Login user and return JWT token (call through throttled_login)"""
+    user = await db.scalar(select(User).where(User.email == request.email))
+    if not user:
+        raise InvalidCredentials()
+
+    _check_login_allowed(user)
+
+    if not user.password_hash:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Password not set. Please use Google OAuth or set password."
+        )
+
+    verified, new_hash = await password_pool.run_async(
+        verify_and_update_password, request.password, user.password_hash
+    )
+    if not verified:
+        raise InvalidCredentials()
+
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+
+    return _token_response(user)
+
+
+async def telegram_login_async(db: AsyncSession, request: TelegramLoginRequest) -> dict:
+    """Login user via Telegram ID (supports multiple Telegram IDs)"""
+    user = await db.scalar(
+        select(User).join(UserTelegramID, UserTelegramID.user_id == User.id).where(
+            UserTelegramID.telegram_id == request.telegram_id
+        )
+    )
+    if user is None:
+        # Fallback to old single telegram_id field (backward compatibility)
+        user = await db.scalar(select(User).where(User.telegram_id == request.telegram_id))
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Telegram ID not found. Please register in the dashboard first and set your Telegram ID."
+        )
+
+    _check_login_allowed(user)
+    return _token_response(user)
+
+
+async def get_or_create_google_user_async(
+    db: AsyncSession,
+    google_id: str,
+    email: str,
+    name: str,
+    avatar_url: str = None
+) -> User:
+    """Get or create user from Google OAuth"""
+    user = await db.scalar(select(User).where(User.google_id == google_id))
+    if user:
+        _check_login_allowed(user)
+        return user
+
+    user = await db.scalar(select(User).where(User.email == email))
+    if user:
+        _check_login_allowed(user)
+        # Link Google ID to existing user
+        user.google_id = google_id
+        if not user.avatar_url and avatar_url:
+            user.avatar_url = avatar_url
+        await db.commit()
+        await db.refresh(user)
+        return user
+
+    # Block new user registration during maintenance
+    is_maintenance, maintenance_message = check_maintenance_mode()
+    if is_maintenance:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=maintenance_message or "System is under maintenance. Please try again later."
+        )
+
+    user = User(
+        name=name,
+        email=email,
+        google_id=google_id,
+        avatar_url=avatar_url
+    )
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
@@ -0,0 +1,220 @@
+"""
+Avatar Service - store profile pictures as content-hashed WebP thumbnails
+
+An upload is copied in chunks to a temporary file (hashed on the way and
+refused past AVATAR_MAX_BYTES), then decoded, cropped and resized to the
+AVATAR_SIZES squares and re-encoded as WebP in a small process pool. Files are
+named <hash>_<size>.webp, so a new picture always gets a new URL and
+/avatars/ can be served with AVATAR_CACHE_CONTROL (one year, immutable).
+avatar_url points at the largest size; avatar_thumbnails() gives the others.
+"""
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from contextlib import asynccontextmanager
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.bounded_pool import BoundedPool
+from app.core.config import settings
+from app.core.logging_config import app_logger
+from app.models.user import User
+from app.utils.avatar_images import render_avatar
+
+ALLOWED_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+AVATAR_CACHE_CONTROL = "public, max-age=31536000, immutable"
+CHUNK_SIZE = 64 * 1024
+# Hex digits of the sha256 used in filenames
+NAME_LENGTH = 32
+
+_HASHED_URL = re.compile(r"^/avatars/([0-9a-f]{%d})_\d+\.webp$" % NAME_LENGTH)
+_LEGACY_URL = re.compile(r"^/avatars/(user_\d+\.[a-z]+)$")
+
+avatar_pool = BoundedPool(
+    "process",
+    settings.AVATAR_POOL_WORKERS or min(2, os.cpu_count() or 1),
+    settings.AVATAR_POOL_MAX_QUEUE,
+    busy_detail="Too many avatar uploads. Please try again shortly.",
+    name="avatar"
+)
+
+
+def avatar_sizes() -> List[int]:
+    """Configured thumbnail sizes, smallest first"""
+    return sorted({int(size) for size in settings.AVATAR_SIZES.split(",") if size.strip()})
+
+
+def avatar_thumbnails(avatar_url: Optional[str]) -> Dict[int, str]:
+    """URL of each thumbnail size for a hashed avatar_url; empty for legacy or external avatars"""
+    hashed = _HASHED_URL.match(avatar_url or "")
+    if not hashed:
+        return {}
+    return {size: f"/avatars/{hashed.group(1)}_{size}.webp" for size in avatar_sizes()}
+
+
+def copy_upload(source: BinaryIO, max_bytes: int, chunk_size: int = CHUNK_SIZE) -> Tuple[str, str, int]:
+    """Copy source to a temporary file in chunks; returns (path, sha256 hex, size)"""
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(prefix="avatar-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"File size too large. Maximum size is {max_bytes // (1024 * 1024)}MB."
+                    )
+                digest.update(chunk)
+                out.write(chunk)
+        if size == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File is empty"
+            )
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, digest.hexdigest(), size
+
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: uploads are only serialized within the process
+    fcntl = None
+
+_thread_locks = [threading.Lock() for _ in range(256)]
+
+
+def _acquire_name(name: str):
+    """
+    Lock one content hash (striped by its first byte) across threads and workers
+
+    Held while a hash's files are rendered and the new URL committed, and while
+    an old hash is checked for users and deleted, so an upload of the same
+    picture can never commit a URL whose files are being removed.
+    """
+    stripe = int(name[:2], 16)
+    if fcntl is None:
+        _thread_locks[stripe].acquire()
+        return stripe
+    lock_dir = os.path.join(settings.AVATAR_DIR, ".locks")
+    os.makedirs(lock_dir, exist_ok=True)
+    # Every open() is a separate flock, so threads of one worker exclude each other too
+    fd = os.open(os.path.join(lock_dir, f"{stripe:02x}"), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+def _release_name(handle) -> None:
+    if fcntl is None:
+        _thread_locks[handle].release()
+    else:
+        os.close(handle)
+
+
+@asynccontextmanager
+async def _name_locked(name: str):
+    handle = await run_in_threadpool(_acquire_name, name)
+    try:
+        yield
+    finally:
+        await run_in_threadpool(_release_name, handle)
+
+
+def _validate_filename(avatar_file: UploadFile) -> None:
+    if not avatar_file.filename:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No file provided"
+        )
+    file_ext = os.path.splitext(avatar_file.filename)[1].lower()
+    if file_ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid file type. Only PNG, JPG, JPEG, GIF, WEBP allowed. Got: {file_ext}"
+        )
+
+
+def _set_avatar_url(db: Session, user: User, avatar_url: str) -> User:
+    user.avatar_url = avatar_url
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def _delete_unused_legacy(db: Session, user: User, avatar_url: Optional[str]) -> None:
+    """Delete the user's own pre-hash avatar (user_<id>.<ext>) once nobody points at it"""
+    legacy = _LEGACY_URL.match(avatar_url or "")
+    if not legacy or not legacy.group(1).startswith(f"user_{user.id}."):
+        return
+    if db.query(User.id).filter(User.avatar_url == avatar_url).first():
+        return
+    _unlink_avatar(legacy.group(1))
+
+
+def _delete_unused_hashed(db: Session, name: str) -> None:
+    """Delete a hash's files once nobody points at them; call with the name locked"""
+    if db.query(User.id).filter(User.avatar_url.like(f"/avatars/{name}\\_%", escape="\\")).first():
+        return
+    for size in avatar_sizes():
+        _unlink_avatar(f"{name}_{size}.webp")
+
+
+def _unlink_avatar(filename: str) -> None:
+    try:
+        os.unlink(os.path.join(settings.AVATAR_DIR, filename))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        app_logger.warning(f"Could not delete old avatar {filename}: {e}")
+
+
+async def update_avatar(db: Session, user: User, avatar_file: UploadFile) -> User:
+    """Store an uploaded avatar as WebP thumbnails, point the user at it and drop their old files"""
+    _validate_filename(avatar_file)
+
+    # Starlette has already spooled the part; copy it off the event loop
+    path, digest, size = await run_in_threadpool(copy_upload, avatar_file.file, settings.AVATAR_MAX_BYTES)
+    name = digest[:NAME_LENGTH]
+    sizes = avatar_sizes()
+    avatar_url = f"/avatars/{name}_{sizes[-1]}.webp"
+    previous = user.avatar_url
+    try:
+        await run_in_threadpool(os.makedirs, settings.AVATAR_DIR, exist_ok=True)
+        async with _name_locked(name):
+            filenames = await avatar_pool.run_async(
+                render_avatar, path, settings.AVATAR_DIR, name, sizes, settings.AVATAR_WEBP_QUALITY
+            )
+            user = await run_in_threadpool(_set_avatar_url, db, user, avatar_url)
+    except ValueError as e:
+        app_logger.warning(f"Rejected avatar upload ({size} bytes): {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File is not a valid image"
+        )
+    finally:
+        await run_in_threadpool(os.unlink, path)
+    app_logger.info(f"Avatar stored as {', '.join(filenames)} ({size} bytes uploaded)")
+
+    if previous and previous != avatar_url:
+        hashed = _HASHED_URL.match(previous)
+        if hashed:
+            async with _name_locked(hashed.group(1)):
+                await run_in_threadpool(_delete_unused_hashed, db, hashed.group(1))
+        else:
+            await run_in_threadpool(_delete_unused_legacy, db, user, previous)
+    return user
@@ -6,6 +6,7 @@ from app.schemas.bank import (
     BankAccountCreateRequest,
     BankAccountUpdateRequest
 )
+from app.utils.response_cache import bump_data_version
 
 
 # Bank Master Data Functions
@@ -54,6 +55,7 @@ def create_bank_account(
     )
     
     db.add(bank_account)
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(bank_account)
     return bank_account
@@ -132,6 +134,7 @@ def update_bank_account(
             ).update({"is_primary": False})
         bank_account.is_primary = request.is_primary
     
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(bank_account)
     return bank_account
@@ -145,5 +148,6 @@ def delete_bank_account(
     """Delete (soft delete) a bank account"""
     bank_account = get_bank_account_by_id(db, bank_account_id, user_id)
     bank_account.is_active = False
+    bump_data_version(db, user_id)
     db.commit()
 
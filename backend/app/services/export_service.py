@@ -0,0 +1,189 @@
+"""
+Export Service - streaming CSV/NDJSON export of savings and loans
+
+Rows are read as plain tuples with yield_per (a server-side cursor on
+PostgreSQL), encoded a chunk at a time and optionally gzip-compressed on
+the fly, so memory stays flat however much history a user has. The first
+chunk (CSV header or first row) is emitted as soon as it is ready.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import date
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.models.loan import Loan, LoanPayment
+from app.models.savings import Savings
+from app.utils.calculations import loan_remaining_expression
+
+EXPORT_FORMATS = ("csv", "ndjson")
+EXPORT_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+# Rows fetched from the database per round trip
+EXPORT_FETCH_SIZE = 1000
+# Encoded bytes buffered before a chunk is sent
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+SAVINGS_EXPORT_COLUMNS = ["id", "date", "type", "category", "amount", "note"]
+LOAN_EXPORT_COLUMNS = [
+    "id", "borrower_name", "principal", "paid", "remaining_amount",
+    "start_date", "due_date", "status", "note"
+]
+
+
+def validate_export_params(export_format: str, start_date: Optional[date], end_date: Optional[date]) -> None:
+    """Reject an unknown format or an inverted date range"""
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unsupported export format. Use csv or ndjson"
+        )
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must be on or before end_date"
+        )
+
+
+def _stream(db: Session, statement) -> Iterator[tuple]:
+    result = db.execute(statement.execution_options(yield_per=EXPORT_FETCH_SIZE))
+    try:
+        for row in result:
+            yield tuple(row)
+    finally:
+        result.close()
+
+
+def iter_savings_export_rows(
+    db: Session,
+    user_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> Iterator[tuple]:
+    """Yield savings rows (SAVINGS_EXPORT_COLUMNS) oldest first, dates inclusive"""
+    statement = select(
+        Savings.id, Savings.date, Savings.type, Savings.category, Savings.amount, Savings.note
+    ).where(Savings.user_id == user_id)
+    if start_date:
+        statement = statement.where(Savings.date >= start_date)
+    if end_date:
+        statement = statement.where(Savings.date <= end_date)
+    return _stream(db, statement.order_by(Savings.date, Savings.id))
+
+
+def iter_loan_export_rows(
+    db: Session,
+    user_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> Iterator[tuple]:
+    """Yield loan rows (LOAN_EXPORT_COLUMNS) by start date, dates inclusive"""
+    paid = select(
+        func.coalesce(func.sum(LoanPayment.amount), 0.0)
+    ).where(LoanPayment.loan_id == Loan.id).correlate(Loan).scalar_subquery()
+    statement = select(
+        Loan.id, Loan.borrower_name, Loan.principal, paid, loan_remaining_expression(),
+        Loan.start_date, Loan.due_date, Loan.status, Loan.note
+    ).where(Loan.user_id == user_id)
+    if start_date:
+        statement = statement.where(Loan.start_date >= start_date)
+    if end_date:
+        statement = statement.where(Loan.start_date <= end_date)
+    return _stream(db, statement.order_by(Loan.start_date, Loan.id))
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def _encode_lines(export_format: str, columns: Sequence[str], rows: Iterable[tuple]) -> Iterator[str]:
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(columns)
+        yield buffer.getvalue()
+        for row in rows:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(row)
+            yield buffer.getvalue()
+    else:
+        for row in rows:
+            yield json.dumps(
+                {column: _json_value(value) for column, value in zip(columns, row)},
+                separators=(",", ":")
+            ) + "\n"
+
+
+def _chunk(lines: Iterator[str]) -> Iterator[bytes]:
+    # The first line goes out on its own so the client sees bytes immediately
+    for line in lines:
+        yield line.encode("utf-8")
+        break
+    pending: List[str] = []
+    size = 0
+    for line in lines:
+        pending.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_SIZE:
+            yield "".join(pending).encode("utf-8")
+            pending, size = [], 0
+    if pending:
+        yield "".join(pending).encode("utf-8")
+
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 writes a gzip header
+    for chunk in chunks:
+        # Sync flush so each chunk is decodable on arrival instead of sitting in zlib's buffer
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def encode_export(
+    rows: Iterable[tuple],
+    columns: Sequence[str],
+    export_format: str,
+    gzip: bool = False
+) -> Iterator[bytes]:
+    """Encode rows as CSV (with header) or NDJSON byte chunks, optionally gzip-compressed"""
+    chunks = _chunk(_encode_lines(export_format, columns, iter(rows)))
+    return _gzip(chunks) if gzip else chunks
+
+
+def export_filename(name: str, export_format: str, start_date: Optional[date], end_date: Optional[date]) -> str:
+    """Build an attachment filename like savings_2024-01-01_2024-12-31.csv"""
+    parts = [name]
+    if start_date or end_date:
+        parts.append(start_date.isoformat() if start_date else "start")
+        parts.append(end_date.isoformat() if end_date else "today")
+    return "_".join(parts) + f".{export_format}"
+
+
+
+def export_response(
+    rows: Iterable[tuple],
+    columns: Sequence[str],
+    name: str,
+    export_format: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    gzip: bool = False
+) -> StreamingResponse:
+    """Stream rows as a file download"""
+    filename = export_filename(name, export_format, start_date, end_date)
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        encode_export(rows, columns, export_format, gzip=gzip),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers=headers
+    )
@@ -0,0 +1,225 @@
+"""
+Jobs Service - DB-backed job queue and Telegram outbox
+
+Endpoints enqueue a job and return immediately. Workers (app.worker) then:
+1. claim a queued job and expand it in one transaction: the alert is saved
+   and one job_outbox row is written per Telegram chat, so progress survives
+   restarts and the work can be shared;
+2. claim batches of pending outbox rows, deliver them and record the results
+   (for rows they still hold) plus the job's sent/failed counters;
+3. mark a job done once none of its outbox rows is pending.
+
+Claims use SELECT ... FOR UPDATE SKIP LOCKED on PostgreSQL, so concurrent
+workers never wait on each other's rows. Other databases fall back to a
+compare-and-set UPDATE on the lock columns. A claim older than
+JOB_LOCK_TIMEOUT_SECONDS is treated as abandoned (crashed worker) and can be
+taken over, so delivery is at-least-once.
+"""
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, exists, func, insert, or_, select, union, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.job import Job, JobOutbox
+from app.models.user import User
+from app.models.user_telegram import UserTelegramID
+from app.services.alerts_service import create_broadcast_alert
+
+# (outbox id, job id, chat id) for rows claimed by a worker
+ClaimedMessage = Tuple[int, int, str]
+
+
+def enqueue_job(
+    db: Session,
+    job_type: str,
+    payload: dict,
+    created_by: Optional[int] = None,
+    chat_ids: Optional[List[str]] = None
+) -> Job:
+    """
+    Queue a job; with chat_ids the outbox is written right away and the job
+    goes straight to delivery, otherwise a worker expands it first
+    """
+    job = Job(type=job_type, payload=payload, created_by=created_by, status="queued")
+    db.add(job)
+    db.flush()
+    if chat_ids is not None:
+        _write_outbox(db, job, chat_ids)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_job(db: Session, job_id: int) -> Job:
+    """Get a job by ID"""
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+
+def _write_outbox(db: Session, job: Job, chat_ids: List[str]) -> None:
+    if chat_ids:
+        db.execute(insert(JobOutbox), [{"job_id": job.id, "chat_id": str(chat_id)} for chat_id in chat_ids])
+    now = datetime.utcnow()
+    job.total = len(chat_ids)
+    job.status = "running" if chat_ids else "done"
+    job.started_at = now
+    job.finished_at = None if chat_ids else now
+    job.locked_by = None
+    job.locked_at = None
+
+
+def telegram_chat_ids(db: Session, *criteria) -> List[str]:
+    """
+    Distinct Telegram chat IDs of users matching criteria, from the multi-ID
+    table and the legacy users.telegram_id column, in one UNION query
+    """
+    linked = select(UserTelegramID.telegram_id).join(User, User.id == UserTelegramID.user_id).where(*criteria)
+    legacy = select(User.telegram_id).where(User.telegram_id.isnot(None), *criteria)
+    return list(db.execute(union(linked, legacy)).scalars().all())
+
+
+def _expand_broadcast(db: Session, job: Job) -> Tuple[List[str], dict]:
+    # Stored once and fanned out on read (see alerts_service)
+    create_broadcast_alert(db, job.payload.get("title"), job.payload["message"])
+    users_count = db.query(func.count(User.id)).filter(User.is_active == True).scalar()
+    return telegram_chat_ids(db, User.is_active == True), {"users_count": users_count, "alerts_created": 1}
+
+
+# Job types that a worker has to expand into outbox rows
+_EXPANDERS: Dict[str, Callable[[Session, Job], Tuple[List[str], dict]]] = {
+    "broadcast": _expand_broadcast,
+}
+
+
+def _claim_ids(db: Session, model, criteria, worker_id: str, limit: int) -> List[int]:
+    """Lock up to limit rows matching criteria for worker_id; returns their ids"""
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS)
+    claimable = and_(criteria, or_(model.locked_by.is_(None), model.locked_at < stale_before))
+    candidates = select(model.id).where(claimable).order_by(model.id).limit(limit)
+    lock = update(model).values(locked_by=worker_id, locked_at=now).execution_options(synchronize_session=False)
+
+    if db.get_bind().dialect.name == "postgresql":
+        # Rows another worker is claiming are skipped instead of waited on
+        ids = db.execute(candidates.with_for_update(skip_locked=True)).scalars().all()
+        if ids:
+            db.execute(lock.where(model.id.in_(ids)))
+    else:
+        # No row locks: only rows still claimable at UPDATE time are taken
+        ids = db.execute(candidates).scalars().all()
+        if ids:
+            db.execute(lock.where(model.id.in_(ids), claimable))
+            ids = db.execute(
+                select(model.id).where(model.id.in_(ids), model.locked_by == worker_id)
+            ).scalars().all()
+    db.commit()
+    return list(ids)
+
+
+def expand_next_job(db: Session, worker_id: str) -> Optional[int]:
+    """Claim one queued job and write its outbox; returns the job id, None if the queue is empty"""
+    ids = _claim_ids(db, Job, and_(Job.status == "queued", Job.type.in_(list(_EXPANDERS))), worker_id, 1)
+    if not ids:
+        return None
+
+    job = db.get(Job, ids[0])
+    try:
+        chat_ids, result = _EXPANDERS[job.type](db, job)
+        job.result = result
+        _write_outbox(db, job, chat_ids)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        job = db.get(Job, ids[0])
+        job.status = "failed"
+        job.error = str(e)
+        job.finished_at = datetime.utcnow()
+        job.locked_by = None
+        db.commit()
+        raise
+    return job.id
+
+
+def claim_outbox_batch(db: Session, worker_id: str, limit: int) -> List[ClaimedMessage]:
+    """Claim up to limit pending outbox rows"""
+    ids = _claim_ids(db, JobOutbox, JobOutbox.status == "pending", worker_id, limit)
+    if not ids:
+        return []
+    rows = db.execute(
+        select(JobOutbox.id, JobOutbox.job_id, JobOutbox.chat_id).where(JobOutbox.id.in_(ids)).order_by(JobOutbox.id)
+    ).all()
+    return [tuple(row) for row in rows]
+
+
+def job_messages(db: Session, job_ids: List[int]) -> Dict[int, dict]:
+    """Payloads of the given jobs, keyed by job id"""
+    rows = db.execute(select(Job.id, Job.payload).where(Job.id.in_(job_ids))).all()
+    return {job_id: payload for job_id, payload in rows}
+
+
+def record_deliveries(
+    db: Session,
+    worker_id: str,
+    deliveries: List[Tuple[int, int, bool, int, Optional[str]]]
+) -> None:
+    """
+    Store (outbox id, job id, ok, attempts, error) results, bump job counters
+    and finish jobs with nothing left to send
+
+    Only rows still claimed by worker_id are recorded: if this worker's claim
+    expired and another worker took a row over, that worker owns its result.
+    """
+    if not deliveries:
+        return
+    # Locked until commit, so a takeover cannot slip in between check and write
+    owned = set(db.execute(
+        select(JobOutbox.id).where(
+            JobOutbox.id.in_([outbox_id for outbox_id, _, _, _, _ in deliveries]),
+            JobOutbox.locked_by == worker_id,
+            JobOutbox.status == "pending"
+        ).with_for_update()
+    ).scalars().all())
+    deliveries = [delivery for delivery in deliveries if delivery[0] in owned]
+    if not deliveries:
+        db.commit()
+        return
+    now = datetime.utcnow()
+    still_claimed = update(JobOutbox).where(JobOutbox.locked_by == worker_id)
+    db.execute(still_claimed.execution_options(synchronize_session=None), [
+        {
+            "id": outbox_id,
+            "status": "sent" if ok else "failed",
+            "attempts": attempts,
+            "error": error,
+            "sent_at": now if ok else None,
+            "locked_by": None,
+            "locked_at": None,
+        }
+        for outbox_id, _, ok, attempts, error in deliveries
+    ])
+
+    counts: Dict[int, List[int]] = {}
+    for _, job_id, ok, _, _ in deliveries:
+        counts.setdefault(job_id, [0, 0])[0 if ok else 1] += 1
+    for job_id, (sent, failed) in counts.items():
+        db.execute(
+            update(Job).where(Job.id == job_id)
+            .values(sent=Job.sent + sent, failed=Job.failed + failed)
+            .execution_options(synchronize_session=False)
+        )
+
+    pending = exists().where(JobOutbox.job_id == Job.id, JobOutbox.status == "pending")
+    db.execute(
+        update(Job).where(Job.id.in_(counts), Job.status == "running", ~pending)
+        .values(status="done", finished_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
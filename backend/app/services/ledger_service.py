@@ -0,0 +1,280 @@
+"""
+Ledger Service - incrementally maintained per-user savings aggregates
+
+Two summaries are kept next to the raw savings rows:
+- user_balances: running income/expense totals per user
+- savings_monthly_rollup: income/expense/count per user per calendar month
+
+The savings service calls these helpers inside its own transaction, so the
+aggregates and the savings row are committed (or rolled back) together.
+A user's aggregates are built from raw rows the first time they are needed;
+the user_balances row doubles as the marker that this has happened.
+Missing rows are created with INSERT ... ON CONFLICT DO NOTHING, so two
+writers racing to create the same row do not fail with an IntegrityError.
+"""
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case, extract, cast, insert, select, Integer
+from datetime import date
+from typing import Dict, List, Tuple
+from app.models.savings import Savings
+from app.models.user_balance import UserBalance
+from app.models.savings_rollup import SavingsMonthlyRollup
+from app.utils.calculations import calculate_savings_balance
+
+
+def _balance_dict(ledger: UserBalance) -> dict:
+    return {
+        "total_balance": ledger.total_income - ledger.total_expense,
+        "total_income": ledger.total_income,
+        "total_expense": ledger.total_expense,
+    }
+
+
+def _summary_dict(year: int, month: int, income: float, expense: float) -> dict:
+    return {
+        "month": month,
+        "year": year,
+        "income": income,
+        "expense": expense,
+        "net": income - expense,
+    }
+
+
+def _insert_if_missing(db: Session, model, **values) -> bool:
+    """Insert a row unless one with the same key exists; True if this call inserted it"""
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        result = db.execute(dialect_insert(model).values(**values).on_conflict_do_nothing())
+        return result.rowcount == 1
+    # No ON CONFLICT: let the unique key decide inside a savepoint
+    try:
+        with db.begin_nested():
+            db.execute(insert(model).values(**values))
+        return True
+    except IntegrityError:
+        return False
+
+
+def savings_by_month(first_user_id: int, last_user_id: int):
+    """SELECT user_id, year, month, income, expense, tx_count from raw savings rows"""
+    year = cast(extract("year", Savings.date), Integer)
+    month = cast(extract("month", Savings.date), Integer)
+    return select(
+        Savings.user_id,
+        year,
+        month,
+        func.coalesce(func.sum(case((Savings.type == "IN", Savings.amount), else_=0.0)), 0.0),
+        func.coalesce(func.sum(case((Savings.type == "OUT", Savings.amount), else_=0.0)), 0.0),
+        func.count(Savings.id)
+    ).where(
+        Savings.user_id.between(first_user_id, last_user_id)
+    ).group_by(Savings.user_id, year, month)
+
+
+def rebuild_monthly_rollups(db: Session, first_user_id: int, last_user_id: int) -> None:
+    """
+    Rebuild rollup rows for users with first_user_id <= id <= last_user_id
+
+    Runs as one DELETE plus one INSERT ... SELECT ... GROUP BY, so the work
+    happens inside the database regardless of how many savings rows exist.
+    """
+    db.query(SavingsMonthlyRollup).filter(
+        SavingsMonthlyRollup.user_id.between(first_user_id, last_user_id)
+    ).delete(synchronize_session=False)
+
+    db.execute(
+        insert(SavingsMonthlyRollup).from_select(
+            ["user_id", "year", "month", "income", "expense", "tx_count"],
+            savings_by_month(first_user_id, last_user_id)
+        )
+    )
+
+
+def ensure_user_ledger(db: Session, user_id: int) -> UserBalance:
+    """
+    Get the ledger row for a user, building all aggregates from raw rows if missing
+
+    Must be called before a savings row is added or changed, so the initial
+    aggregates do not already include the pending change.
+    """
+    ledger = db.get(UserBalance, user_id)
+    if ledger is None:
+        totals = calculate_savings_balance(db, user_id)
+        # A concurrent writer that created the row first has also built the rollups
+        if _insert_if_missing(
+            db, UserBalance,
+            user_id=user_id,
+            total_income=totals["total_income"],
+            total_expense=totals["total_expense"]
+        ):
+            rebuild_monthly_rollups(db, user_id, user_id)
+        ledger = db.get(UserBalance, user_id)
+    return ledger
+
+
+def apply_savings_delta(db: Session, user_id: int, type: str, amount: float, day: date, count: int) -> None:
+    """
+    Add amount (negative to remove) to the user's totals and to the month of day
+
+    count is +1 when a transaction enters the bucket and -1 when it leaves.
+    """
+    income, expense = (amount, 0.0) if type == "IN" else (0.0, amount)
+    _add_to_totals(db, user_id, income, expense)
+    _add_to_month(db, user_id, day.year, day.month, income, expense, count)
+
+
+def apply_bulk_savings_delta(db: Session, user_id: int, months: Dict[Tuple[int, int], List[float]]) -> None:
+    """
+    Apply the combined effect of many new savings rows in one update per month
+
+    months maps (year, month) to [income, expense, count] for the added rows.
+    """
+    _add_to_totals(
+        db, user_id,
+        sum(bucket[0] for bucket in months.values()),
+        sum(bucket[1] for bucket in months.values())
+    )
+    for (year, month), (income, expense, count) in months.items():
+        _add_to_month(db, user_id, year, month, income, expense, int(count))
+
+
+def _add_to_totals(db: Session, user_id: int, income: float, expense: float) -> None:
+    # Atomic in-database increments so concurrent writers do not lose updates
+    db.query(UserBalance).filter(UserBalance.user_id == user_id).update({
+        UserBalance.total_income: UserBalance.total_income + income,
+        UserBalance.total_expense: UserBalance.total_expense + expense
+    })
+
+
+def _add_to_month(db: Session, user_id: int, year: int, month: int, income: float, expense: float, count: int) -> None:
+    _insert_if_missing(
+        db, SavingsMonthlyRollup,
+        user_id=user_id, year=year, month=month, income=0.0, expense=0.0, tx_count=0
+    )
+
+    db.query(SavingsMonthlyRollup).filter(
+        SavingsMonthlyRollup.user_id == user_id,
+        SavingsMonthlyRollup.year == year,
+        SavingsMonthlyRollup.month == month
+    ).update({
+        SavingsMonthlyRollup.income: SavingsMonthlyRollup.income + income,
+        SavingsMonthlyRollup.expense: SavingsMonthlyRollup.expense + expense,
+        SavingsMonthlyRollup.tx_count: SavingsMonthlyRollup.tx_count + count
+    })
+
+
+def _ensure_initialized(db: Session, user_id: int) -> UserBalance:
+    ledger = db.get(UserBalance, user_id)
+    if ledger is None:
+        ledger = ensure_user_ledger(db, user_id)
+        db.commit()
+    return ledger
+
+
+def get_user_balance(db: Session, user_id: int) -> dict:
+    """Get balance information from the ledger (O(1) primary key lookup)"""
+    return _balance_dict(_ensure_initialized(db, user_id))
+
+
+def _monthly_rollup_statement(user_id: int, first_year: int, last_year: int):
+    return select(SavingsMonthlyRollup).where(
+        SavingsMonthlyRollup.user_id == user_id,
+        SavingsMonthlyRollup.year.between(first_year, last_year)
+    )
+
+
+def _summaries_from_rows(
+    rows: List[SavingsMonthlyRollup],
+    first_year: int,
+    first_month: int,
+    last_year: int,
+    last_month: int
+) -> List[dict]:
+    first_index = first_year * 12 + first_month - 1
+    last_index = last_year * 12 + last_month - 1
+    buckets = {(row.year, row.month): row for row in rows}
+
+    summaries = []
+    for index in range(first_index, last_index + 1):
+        year, month = index // 12, index % 12 + 1
+        row = buckets.get((year, month))
+        summaries.append(_summary_dict(
+            year, month,
+            row.income if row else 0.0,
+            row.expense if row else 0.0
+        ))
+    return summaries
+
+
+def _yearly_dict(year: int, months: List[dict]) -> dict:
+    income = sum(m["income"] for m in months)
+    expense = sum(m["expense"] for m in months)
+    return {
+        "year": year,
+        "income": income,
+        "expense": expense,
+        "net": income - expense,
+        "months": months,
+    }
+
+
+def get_monthly_summaries(
+    db: Session,
+    user_id: int,
+    first_year: int,
+    first_month: int,
+    last_year: int,
+    last_month: int
+) -> List[dict]:
+    """Get one summary per month in the inclusive range, read from the rollup table"""
+    statement = _monthly_rollup_statement(user_id, first_year, last_year)
+    rows = db.execute(statement).scalars().all()
+    # No rows may also mean the user's aggregates were never built
+    if not rows and db.get(UserBalance, user_id) is None:
+        _ensure_initialized(db, user_id)
+        rows = db.execute(statement).scalars().all()
+    return _summaries_from_rows(rows, first_year, first_month, last_year, last_month)
+
+
+def get_monthly_summary(db: Session, user_id: int, year: int, month: int) -> dict:
+    """Get monthly income and expense summary from the rollup table"""
+    return get_monthly_summaries(db, user_id, year, month, year, month)[0]
+
+
+def get_yearly_summary(db: Session, user_id: int, year: int) -> dict:
+    """Get the twelve monthly summaries and totals for a year"""
+    return _yearly_dict(year, get_monthly_summaries(db, user_id, year, 1, year, 12))
+
+
+async def get_user_balance_async(db: AsyncSession, user_id: int) -> dict:
+    """get_user_balance on an AsyncSession"""
+    ledger = await db.get(UserBalance, user_id)
+    if ledger is None:
+        ledger = await db.run_sync(_ensure_initialized, user_id)
+    return _balance_dict(ledger)
+
+
+async def get_monthly_summaries_async(
+    db: AsyncSession,
+    user_id: int,
+    first_year: int,
+    first_month: int,
+    last_year: int,
+    last_month: int
+) -> List[dict]:
+    """get_monthly_summaries on an AsyncSession"""
+    statement = _monthly_rollup_statement(user_id, first_year, last_year)
+    rows = (await db.execute(statement)).scalars().all()
+    if not rows and await db.get(UserBalance, user_id) is None:
+        await db.run_sync(_ensure_initialized, user_id)
+        rows = (await db.execute(statement)).scalars().all()
+    return _summaries_from_rows(rows, first_year, first_month, last_year, last_month)
+
+
+async def get_yearly_summary_async(db: AsyncSession, user_id: int, year: int) -> dict:
+    """get_yearly_summary on an AsyncSession"""
+    return _yearly_dict(year, await get_monthly_summaries_async(db, user_id, year, 1, year, 12))
@@ -1,10 +1,21 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, select
 from fastapi import HTTPException, status
-from typing import List
+from typing import List, Optional, Tuple
 from datetime import date
 from app.models.loan import Loan, LoanPayment
 from app.schemas.loan import LoanCreateRequest, LoanUpdateRequest, LoanPaymentCreateRequest
-from app.utils.calculations import calculate_loan_remaining, update_loan_status
+from app.utils.calculations import calculate_loan_remaining, loan_remaining_expression, update_loan_status
+from app.utils.response_cache import bump_data_version
+from app.utils.pagination import keyset_page, keyset_page_async
+
+
+def _with_payments(loan: Loan) -> Loan:
+    # Load the collection now: loans may be serialized where lazy loading
+    # is impossible (async session) or would block the event loop
+    loan.payments
+    return loan
 
 
 def create_loan(db: Session, user_id: int, request: LoanCreateRequest) -> Loan:
@@ -19,38 +30,78 @@ def create_loan(db: Session, user_id: int, request: LoanCreateRequest) -> Loan:
         status="active"
     )
     db.add(loan)
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(loan)
+    # A new loan has no payments yet
+    loan.remaining_amount = loan.principal
+    return _with_payments(loan)
+
+
+def _query_loans_with_remaining(db: Session):
+    """Query (Loan, remaining) rows with payments preloaded in one extra query"""
+    return db.query(Loan, loan_remaining_expression()).options(selectinload(Loan.payments))
+
+
+def _attach_remaining(row) -> Loan:
+    loan, remaining = row
+    loan.remaining_amount = float(remaining)
     return loan
 
 
-def get_loans(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Loan]:
+def _query_user_loans(db: Session, user_id: int, status_filter: Optional[str] = None):
+    query = _query_loans_with_remaining(db).filter(Loan.user_id == user_id)
+    if status_filter:
+        query = query.filter(Loan.status == status_filter)
+    return query
+
+
+def get_loans(
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    status_filter: Optional[str] = None
+) -> List[Loan]:
     """Get all loans for a user"""
-    loans = db.query(Loan).filter(
-        Loan.user_id == user_id
-    ).order_by(Loan.start_date.desc()).offset(skip).limit(limit).all()
+    rows = _query_user_loans(db, user_id, status_filter).order_by(
+        Loan.start_date.desc(), Loan.id.desc()
+    ).offset(skip).limit(limit).all()
 
-    # Calculate remaining amount for each loan
-    for loan in loans:
-        loan.remaining_amount = calculate_loan_remaining(db, loan.id)
+    return [_attach_remaining(row) for row in rows]
 
-    return loans
+
+def get_loans_page(
+    db: Session,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    status_filter: Optional[str] = None
+) -> Tuple[List[Loan], Optional[str]]:
+    """Get one page of loans ordered by (start_date, id) descending"""
+    rows, next_cursor = keyset_page(
+        _query_user_loans(db, user_id, status_filter),
+        [Loan.start_date, Loan.id],
+        lambda row: (row[0].start_date, row[0].id),
+        cursor,
+        limit
+    )
+    return [_attach_remaining(row) for row in rows], next_cursor
 
 
 def get_loan_by_id(db: Session, loan_id: int, user_id: int) -> Loan:
     """Get a specific loan"""
-    loan = db.query(Loan).filter(
+    row = _query_loans_with_remaining(db).filter(
         Loan.id == loan_id,
         Loan.user_id == user_id
     ).first()
-    if not loan:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Loan not found"
         )
 
-    loan.remaining_amount = calculate_loan_remaining(db, loan_id)
-    return loan
+    return _attach_remaining(row)
 
 
 def update_loan(
@@ -80,16 +131,18 @@ def update_loan(
     if request.note is not None:
         loan.note = request.note
 
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(loan)
     loan.remaining_amount = calculate_loan_remaining(db, loan_id)
-    return loan
+    return _with_payments(loan)
 
 
 def delete_loan(db: Session, loan_id: int, user_id: int) -> None:
     """Delete a loan"""
     loan = get_loan_by_id(db, loan_id, user_id)
     db.delete(loan)
+    bump_data_version(db, user_id)
     db.commit()
 
 
@@ -109,11 +162,13 @@ def add_payment(
         note=request.note
     )
     db.add(payment)
-    db.commit()
-    db.refresh(payment)
+    bump_data_version(db, user_id)
+    db.flush()
 
-    # Update loan status based on remaining amount
+    # Update loan status based on remaining amount; commits the payment too,
+    # so the status change is never published under an older data version
     update_loan_status(db, loan_id)
+    db.refresh(payment)
 
     return payment
 
@@ -126,14 +181,117 @@ def get_payments(db: Session, loan_id: int, user_id: int) -> List[LoanPayment]:
 
 def get_total_active_loans_amount(db: Session, user_id: int) -> float:
     """Get total amount of active loans"""
-    loans = db.query(Loan).filter(
+    total = db.query(
+        func.coalesce(func.sum(loan_remaining_expression()), 0.0)
+    ).filter(
         Loan.user_id == user_id,
         Loan.status == "active"
-    ).all()
+    ).scalar()
+    return float(total)
+
 
-    total = 0.0
-    for loan in loans:
-        remaining = calculate_loan_remaining(db, loan.id)
-        total += remaining
+# Async versions for AsyncSession. Reads are native; writes run the sync
+# functions above through run_sync.
+
+def _select_user_loans(user_id: int, status_filter: Optional[str] = None):
+    statement = select(Loan, loan_remaining_expression()).options(
+        selectinload(Loan.payments)
+    ).where(Loan.user_id == user_id)
+    if status_filter:
+        statement = statement.where(Loan.status == status_filter)
+    return statement
+
+
+async def create_loan_async(db: AsyncSession, user_id: int, request: LoanCreateRequest) -> Loan:
+    """Create a new loan"""
+    return await db.run_sync(create_loan, user_id, request)
 
-    return total
+
+async def get_loans_async(
+    db: AsyncSession,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    status_filter: Optional[str] = None
+) -> List[Loan]:
+    """Get all loans for a user"""
+    result = await db.execute(
+        _select_user_loans(user_id, status_filter).order_by(
+            Loan.start_date.desc(), Loan.id.desc()
+        ).offset(skip).limit(limit)
+    )
+    return [_attach_remaining(row) for row in result.all()]
+
+
+async def get_loans_page_async(
+    db: AsyncSession,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    status_filter: Optional[str] = None
+) -> Tuple[List[Loan], Optional[str]]:
+    """Get one page of loans ordered by (start_date, id) descending"""
+    rows, next_cursor = await keyset_page_async(
+        db,
+        _select_user_loans(user_id, status_filter),
+        [Loan.start_date, Loan.id],
+        lambda row: (row[0].start_date, row[0].id),
+        cursor,
+        limit
+    )
+    return [_attach_remaining(row) for row in rows], next_cursor
+
+
+async def get_loan_by_id_async(db: AsyncSession, loan_id: int, user_id: int) -> Loan:
+    """Get a specific loan"""
+    result = await db.execute(_select_user_loans(user_id).where(Loan.id == loan_id))
+    row = result.first()
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Loan not found"
+        )
+
+    return _attach_remaining(row)
+
+
+async def update_loan_async(
+    db: AsyncSession,
+    loan_id: int,
+    user_id: int,
+    request: LoanUpdateRequest
+) -> Loan:
+    """Update a loan"""
+    return await db.run_sync(update_loan, loan_id, user_id, request)
+
+
+async def delete_loan_async(db: AsyncSession, loan_id: int, user_id: int) -> None:
+    """Delete a loan"""
+    await db.run_sync(delete_loan, loan_id, user_id)
+
+
+async def add_payment_async(
+    db: AsyncSession,
+    loan_id: int,
+    user_id: int,
+    request: LoanPaymentCreateRequest
+) -> LoanPayment:
+    """Add a payment to a loan"""
+    return await db.run_sync(add_payment, loan_id, user_id, request)
+
+
+async def get_payments_async(db: AsyncSession, loan_id: int, user_id: int) -> List[LoanPayment]:
+    """Get all payments for a loan"""
+    loan = await get_loan_by_id_async(db, loan_id, user_id)
+    return loan.payments
+
+
+async def get_total_active_loans_amount_async(db: AsyncSession, user_id: int) -> float:
+    """Get total amount of active loans"""
+    total = await db.scalar(
+        select(func.coalesce(func.sum(loan_remaining_expression()), 0.0)).where(
+            Loan.user_id == user_id,
+            Loan.status == "active"
+        )
+    )
+    return float(total)
@@ -0,0 +1,125 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case, select
+from datetime import datetime, date, timedelta
+from typing import List, Dict, Optional, Tuple
+from app.models.savings import Savings
+from app.services.savings_service import get_balance, get_balance_async
+from app.services.ledger_service import get_monthly_summaries, get_monthly_summaries_async
+from app.services.loans_service import get_total_active_loans_amount, get_total_active_loans_amount_async
+from app.services.targets_service import get_total_target_current_amount, get_total_target_current_amount_async
+
+# Number of months shown in the overview chart (including current month)
+OVERVIEW_MONTHS = 6
+# Number of days shown in the daily trend (including today)
+OVERVIEW_DAYS = 7
+
+
+def _shift_month(year: int, month: int, offset: int) -> tuple[int, int]:
+    """Return (year, month) shifted by offset months"""
+    index = year * 12 + (month - 1) + offset
+    return index // 12, index % 12 + 1
+
+
+def _daily_totals_statement(user_id: int, start: date, end: date):
+    income = func.coalesce(func.sum(case((Savings.type == "IN", Savings.amount), else_=0.0)), 0.0)
+    expense = func.coalesce(func.sum(case((Savings.type == "OUT", Savings.amount), else_=0.0)), 0.0)
+
+    return select(Savings.date, income, expense).where(
+        Savings.user_id == user_id,
+        Savings.date >= start,
+        Savings.date < end
+    ).group_by(Savings.date)
+
+
+def _daily_totals_dict(rows) -> Dict[date, dict]:
+    return {
+        row[0]: {"income": float(row[1]), "expense": float(row[2])}
+        for row in rows
+    }
+
+
+def get_daily_totals(db: Session, user_id: int, start: date, end: date) -> Dict[date, dict]:
+    """
+    Get income and expense per day for start <= date < end in one grouped query
+
+    Returns:
+        Dictionary keyed by date with income and expense totals
+    """
+    return _daily_totals_dict(db.execute(_daily_totals_statement(user_id, start, end)).all())
+
+
+def _overview_window(now: datetime) -> Tuple[date, date, int, int]:
+    """Return (trend start, trend end exclusive, first chart year, first chart month)"""
+    today = now.date()
+    first_year, first_month = _shift_month(now.year, now.month, -(OVERVIEW_MONTHS - 1))
+    return today - timedelta(days=OVERVIEW_DAYS - 1), today + timedelta(days=1), first_year, first_month
+
+
+def _build_overview(
+    balance_info: dict,
+    monthly_summaries: List[dict],
+    daily_totals: Dict[date, dict],
+    trend_start: date,
+    active_loans_amount: float,
+    target_current_amount: float
+) -> dict:
+    daily_trend: List[dict] = []
+    for i in range(OVERVIEW_DAYS):
+        day = trend_start + timedelta(days=i)
+        totals = daily_totals.get(day, {"income": 0.0, "expense": 0.0})
+        daily_trend.append({
+            "date": day.isoformat(),
+            "income": totals["income"],
+            "expense": totals["expense"],
+            "net": totals["income"] - totals["expense"]
+        })
+
+    current_month = monthly_summaries[-1]
+
+    return {
+        "total_balance": balance_info["total_balance"],
+        "total_active_loans_amount": active_loans_amount,
+        "total_target_current_amount": target_current_amount,
+        "total_income_month": current_month["income"],
+        "total_expense_month": current_month["expense"],
+        "monthly_summaries": monthly_summaries,
+        "daily_trend": daily_trend
+    }
+
+
+def get_overview(db: Session, user_id: int, now: Optional[datetime] = None) -> dict:
+    """
+    Build the financial overview for a user
+
+    Savings figures come from three small statements: the balance ledger
+    row, the monthly rollup rows for the chart window and one GROUP BY date
+    over the last few days for the daily trend.
+    """
+    now = now or datetime.now()
+    trend_start, trend_end, first_year, first_month = _overview_window(now)
+
+    return _build_overview(
+        get_balance(db, user_id),
+        get_monthly_summaries(db, user_id, first_year, first_month, now.year, now.month),
+        get_daily_totals(db, user_id, trend_start, trend_end),
+        trend_start,
+        get_total_active_loans_amount(db, user_id),
+        get_total_target_current_amount(db, user_id)
+    )
+
+
+async def get_overview_async(db: AsyncSession, user_id: int, now: Optional[datetime] = None) -> dict:
+    """Build the financial overview for a user on an AsyncSession"""
+    now = now or datetime.now()
+    trend_start, trend_end, first_year, first_month = _overview_window(now)
+    daily_rows = (await db.execute(_daily_totals_statement(user_id, trend_start, trend_end))).all()
+
+    return _build_overview(
+        await get_balance_async(db, user_id),
+        await get_monthly_summaries_async(db, user_id, first_year, first_month, now.year, now.month),
+        _daily_totals_dict(daily_rows),
+        trend_start,
+        await get_total_active_loans_amount_async(db, user_id),
+        await get_total_target_current_amount_async(db, user_id)
+    )
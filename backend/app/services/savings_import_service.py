@@ -0,0 +1,220 @@
+"""
+Savings Import Service - bulk import of savings transactions from CSV or NDJSON
+
+Files are parsed one record at a time from the uploaded (disk-spooled) file
+and inserted in batches: COPY on PostgreSQL, executemany elsewhere. Memory
+use is bounded by the batch size, not the file size; uploads are still
+capped at IMPORT_MAX_BYTES and IMPORT_MAX_ROWS records. Ledger and monthly
+rollups are updated once per import from per-month totals, and everything
+is committed in one transaction together with the data version bump.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.savings import Savings
+from app.schemas.savings import SavingsCreateRequest
+from app.services.ledger_service import ensure_user_ledger, apply_bulk_savings_delta
+from app.utils.response_cache import bump_data_version
+
+IMPORT_FORMATS = ("csv", "ndjson")
+IMPORT_BATCH_SIZE = 5000
+IMPORT_MAX_BYTES = 20 * 1024 * 1024
+IMPORT_MAX_ROWS = 100_000
+# Only the first errors are returned so a bad 100k-row file cannot blow up the response
+MAX_REPORTED_ERRORS = 100
+
+_COLUMNS = ["user_id", "date", "type", "category", "amount", "note", "created_at"]
+_REQUIRED_CSV_FIELDS = {"date", "type", "amount"}
+
+# A parsed record: (line number, fields) or (line number, parse error message)
+Record = Tuple[int, Optional[dict], Optional[str]]
+
+
+def detect_import_format(filename: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    """Guess csv/ndjson from the upload's filename or content type"""
+    name = (filename or "").lower()
+    if name.endswith(".csv") or content_type in ("text/csv", "application/csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or content_type in ("application/x-ndjson", "application/jsonl"):
+        return "ndjson"
+    return None
+
+
+def check_import_size(stream: BinaryIO, max_bytes: int = IMPORT_MAX_BYTES) -> None:
+    """Refuse an upload larger than max_bytes before any of it is parsed"""
+    stream.seek(0, io.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+    if size > max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File size too large. Maximum size is {max_bytes // (1024 * 1024)}MB."
+        )
+
+
+def iter_csv_records(stream: BinaryIO) -> Iterator[Record]:
+    """Yield records from a CSV file with a header row (date,type,category,amount,note)"""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    missing = _REQUIRED_CSV_FIELDS - set(reader.fieldnames or [])
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"CSV header is missing column(s): {', '.join(sorted(missing))}"
+        )
+    for row in reader:
+        # Spreadsheets export empty optional cells as ""
+        yield reader.line_num, {k: v for k, v in row.items() if k and v not in ("", None)}, None
+
+
+def iter_ndjson_records(stream: BinaryIO) -> Iterator[Record]:
+    """Yield records from a file with one JSON object per line"""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig")
+    for line_num, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            fields = json.loads(line)
+        except ValueError as e:
+            yield line_num, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(fields, dict):
+            yield line_num, None, "Each line must be a JSON object"
+            continue
+        yield line_num, fields, None
+
+
+def _format_validation_error(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(loc) for loc in e['loc']) or 'row'}: {e['msg']}"
+        for e in error.errors()
+    ]
+
+
+def _none_if_blank(value: Optional[str]) -> Optional[str]:
+    # COPY ... CSV reads an empty field as NULL while executemany stores "",
+    # so blank text is made NULL before either path
+    return value if value else None
+
+
+def _insert_batch(db: Session, rows: List[dict]) -> None:
+    connection = db.connection()
+    if connection.dialect.name == "sqlite":
+        # Straight to the driver's executemany; values are pre-formatted the
+        # way SQLAlchemy stores Date/DateTime on SQLite, skipping per-row bind processing
+        connection.exec_driver_sql(
+            f"INSERT INTO savings ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+            [
+                (row["user_id"], row["date"].isoformat(), row["type"], row["category"],
+                 row["amount"], row["note"], row["created_at"].isoformat(" "))
+                for row in rows
+            ]
+        )
+        return
+    if connection.dialect.name == "postgresql":
+        raw_cursor = connection.connection.cursor()
+        if hasattr(raw_cursor, "copy_expert"):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                # None is written unquoted, which COPY ... CSV reads as NULL
+                writer.writerow([row[column] for column in _COLUMNS])
+            buffer.seek(0)
+            raw_cursor.copy_expert(
+                f"COPY savings ({', '.join(_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+            raw_cursor.close()
+            return
+        raw_cursor.close()
+    db.execute(insert(Savings), rows)
+
+
+def import_savings(
+    db: Session,
+    user_id: int,
+    records: Iterator[Record],
+    batch_size: int = IMPORT_BATCH_SIZE,
+    max_rows: int = IMPORT_MAX_ROWS
+) -> dict:
+    """
+    Validate and insert savings records for a user
+
+    Invalid records are skipped and reported by line number; valid ones are
+    committed together. A file with more than max_rows records is refused and
+    nothing is imported.
+
+    Returns:
+        {"imported": int, "failed": int, "errors": [{"line": int, "errors": [str]}]}
+    """
+    ensure_user_ledger(db, user_id)
+    created_at = datetime.utcnow()
+    imported = 0
+    failed = 0
+    errors: List[dict] = []
+    batch: List[dict] = []
+    months: Dict[Tuple[int, int], List[float]] = {}
+
+    def flush_batch():
+        _insert_batch(db, batch)
+        batch.clear()
+
+    try:
+        for line_num, fields, parse_error in records:
+            if imported + failed >= max_rows:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Too many rows. Maximum is {max_rows} per import."
+                )
+            try:
+                if parse_error:
+                    raise ValueError(parse_error)
+                request = SavingsCreateRequest(**fields)
+            except (ValidationError, ValueError, TypeError) as e:
+                failed += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    messages = _format_validation_error(e) if isinstance(e, ValidationError) else [str(e)]
+                    errors.append({"line": line_num, "errors": messages})
+                continue
+
+            batch.append({
+                "user_id": user_id,
+                "date": request.date,
+                "type": request.type,
+                "category": _none_if_blank(request.category),
+                "amount": request.amount,
+                "note": _none_if_blank(request.note),
+                "created_at": created_at,
+            })
+            bucket = months.setdefault((request.date.year, request.date.month), [0.0, 0.0, 0])
+            bucket[0 if request.type == "IN" else 1] += request.amount
+            bucket[2] += 1
+            imported += 1
+
+            if len(batch) >= batch_size:
+                flush_batch()
+
+        if batch:
+            flush_batch()
+        if imported:
+            apply_bulk_savings_delta(db, user_id, months)
+            bump_data_version(db, user_id)
+        db.commit()
+    except UnicodeDecodeError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be UTF-8 encoded"
+        )
+    except Exception:
+        db.rollback()
+        raise
+
+    return {"imported": imported, "failed": failed, "errors": errors}
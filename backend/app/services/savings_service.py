@@ -1,14 +1,24 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from typing import List
+from typing import List, Optional, Tuple
 from app.models.savings import Savings
 from app.schemas.savings import SavingsCreateRequest, SavingsUpdateRequest
-from app.utils.calculations import calculate_savings_balance
+from app.services.ledger_service import (
+    ensure_user_ledger,
+    apply_savings_delta,
+    get_user_balance,
+    get_user_balance_async,
+)
+from app.utils.response_cache import bump_data_version
+from app.utils.pagination import keyset_page, keyset_page_async
 
 
 def create_savings(db: Session, user_id: int, request: SavingsCreateRequest) -> Savings:
     """Create a new savings transaction"""
     # Validation is handled by Pydantic schema
+    ensure_user_ledger(db, user_id)
     savings = Savings(
         user_id=user_id,
         date=request.date,
@@ -18,6 +28,8 @@ def create_savings(db: Session, user_id: int, request: SavingsCreateRequest) ->
         note=request.note
     )
     db.add(savings)
+    apply_savings_delta(db, user_id, savings.type, savings.amount, savings.date, 1)
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(savings)
     return savings
@@ -27,7 +39,23 @@ def get_savings(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> L
     """Get all savings transactions for a user"""
     return db.query(Savings).filter(
         Savings.user_id == user_id
-    ).order_by(Savings.date.desc()).offset(skip).limit(limit).all()
+    ).order_by(Savings.date.desc(), Savings.id.desc()).offset(skip).limit(limit).all()
+
+
+def get_savings_page(
+    db: Session,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 100
+) -> Tuple[List[Savings], Optional[str]]:
+    """Get one page of savings transactions ordered by (date, id) descending"""
+    return keyset_page(
+        db.query(Savings).filter(Savings.user_id == user_id),
+        [Savings.date, Savings.id],
+        lambda s: (s.date, s.id),
+        cursor,
+        limit
+    )
 
 
 def get_savings_by_id(db: Session, savings_id: int, user_id: int) -> Savings:
@@ -52,6 +80,8 @@ def update_savings(
 ) -> Savings:
     """Update a savings transaction"""
     savings = get_savings_by_id(db, savings_id, user_id)
+    ensure_user_ledger(db, user_id)
+    old_type, old_amount, old_date = savings.type, savings.amount, savings.date
 
     if request.date is not None:
         savings.date = request.date
@@ -65,6 +95,12 @@ def update_savings(
     if request.note is not None:
         savings.note = request.note
 
+    # Move the amount between ledger buckets if type, amount or date changed
+    if (savings.type, savings.amount, savings.date) != (old_type, old_amount, old_date):
+        apply_savings_delta(db, user_id, old_type, -old_amount, old_date, -1)
+        apply_savings_delta(db, user_id, savings.type, savings.amount, savings.date, 1)
+
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(savings)
     return savings
@@ -73,10 +109,83 @@ def update_savings(
 def delete_savings(db: Session, savings_id: int, user_id: int) -> None:
     """Delete a savings transaction"""
     savings = get_savings_by_id(db, savings_id, user_id)
+    ensure_user_ledger(db, user_id)
+    apply_savings_delta(db, user_id, savings.type, -savings.amount, savings.date, -1)
     db.delete(savings)
+    bump_data_version(db, user_id)
     db.commit()
 
 
 def get_balance(db: Session, user_id: int) -> dict:
     """Get balance information for a user"""
-    return calculate_savings_balance(db, user_id)
+    return get_user_balance(db, user_id)
+
+
+# Async versions for AsyncSession. Reads are native; writes run the sync
+# functions above through run_sync, so the ledger and data version
+# bookkeeping lives in one place.
+
+async def create_savings_async(db: AsyncSession, user_id: int, request: SavingsCreateRequest) -> Savings:
+    """Create a new savings transaction"""
+    return await db.run_sync(create_savings, user_id, request)
+
+
+async def get_savings_async(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100) -> List[Savings]:
+    """Get all savings transactions for a user"""
+    result = await db.execute(
+        select(Savings).where(
+            Savings.user_id == user_id
+        ).order_by(Savings.date.desc(), Savings.id.desc()).offset(skip).limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+async def get_savings_page_async(
+    db: AsyncSession,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 100
+) -> Tuple[List[Savings], Optional[str]]:
+    """Get one page of savings transactions ordered by (date, id) descending"""
+    return await keyset_page_async(
+        db,
+        select(Savings).where(Savings.user_id == user_id),
+        [Savings.date, Savings.id],
+        lambda s: (s.date, s.id),
+        cursor,
+        limit
+    )
+
+
+async def get_savings_by_id_async(db: AsyncSession, savings_id: int, user_id: int) -> Savings:
+    """Get a specific savings transaction"""
+    result = await db.execute(
+        select(Savings).where(Savings.id == savings_id, Savings.user_id == user_id)
+    )
+    savings = result.scalars().first()
+    if not savings:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Savings transaction not found"
+        )
+    return savings
+
+
+async def update_savings_async(
+    db: AsyncSession,
+    savings_id: int,
+    user_id: int,
+    request: SavingsUpdateRequest
+) -> Savings:
+    """Update a savings transaction"""
+    return await db.run_sync(update_savings, savings_id, user_id, request)
+
+
+async def delete_savings_async(db: AsyncSession, savings_id: int, user_id: int) -> None:
+    """Delete a savings transaction"""
+    await db.run_sync(delete_savings, savings_id, user_id)
+
+
+async def get_balance_async(db: AsyncSession, user_id: int) -> dict:
+    """Get balance information for a user"""
+    return await get_user_balance_async(db, user_id)
@@ -1,9 +1,17 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy import func, select
 from fastapi import HTTPException, status
-from typing import List
+from typing import List, Optional, Tuple
+from datetime import date
 from app.models.target import Target
 from app.schemas.target import TargetCreateRequest, TargetUpdateRequest
 from app.utils.calculations import update_target_status
+from app.utils.response_cache import bump_data_version
+from app.utils.pagination import keyset_page, keyset_page_async
+
+# Targets without a deadline sort last on every database
+_DEADLINE_KEY = func.coalesce(Target.deadline, date.max)
 
 
 def create_target(db: Session, user_id: int, request: TargetCreateRequest) -> Target:
@@ -23,16 +31,48 @@ def create_target(db: Session, user_id: int, request: TargetCreateRequest) -> Ta
         target.status = "done"
 
     db.add(target)
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(target)
     return target
 
 
-def get_targets(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Target]:
+def _query_user_targets(db: Session, user_id: int, status_filter: Optional[str] = None):
+    query = db.query(Target).filter(Target.user_id == user_id)
+    if status_filter:
+        query = query.filter(Target.status == status_filter)
+    return query
+
+
+def get_targets(
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    status_filter: Optional[str] = None
+) -> List[Target]:
     """Get all targets for a user"""
-    return db.query(Target).filter(
-        Target.user_id == user_id
-    ).order_by(Target.deadline.asc()).offset(skip).limit(limit).all()
+    return _query_user_targets(db, user_id, status_filter).order_by(
+        _DEADLINE_KEY.asc(), Target.id.asc()
+    ).offset(skip).limit(limit).all()
+
+
+def get_targets_page(
+    db: Session,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    status_filter: Optional[str] = None
+) -> Tuple[List[Target], Optional[str]]:
+    """Get one page of targets ordered by (deadline, id) ascending"""
+    return keyset_page(
+        _query_user_targets(db, user_id, status_filter),
+        [_DEADLINE_KEY, Target.id],
+        lambda t: (t.deadline or date.max, t.id),
+        cursor,
+        limit,
+        descending=False
+    )
 
 
 def get_target_by_id(db: Session, target_id: int, user_id: int) -> Target:
@@ -84,6 +124,7 @@ def update_target(
         target.note = request.note
 
     # Update status based on current_amount vs target_amount
+    bump_data_version(db, user_id)
     update_target_status(db, target_id)
 
     db.commit()
@@ -95,10 +136,100 @@ def delete_target(db: Session, target_id: int, user_id: int) -> None:
     """Delete a target"""
     target = get_target_by_id(db, target_id, user_id)
     db.delete(target)
+    bump_data_version(db, user_id)
     db.commit()
 
 
 def get_total_target_current_amount(db: Session, user_id: int) -> float:
     """Get total current amount across all targets"""
-    targets = db.query(Target).filter(Target.user_id == user_id).all()
-    return sum(t.current_amount for t in targets)
+    total = db.query(func.coalesce(func.sum(Target.current_amount), 0.0)).filter(
+        Target.user_id == user_id
+    ).scalar()
+    return float(total)
+
+
+# Async versions for AsyncSession. Reads are native; writes run the sync
+# functions above through run_sync.
+
+def _select_user_targets(user_id: int, status_filter: Optional[str] = None):
+    statement = select(Target).where(Target.user_id == user_id)
+    if status_filter:
+        statement = statement.where(Target.status == status_filter)
+    return statement
+
+
+async def create_target_async(db: AsyncSession, user_id: int, request: TargetCreateRequest) -> Target:
+    """Create a new target"""
+    return await db.run_sync(create_target, user_id, request)
+
+
+async def get_targets_async(
+    db: AsyncSession,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    status_filter: Optional[str] = None
+) -> List[Target]:
+    """Get all targets for a user"""
+    result = await db.execute(
+        _select_user_targets(user_id, status_filter).order_by(
+            _DEADLINE_KEY.asc(), Target.id.asc()
+        ).offset(skip).limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+async def get_targets_page_async(
+    db: AsyncSession,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    status_filter: Optional[str] = None
+) -> Tuple[List[Target], Optional[str]]:
+    """Get one page of targets ordered by (deadline, id) ascending"""
+    return await keyset_page_async(
+        db,
+        _select_user_targets(user_id, status_filter),
+        [_DEADLINE_KEY, Target.id],
+        lambda t: (t.deadline or date.max, t.id),
+        cursor,
+        limit,
+        descending=False
+    )
+
+
+async def get_target_by_id_async(db: AsyncSession, target_id: int, user_id: int) -> Target:
+    """Get a specific target"""
+    result = await db.execute(
+        select(Target).where(Target.id == target_id, Target.user_id == user_id)
+    )
+    target = result.scalars().first()
+    if not target:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Target not found"
+        )
+    return target
+
+
+async def update_target_async(
+    db: AsyncSession,
+    target_id: int,
+    user_id: int,
+    request: TargetUpdateRequest
+) -> Target:
+    """Update a target"""
+    return await db.run_sync(update_target, target_id, user_id, request)
+
+
+async def delete_target_async(db: AsyncSession, target_id: int, user_id: int) -> None:
+    """Delete a target"""
+    await db.run_sync(delete_target, target_id, user_id)
+
+
+async def get_total_target_current_amount_async(db: AsyncSession, user_id: int) -> float:
+    """Get total current amount across all targets"""
+    total = await db.scalar(
+        select(func.coalesce(func.sum(Target.current_amount), 0.0)).where(Target.user_id == user_id)
+    )
+    return float(total)
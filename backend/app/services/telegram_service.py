@@ -1,21 +1,241 @@
 """
 Telegram Service - Service untuk mengirim pesan via Telegram Bot
+
+Messages go through one TelegramDeliveryEngine per process: a shared, pooled
+httpx client, a fixed number of send workers, token buckets for Telegram's
+global (~30 msg/s) and per-chat (~1 msg/s) limits, and a bot-wide pause
+whenever Telegram answers 429 with retry_after. Broadcasts return one
+DeliveryResult per recipient.
+
+Telegram's global limit is per bot, not per process: with several sending
+processes the global bucket either lives in a shared rate-limit backend or
+each process gets an equal share of the rate (TELEGRAM_RATE_LIMIT_BACKEND).
 """
+import asyncio
 import os
+from dataclasses import dataclass, asdict
+from time import monotonic
+from typing import Dict, List, Optional
+
 import httpx
-from typing import List, Optional
+from app.core.config import settings
 from app.core.logging_config import app_logger
+from app.utils.rate_limit import Limit, create_backend
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Per-chat buckets kept before idle (full) ones are dropped
+_MAX_CHAT_BUCKETS = 10000
+
 
 def get_telegram_bot_token() -> Optional[str]:
     """Get Telegram bot token from environment"""
     return os.getenv("TELEGRAM_BOT_TOKEN")
 
 
+def format_telegram_message(message: str, title: Optional[str] = None) -> str:
+    """Format message with title if provided"""
+    if title:
+        return f"🔔 *{title}*\n\n{message}"
+    return message
+
+
+class TokenBucket:
+    """
+    Async token bucket; acquire() waits until a token is available
+
+    Tokens may go negative: each caller reserves its token immediately and
+    sleeps off its share of the debt, so waiters are served in call order
+    without a lock (safe on a single event loop).
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = monotonic()
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def is_idle(self) -> bool:
+        """True when the bucket is full, i.e. indistinguishable from a new one"""
+        self._refill()
+        return self._tokens >= self.capacity
+
+    async def acquire(self) -> None:
+        self._refill()
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+
+class SharedTokenBucket:
+    """
+    Token bucket kept in a rate-limit backend under one key
+
+    Every process acquiring the same key draws from the same bucket, so
+    together they stay within rate (bursts of up to one second's worth).
+    """
+
+    def __init__(self, backend, key: str, rate: float):
+        self.backend = backend
+        self.key = key
+        burst = max(1, int(rate))
+        self.limit = Limit(burst, burst / rate)
+
+    async def acquire(self) -> None:
+        while True:
+            allowed, retry_after = await self.backend.hit(self.key, self.limit)
+            if allowed:
+                return
+            await asyncio.sleep(max(retry_after, 0.001))
+
+
+def global_send_bucket(rate: float):
+    """Bucket for the bot-wide send rate, shared across processes per TELEGRAM_RATE_LIMIT_BACKEND"""
+    if settings.TELEGRAM_RATE_LIMIT_BACKEND == "memory":
+        # Each process only sees its own sends: give every sender an equal share
+        return TokenBucket(rate / max(1, settings.TELEGRAM_SENDER_PROCESSES))
+    return SharedTokenBucket(create_backend(settings.TELEGRAM_RATE_LIMIT_BACKEND), "telegram:global", rate)
+
+
+@dataclass
+class DeliveryResult:
+    chat_id: str
+    ok: bool
+    status_code: Optional[int] = None
+    attempts: int = 0
+    error: Optional[str] = None
+
+
+class TelegramDeliveryEngine:
+    """Send Telegram messages concurrently within the Bot API rate limits"""
+
+    def __init__(
+        self,
+        bot_token: Optional[str],
+        client: Optional[httpx.AsyncClient] = None,
+        api_url: str = settings.TELEGRAM_API_URL,
+        concurrency: int = settings.TELEGRAM_SEND_CONCURRENCY,
+        global_rate: float = settings.TELEGRAM_GLOBAL_RATE_PER_SECOND,
+        per_chat_rate: float = settings.TELEGRAM_PER_CHAT_RATE_PER_SECOND,
+        max_attempts: int = settings.TELEGRAM_MAX_ATTEMPTS,
+        global_bucket=None,
+    ):
+        self.bot_token = bot_token
+        self.concurrency = concurrency
+        self.per_chat_rate = per_chat_rate
+        self.max_attempts = max_attempts
+        self._client = client or httpx.AsyncClient(
+            base_url=api_url,
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+        self._global_bucket = global_bucket or global_send_bucket(global_rate)
+        self._chat_buckets: Dict[str, TokenBucket] = {}
+        self._paused_until = 0.0
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def _chat_bucket(self, chat_id: str) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) >= _MAX_CHAT_BUCKETS:
+                self._chat_buckets = {key: b for key, b in self._chat_buckets.items() if not b.is_idle()}
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self.per_chat_rate, capacity=1.0)
+        return bucket
+
+    async def _wait_for_flood_pause(self) -> None:
+        delay = self._paused_until - monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def send(self, chat_id: str, text: str) -> DeliveryResult:
+        """Send one message, retrying 429 (after retry_after), 5xx and network errors"""
+        chat_id = str(chat_id)
+        result = DeliveryResult(chat_id=chat_id, ok=False)
+        if not self.bot_token:
+            result.error = "TELEGRAM_BOT_TOKEN not set"
+            return result
+
+        url = f"/bot{self.bot_token}/sendMessage"
+        payload = {"chat_id": chat_id, "text": text, "parse_mode": "Markdown"}
+        while result.attempts < self.max_attempts:
+            await self._chat_bucket(chat_id).acquire()
+            await self._wait_for_flood_pause()
+            await self._global_bucket.acquire()
+            result.attempts += 1
+            try:
+                response = await self._client.post(url, json=payload)
+            except httpx.HTTPError as e:
+                result.status_code, result.error = None, str(e) or type(e).__name__
+                await asyncio.sleep(min(2 ** (result.attempts - 1), 10))
+                continue
+
+            result.status_code = response.status_code
+            if response.status_code == 200:
+                result.ok, result.error = True, None
+                return result
+
+            body = _json_or_empty(response)
+            result.error = body.get("description") or f"HTTP {response.status_code}"
+            if response.status_code == 429:
+                retry_after = float(body.get("parameters", {}).get("retry_after", 1))
+                # Flood control applies to the whole bot: hold every worker back
+                self._paused_until = max(self._paused_until, monotonic() + retry_after)
+                app_logger.warning(f"Telegram flood control, pausing sends for {retry_after:g}s")
+            elif response.status_code >= 500:
+                await asyncio.sleep(min(2 ** (result.attempts - 1), 10))
+            else:
+                return result  # 400/403: chat not found, bot blocked - retrying will not help
+        return result
+
+    async def deliver(self, chat_ids: List[str], text: str) -> List[DeliveryResult]:
+        """Send text to every chat with bounded concurrency; results keep the input order"""
+        results: List[Optional[DeliveryResult]] = [None] * len(chat_ids)
+        pending = iter(enumerate(chat_ids))
+
+        async def worker():
+            for index, chat_id in pending:
+                results[index] = await self.send(chat_id, text)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(chat_ids)))))
+        return results
+
+
+def _json_or_empty(response: httpx.Response) -> dict:
+    try:
+        body = response.json()
+    except ValueError:
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+_engine: Optional[TelegramDeliveryEngine] = None
+
+
+def get_delivery_engine() -> TelegramDeliveryEngine:
+    """Return the process-wide delivery engine, creating it on first use"""
+    global _engine
+    if _engine is None:
+        _engine = TelegramDeliveryEngine(get_telegram_bot_token())
+    return _engine
+
+
+async def close_delivery_engine() -> None:
+    """Close the shared HTTP client; called on app shutdown"""
+    global _engine
+    if _engine is not None:
+        engine, _engine = _engine, None
+        await engine.aclose()
+
+
 async def send_telegram_message(
     telegram_id: str,
     message: str,
@@ -23,46 +243,21 @@ async def send_telegram_message(
 ) -> bool:
     """
     Send message to a specific Telegram user
-    
+
     Args:
         telegram_id: Telegram user ID
         message: Message content
         title: Optional title/header
-        
+
     Returns:
         True if successful, False otherwise
     """
-    bot_token = get_telegram_bot_token()
-    if not bot_token:
-        app_logger.warning("TELEGRAM_BOT_TOKEN not set, cannot send Telegram message")
-        return False
-    
-    # Format message with title if provided
-    formatted_message = message
-    if title:
-        formatted_message = f"🔔 *{title}*\n\n{message}"
-    
-    telegram_api_url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-    
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                telegram_api_url,
-                json={
-                    "chat_id": telegram_id,
-                    "text": formatted_message,
-                    "parse_mode": "Markdown"
-                }
-            )
-            response.raise_for_status()
-            app_logger.info(f"Telegram message sent to {telegram_id}")
-            return True
-    except httpx.HTTPError as e:
-        app_logger.error(f"Failed to send Telegram message to {telegram_id}: {str(e)}")
-        return False
-    except Exception as e:
-        app_logger.error(f"Error sending Telegram message to {telegram_id}: {str(e)}")
-        return False
+    result = await get_delivery_engine().send(telegram_id, format_telegram_message(message, title))
+    if result.ok:
+        app_logger.info(f"Telegram message sent to {telegram_id}")
+    else:
+        app_logger.error(f"Failed to send Telegram message to {telegram_id}: {result.error}")
+    return result.ok
 
 
 async def send_telegram_broadcast(
@@ -72,31 +267,28 @@ async def send_telegram_broadcast(
 ) -> dict:
     """
     Send broadcast message to multiple Telegram users
-    
+
     Args:
         telegram_ids: List of Telegram user IDs
         message: Message content
         title: Optional title/header
-        
+
     Returns:
-        Dictionary with success_count and failed_count
+        Dictionary with success_count, failed_count, total and per-recipient results
     """
     if not telegram_ids:
-        return {"success_count": 0, "failed_count": 0, "total": 0}
-    
-    success_count = 0
-    failed_count = 0
-    
-    for telegram_id in telegram_ids:
-        success = await send_telegram_message(telegram_id, message, title)
-        if success:
-            success_count += 1
-        else:
-            failed_count += 1
-    
+        return {"success_count": 0, "failed_count": 0, "total": 0, "results": []}
+
+    if not get_telegram_bot_token():
+        app_logger.warning("TELEGRAM_BOT_TOKEN not set, cannot send Telegram message")
+
+    results = await get_delivery_engine().deliver(telegram_ids, format_telegram_message(message, title))
+    success_count = sum(1 for result in results if result.ok)
+    app_logger.info(f"Telegram broadcast: {success_count}/{len(results)} delivered")
+
     return {
         "success_count": success_count,
-        "failed_count": failed_count,
-        "total": len(telegram_ids)
+        "failed_count": len(results) - success_count,
+        "total": len(results),
+        "results": [asdict(result) for result in results]
     }
-
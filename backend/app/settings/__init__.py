@@ -1,3 +1 @@
-from app.settings.oauth_google import get_google_oauth_url, get_google_user_info_sync
-
-__all__ = ["get_google_oauth_url", "get_google_user_info_sync"]
+from app.settings.oauth_google import get_google_oauth_url, get_google_user_info
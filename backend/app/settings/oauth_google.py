@@ -1,19 +1,41 @@
+"""
+Google OAuth (OpenID Connect) login
+
+One GoogleOAuthClient per process talks to Google over a shared keep-alive
+httpx.AsyncClient with timeouts. The discovery document and the signing keys
+(JWKS) are cached, so a login is a single token request: the user's identity
+comes from the id_token, verified locally against the cached keys, and is
+refused unless the provider marks the email verified. The userinfo endpoint
+is only used if no id_token is returned. Point
+GOOGLE_DISCOVERY_URL at a local fake provider to test the flow offline.
+"""
+import asyncio
+import re
+from time import monotonic
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
 import httpx
-from typing import Dict
+from jose import jwt, JWTError
+
 from app.core.config import settings
 from app.core.logging_config import app_logger
 
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
 
-def get_google_oauth_url() -> str:
-    """Generate Google OAuth authorization URL"""
+class EmailNotVerified(Exception):
+    """The provider has not verified the account's email, so it cannot identify a user"""
+
+
+async def get_google_oauth_url() -> str:
+    """Generate Google OAuth authorization URL from the (cached) discovery document"""
     if not settings.GOOGLE_CLIENT_ID:
         raise ValueError("GOOGLE_CLIENT_ID not configured. Please set GOOGLE_CLIENT_ID in .env file.")
-    
+
     if not settings.GOOGLE_REDIRECT_URI:
         raise ValueError("GOOGLE_REDIRECT_URI not configured. Please set GOOGLE_REDIRECT_URI in .env file.")
 
-    from urllib.parse import urlencode
-    
     params = {
         "client_id": settings.GOOGLE_CLIENT_ID,
         "redirect_uri": settings.GOOGLE_REDIRECT_URI,
@@ -23,28 +45,98 @@ def get_google_oauth_url() -> str:
         "prompt": "select_account",
     }
 
+    metadata = await get_google_oauth().metadata()
     query_string = urlencode(params)
-    return f"https://accounts.google.com/o/oauth2/v2/auth?{query_string}"
+    return f"{metadata['authorization_endpoint']}?{query_string}"
 
 
-async def get_google_user_info(code: str) -> Dict[str, str]:
-    """Exchange authorization code for user info"""
-    if not settings.GOOGLE_CLIENT_ID or not settings.GOOGLE_CLIENT_SECRET:
-        raise ValueError("Google OAuth not configured")
+class GoogleOAuthClient:
+    """Code exchange and identity lookup with cached discovery metadata and keys"""
 
-    # Exchange code for token
-    token_url = "https://oauth2.googleapis.com/token"
-    token_data = {
-        "client_id": settings.GOOGLE_CLIENT_ID,
-        "client_secret": settings.GOOGLE_CLIENT_SECRET,
-        "code": code,
-        "grant_type": "authorization_code",
-        "redirect_uri": settings.GOOGLE_REDIRECT_URI,
-    }
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        redirect_uri: str,
+        discovery_url: str = settings.GOOGLE_DISCOVERY_URL,
+        client: Optional[httpx.AsyncClient] = None,
+        timeout: float = settings.OAUTH_HTTP_TIMEOUT_SECONDS,
+        cache_seconds: float = settings.OAUTH_METADATA_CACHE_SECONDS,
+    ):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.redirect_uri = redirect_uri
+        self.discovery_url = discovery_url
+        self.cache_seconds = cache_seconds
+        self.client = client or httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=10),
+        )
+        # url -> (fetched_at, expires_at, document)
+        self._cache: Dict[str, Tuple[float, float, Any]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
 
-    async with httpx.AsyncClient() as client:
+    async def _cached_json(self, url: str, refresh: bool = False) -> Any:
+        """GET a JSON document, cached for Cache-Control max-age (else cache_seconds)"""
+        requested_at = monotonic()
+        entry = self._cache.get(url)
+        if entry is not None and not refresh and entry[1] > requested_at:
+            return entry[2]
+        # One fetch at a time per URL; logins waiting on it reuse the result
+        async with self._locks.setdefault(url, asyncio.Lock()):
+            entry = self._cache.get(url)
+            if entry is not None and entry[0] >= requested_at:
+                return entry[2]
+            response = await self.client.get(url)
+            response.raise_for_status()
+            document = response.json()
+            match = _MAX_AGE.search(response.headers.get("cache-control", ""))
+            max_age = int(match.group(1)) if match else self.cache_seconds
+            fetched_at = monotonic()
+            self._cache[url] = (fetched_at, fetched_at + min(max_age, self.cache_seconds), document)
+            return document
+
+    async def metadata(self) -> Dict[str, Any]:
+        return await self._cached_json(self.discovery_url)
+
+    async def _signing_key(self, kid: Optional[str]) -> Dict[str, Any]:
+        jwks_uri = (await self.metadata())["jwks_uri"]
+        keys = await self._cached_json(jwks_uri)
+        key = next((k for k in keys.get("keys", []) if k.get("kid") == kid), None)
+        if key is None:
+            # Keys rotated since they were cached
+            keys = await self._cached_json(jwks_uri, refresh=True)
+            key = next((k for k in keys.get("keys", []) if k.get("kid") == kid), None)
+        if key is None:
+            raise JWTError(f"Unknown signing key {kid}")
+        return key
+
+    async def _verify_id_token(self, id_token: str, access_token: Optional[str]) -> Dict[str, Any]:
+        metadata = await self.metadata()
+        key = await self._signing_key(jwt.get_unverified_header(id_token).get("kid"))
+        return jwt.decode(
+            id_token,
+            key,
+            algorithms=[key.get("alg", "RS256")],
+            audience=self.client_id,
+            issuer=metadata["issuer"],
+            access_token=access_token,
+        )
+
+    async def user_info(self, code: str) -> Dict[str, Optional[str]]:
+        """Exchange an authorization code for the user's id, email, name and picture"""
+        metadata = await self.metadata()
         try:
-            token_response = await client.post(token_url, data=token_data)
+            token_response = await self.client.post(metadata["token_endpoint"], data={
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "code": code,
+                "grant_type": "authorization_code",
+                "redirect_uri": self.redirect_uri,
+            })
             token_response.raise_for_status()
             token_json = token_response.json()
             access_token = token_json["access_token"]
@@ -52,31 +144,50 @@ async def get_google_user_info(code: str) -> Dict[str, str]:
             app_logger.error(f"Failed to exchange code for token: {str(e)}")
             raise
 
-        # Get user info
-        userinfo_url = "https://www.googleapis.com/oauth2/v2/userinfo"
-        headers = {"Authorization": f"Bearer {access_token}"}
-
         try:
-            userinfo_response = await client.get(userinfo_url, headers=headers)
-            userinfo_response.raise_for_status()
-            userinfo = userinfo_response.json()
+            if token_json.get("id_token"):
+                claims = await self._verify_id_token(token_json["id_token"], access_token)
+            else:
+                userinfo_response = await self.client.get(
+                    metadata["userinfo_endpoint"], headers={"Authorization": f"Bearer {access_token}"}
+                )
+                userinfo_response.raise_for_status()
+                claims = userinfo_response.json()
+            # Accounts are looked up and linked by email, so it must be the user's
+            if claims.get("email_verified") not in (True, "true"):
+                raise EmailNotVerified(f"Email {claims.get('email')} is not verified")
             return {
-                "id": userinfo["id"],
-                "email": userinfo["email"],
-                "name": userinfo.get("name", userinfo["email"]),
-                "picture": userinfo.get("picture"),
+                "id": str(claims.get("sub") or claims["id"]),
+                "email": claims["email"],
+                "name": claims.get("name", claims["email"]),
+                "picture": claims.get("picture"),
             }
         except Exception as e:
             app_logger.error(f"Failed to get user info: {str(e)}")
             raise
 
 
-def get_google_user_info_sync(code: str) -> Dict[str, str]:
-    """Synchronous version for non-async contexts"""
-    import asyncio
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    return loop.run_until_complete(get_google_user_info(code))
+_oauth: Optional[GoogleOAuthClient] = None
+
+
+def get_google_oauth() -> GoogleOAuthClient:
+    """Return the process-wide OAuth client, creating it on first use"""
+    global _oauth
+    if not settings.GOOGLE_CLIENT_ID or not settings.GOOGLE_CLIENT_SECRET:
+        raise ValueError("Google OAuth not configured")
+    if _oauth is None:
+        _oauth = GoogleOAuthClient(settings.GOOGLE_CLIENT_ID, settings.GOOGLE_CLIENT_SECRET, settings.GOOGLE_REDIRECT_URI)
+    return _oauth
+
+
+async def close_google_oauth() -> None:
+    """Close the shared HTTP client; called on app shutdown"""
+    global _oauth
+    if _oauth is not None:
+        oauth, _oauth = _oauth, None
+        await oauth.aclose()
+
+
+async def get_google_user_info(code: str) -> Dict[str, Optional[str]]:
+    """Exchange authorization code for user info"""
+    return await get_google_oauth().user_info(code)
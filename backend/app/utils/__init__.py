@@ -3,9 +3,9 @@ from app.utils.jwt import get_current_user, oauth2_scheme
 from app.utils.calculations import (
     calculate_savings_balance,
     calculate_loan_remaining,
+    loan_remaining_expression,
     update_loan_status,
     update_target_status,
-    get_monthly_summary,
 )
 from app.utils.rate_limit import rate_limit
 
@@ -16,8 +16,8 @@ __all__ = [
     "oauth2_scheme",
     "calculate_savings_balance",
     "calculate_loan_remaining",
+    "loan_remaining_expression",
     "update_loan_status",
     "update_target_status",
-    "get_monthly_summary",
     "rate_limit",
 ]
@@ -0,0 +1,57 @@
+"""
+Avatar image rendering
+
+Runs in the avatar process pool, so it only imports the standard library and
+Pillow: spawned workers start quickly and never load the app or the database.
+"""
+import os
+import tempfile
+from typing import List, Sequence
+
+# Larger images are refused before they are decoded (decompression bombs)
+MAX_PIXELS = 40_000_000
+
+
+def render_avatar(source_path: str, out_dir: str, name: str, sizes: Sequence[int], quality: int = 82) -> List[str]:
+    """
+    Write <name>_<size>.webp squares for each size and return their filenames
+
+    The image is centre-cropped to a square at the largest size; smaller sizes
+    are downscaled from that. Existing files are kept: the name is a content
+    hash, so they already hold the same picture (callers lock the name so they
+    are not deleted meanwhile). Raises ValueError when the source is not a
+    readable image.
+    """
+    from PIL import Image, ImageOps
+
+    largest = max(sizes)
+    try:
+        with Image.open(source_path) as image:
+            if image.width * image.height > MAX_PIXELS:
+                raise ValueError(f"Image is too large ({image.width}x{image.height})")
+            # JPEG: let the decoder scale down by up to 8x instead of decoding full size
+            image.draft("RGB", (largest, largest))
+            image = ImageOps.exif_transpose(image)
+            has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+            square = ImageOps.fit(image, (largest, largest), Image.LANCZOS)
+    except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+        raise ValueError(f"Not a valid image: {e}") from None
+
+    filenames = []
+    for size in sorted(set(sizes), reverse=True):
+        filename = f"{name}_{size}.webp"
+        target = os.path.join(out_dir, filename)
+        if not os.path.exists(target):
+            variant = square if size == largest else square.resize((size, size), Image.LANCZOS)
+            fd, tmp_path = tempfile.mkstemp(dir=out_dir, prefix=".", suffix=".webp")
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    variant.save(out, "WEBP", quality=quality, method=4)
+                # Readers never see a half-written file
+                os.replace(tmp_path, target)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        filenames.append(filename)
+    return filenames
@@ -1,6 +1,6 @@
 from typing import List
-from datetime import date
 from sqlalchemy.orm import Session
+from sqlalchemy import func, case, select
 from app.models.savings import Savings
 from app.models.loan import Loan, LoanPayment
 from app.models.target import Target
@@ -8,10 +8,13 @@ from app.models.target import Target
 
 def calculate_savings_balance(db: Session, user_id: int) -> dict:
     """Calculate total balance, income, and expense for a user"""
-    savings = db.query(Savings).filter(Savings.user_id == user_id).all()
+    total_income, total_expense = db.query(
+        func.coalesce(func.sum(case((Savings.type == "IN", Savings.amount), else_=0.0)), 0.0),
+        func.coalesce(func.sum(case((Savings.type == "OUT", Savings.amount), else_=0.0)), 0.0)
+    ).filter(Savings.user_id == user_id).one()
 
-    total_income = sum(s.amount for s in savings if s.type == "IN")
-    total_expense = sum(s.amount for s in savings if s.type == "OUT")
+    total_income = float(total_income)
+    total_expense = float(total_expense)
     total_balance = total_income - total_expense
 
     return {
@@ -21,15 +24,26 @@ def calculate_savings_balance(db: Session, user_id: int) -> dict:
     }
 
 
+def loan_remaining_expression():
+    """
+    SQL expression for max(0, principal - paid) of the Loan in the enclosing query
+
+    Payments are summed by a correlated subquery on loan_payments.loan_id, so
+    any number of loans can be selected with their remaining amount in one query.
+    """
+    paid = select(
+        func.coalesce(func.sum(LoanPayment.amount), 0.0)
+    ).where(
+        LoanPayment.loan_id == Loan.id
+    ).correlate(Loan).scalar_subquery()
+    remaining = Loan.principal - paid
+    return case((remaining > 0, remaining), else_=0.0)
+
+
 def calculate_loan_remaining(db: Session, loan_id: int) -> float:
     """Calculate remaining amount for a loan"""
-    loan = db.query(Loan).filter(Loan.id == loan_id).first()
-    if not loan:
-        return 0.0
-
-    total_payments = sum(p.amount for p in loan.payments)
-    remaining = loan.principal - total_payments
-    return max(0.0, remaining)
+    remaining = db.query(loan_remaining_expression()).filter(Loan.id == loan_id).scalar()
+    return float(remaining) if remaining is not None else 0.0
 
 
 def update_loan_status(db: Session, loan_id: int) -> None:
@@ -59,25 +73,3 @@ def update_target_status(db: Session, target_id: int) -> None:
         target.status = "active"
 
     db.commit()
-
-
-def get_monthly_summary(db: Session, user_id: int, year: int, month: int) -> dict:
-    """Get monthly income and expense summary"""
-    from sqlalchemy import extract
-
-    savings = db.query(Savings).filter(
-        Savings.user_id == user_id,
-        extract("year", Savings.date) == year,
-        extract("month", Savings.date) == month
-    ).all()
-
-    income = sum(s.amount for s in savings if s.type == "IN")
-    expense = sum(s.amount for s in savings if s.type == "OUT")
-
-    return {
-        "month": month,
-        "year": year,
-        "income": income,
-        "expense": expense,
-        "net": income - expense,
-    }
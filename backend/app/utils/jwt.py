@@ -1,44 +1,45 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.security import verify_token
 from app.models.user import User
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db
+from app.utils.principal_cache import principal_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token"""
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _user_id_from_token(token: str) -> int:
     payload = verify_token(token)
     if payload is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
     user_id: Optional[str] = payload.get("sub")
     if user_id is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
     try:
-        user_id_int = int(user_id)
+        return int(user_id)
     except ValueError:
-        raise credentials_exception
+        raise _credentials_exception()
+
 
-    user = db.query(User).filter(User.id == user_id_int).first()
+def _check_user(user: Optional[User]) -> User:
     if user is None:
-        raise credentials_exception
-    
+        raise _credentials_exception()
+
     # Check if user is active (for suspend/unsuspend feature)
     if not user.is_active:
         raise HTTPException(
@@ -49,6 +50,46 @@ def get_current_user(
     return user
 
 
+def load_user(db: Session, user_id: int) -> Optional[User]:
+    """Load a user by id, from the principal cache when possible"""
+    if not settings.AUTH_CACHE_ENABLED:
+        return db.query(User).filter(User.id == user_id).first()
+
+    user = principal_cache.load(db, user_id)
+    if user is None:
+        version = principal_cache.version(user_id)
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is not None:
+            principal_cache.store(user, version)
+    return user
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> User:
+    """Get current authenticated user from JWT token (from the principal cache when possible)"""
+    return _check_user(load_user(db, _user_id_from_token(token)))
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Get current authenticated user from JWT token on the async session"""
+    user_id = _user_id_from_token(token)
+    if not settings.AUTH_CACHE_ENABLED:
+        return _check_user(await db.get(User, user_id))
+
+    user = await principal_cache.load_async(db, user_id)
+    if user is None:
+        version = principal_cache.version(user_id)
+        user = await db.get(User, user_id)
+        if user is not None:
+            principal_cache.store(user, version)
+    return _check_user(user)
+
+
 def get_current_admin(
     user: User = Depends(get_current_user)
 ) -> User:
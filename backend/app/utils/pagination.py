@@ -0,0 +1,121 @@
+"""
+Keyset (cursor) pagination helpers
+
+A cursor is the sort key of the last row on the previous page, encoded as
+URL-safe base64 JSON. The next page is fetched with a row-value comparison
+on the same key, e.g. WHERE (date, id) < (:date, :id), so every page costs
+the same index range scan regardless of how deep the client has paged.
+Sort keys must end with a unique column (usually id) to be stable.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode sort key values into an opaque cursor string"""
+    payload = json.dumps(
+        [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values],
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """Decode a cursor back into sort key values typed like columns"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match sort key")
+
+        decoded = []
+        for column, value in zip(columns, values):
+            python_type = column.type.python_type
+            if value is not None and python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif value is not None and python_type is date:
+                value = date.fromisoformat(value)
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError, UnicodeError, binascii.Error, NotImplementedError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _keyset_filter(query, columns, cursor, limit, descending):
+    # Works on both Query and select(): both have filter(), order_by() and limit()
+    if limit < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="limit must be at least 1"
+        )
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        row_key, cursor_key = tuple_(*columns), tuple_(*values)
+        query = query.filter(row_key < cursor_key if descending else row_key > cursor_key)
+
+    order = [c.desc() if descending else c.asc() for c in columns]
+    # One extra row tells us whether there is a next page without a COUNT
+    return query.order_by(*order).limit(limit + 1)
+
+
+def _split_page(rows: List[Any], key, limit: int) -> Tuple[List[Any], Optional[str]]:
+    items = rows[:limit]
+    next_cursor = encode_cursor(key(items[-1])) if len(rows) > limit else None
+    return items, next_cursor
+
+
+def keyset_page(
+    query: Query,
+    columns: Sequence[Any],
+    key: Callable[[Any], Tuple[Any, ...]],
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one page of query ordered by columns, starting after cursor
+
+    Args:
+        query: Filtered query (without ORDER BY/OFFSET/LIMIT)
+        columns: Sort key columns, ending with a unique column
+        key: Returns the sort key values of a result row
+        cursor: Cursor from the previous page, or empty/None for the first page
+        limit: Page size
+        descending: Sort direction for every column
+
+    Returns:
+        (items, next_cursor); next_cursor is None on the last page
+    """
+    rows = _keyset_filter(query, columns, cursor, limit, descending).all()
+    return _split_page(rows, key, limit)
+
+
+async def keyset_page_async(
+    db: AsyncSession,
+    statement: Select,
+    columns: Sequence[Any],
+    key: Callable[[Any], Tuple[Any, ...]],
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    keyset_page for a select() on an AsyncSession
+
+    A statement selecting a single entity returns the entities themselves,
+    otherwise result rows are returned, as with Query.
+    """
+    result = await db.execute(_keyset_filter(statement, columns, cursor, limit, descending))
+    rows = result.scalars().all() if len(statement.column_descriptions) == 1 else result.all()
+    return _split_page(list(rows), key, limit)
@@ -0,0 +1,197 @@
+"""
+Authenticated-user (principal) cache
+
+get_current_user used to load the user row on every request. Now a bounded
+TTL cache keeps a snapshot of each user's columns by id, and a hit is merged
+into the request's session with merge(load=False): the handler gets a normal
+persistent User (changes it makes are flushed as usual) without a SELECT.
+
+Invalidation is immediate, within and across workers:
+- any flushed change to or delete of a User instance, and every
+  bump_data_version()/bump_data_versions(), marks the user(s) on the session
+  (added, changed and deleted users also mark USER_SET_CHANGED, which
+  admin statistics are cached under);
+- after the transaction commits, the marks drop the local entries and bump
+  counters in InvalidationTable, a small memory-mapped file shared by all
+  workers on the host. Each cached entry remembers the counters it was loaded
+  under and is discarded as soon as they differ.
+Hosts do not share the table, so across hosts AUTH_CACHE_TTL_SECONDS bounds
+staleness.
+"""
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.models.user import User
+from app.utils.response_cache import (
+    ALL_USERS,
+    PRINCIPAL_INVALIDATIONS,
+    USER_SET_CHANGED,
+    ResponseCache,
+    invalidate_principal,
+)
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: invalidation stays within the process
+    fcntl = None
+
+
+class InvalidationTable:
+    """
+    Shared counters: slot 0 invalidates everyone, the next `slots` one user
+    each, and the last one counts changes to the set of users (USER_SET_CHANGED)
+
+    Users hash onto `slots` counters; a collision only costs an extra reload.
+    """
+
+    COUNTER = struct.Struct("<Q")
+
+    def __init__(self, path: Optional[str] = None, slots: int = 4096):
+        self.slots = slots
+        size = (slots + 2) * self.COUNTER.size
+        self._lock = threading.Lock()
+        self._fd = None
+        if fcntl is None:
+            self._map = bytearray(size)
+            return
+        self.path = path or os.path.join(
+            "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "botaxxx-auth-invalidation"
+        )
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._fd, size)
+
+    def _slot(self, user_id: int) -> int:
+        return 1 + user_id % self.slots
+
+    def _read(self, slot: int) -> int:
+        return self.COUNTER.unpack_from(self._map, slot * self.COUNTER.size)[0]
+
+    def version(self, user_id: int) -> Tuple[int, int]:
+        """Counters a cached entry for user_id is valid under"""
+        return self._read(0), self._read(self._slot(user_id))
+
+    def users_version(self) -> int:
+        """Bumped whenever a user is added, changed or deleted, in any worker on the host"""
+        return self._read(self.slots + 1)
+
+    def _slot_of(self, user_id: Any) -> int:
+        if user_id == ALL_USERS:
+            return 0
+        if user_id == USER_SET_CHANGED:
+            return self.slots + 1
+        return self._slot(user_id)
+
+    def bump(self, user_ids: Iterable[Any]) -> None:
+        """Invalidate the given user ids everywhere; ALL_USERS invalidates every user"""
+        slots = {self._slot_of(user_id) for user_id in user_ids}
+        with self._lock:
+            if self._fd is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                for slot in slots:
+                    offset = slot * self.COUNTER.size
+                    value = self.COUNTER.unpack_from(self._map, offset)[0]
+                    self.COUNTER.pack_into(self._map, offset, (value + 1) % 2 ** 64)
+            finally:
+                if self._fd is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+class PrincipalCache:
+    """User snapshots by id, validated against the shared invalidation table"""
+
+    def __init__(self, table: InvalidationTable, max_entries: int = 10000, ttl_seconds: float = 60.0):
+        self.table = table
+        self.entries = ResponseCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._columns = [attr.key for attr in inspect(User).column_attrs]
+
+    def version(self, user_id: int) -> Tuple[int, int]:
+        """Take before loading the user, so a write committed meanwhile invalidates the entry"""
+        return self.table.version(user_id)
+
+    def store(self, user: User, version: Tuple[int, int]) -> None:
+        snapshot = {key: getattr(user, key) for key in self._columns}
+        self.entries.set(user.id, (version, snapshot))
+
+    def snapshot(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Cached column values of a user (do not modify), or None on a miss"""
+        entry = self.entries.get(user_id)
+        if entry is None:
+            return None
+        version, snapshot = entry
+        if version != self.table.version(user_id):
+            self.entries.delete(user_id)
+            return None
+        return snapshot
+
+    def _detached(self, user_id: int) -> Optional[User]:
+        snapshot = self.snapshot(user_id)
+        if snapshot is None:
+            return None
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return user
+
+    def load(self, db: Session, user_id: int) -> Optional[User]:
+        """Cached user as a persistent instance of db, or None on a miss"""
+        user = self._detached(user_id)
+        return db.merge(user, load=False) if user is not None else None
+
+    async def load_async(self, db, user_id: int) -> Optional[User]:
+        user = self._detached(user_id)
+        return await db.merge(user, load=False) if user is not None else None
+
+    def invalidate(self, user_ids: Iterable[Any]) -> None:
+        user_ids = set(user_ids)
+        if ALL_USERS in user_ids:
+            self.entries.clear()
+        else:
+            for user_id in user_ids:
+                self.entries.delete(user_id)
+        self.table.bump(user_ids)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+principal_cache = PrincipalCache(
+    InvalidationTable(settings.AUTH_CACHE_INVALIDATION_PATH or None),
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_changed_users(session: Session, flush_context) -> None:
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            invalidate_principal(session, USER_SET_CHANGED)
+            identity = inspect(obj).identity
+            if identity is not None:
+                invalidate_principal(session, identity[0])
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session: Session) -> None:
+    pending = session.info.pop(PRINCIPAL_INVALIDATIONS, None)
+    if pending:
+        principal_cache.invalidate(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session) -> None:
+    session.info.pop(PRINCIPAL_INVALIDATIONS, None)
@@ -1,12 +1,380 @@
+"""
+Rate limiting with pluggable, memory-bounded backends
+
+A RateLimiter maps each request to one or more (key, Limit) pairs - per
+route, per authenticated user, else per client IP - and asks a backend
+whether the next hit is allowed. Backends keep O(1) state per key:
+- memory: token buckets in an LRU dict capped at RATE_LIMIT_MAX_KEYS (one
+  process);
+- shared: token buckets in a fixed-size table in a memory-mapped file
+  (/dev/shm by default) guarded by flock, shared by all uvicorn workers on a
+  host; a full bucket of slots evicts its least recently used key;
+- redis: sliding-window counters (INCR + EXPIRE, one round trip) in Redis or
+  anything speaking its protocol, shared across hosts; keys expire on their own.
+
+Select one with RATE_LIMIT_BACKEND.
+
+LoginThrottle separately counts failed password logins per email and IP in
+the same backend.
+"""
+import asyncio
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from functools import wraps
+from math import ceil
 from time import time
-from typing import Dict, Tuple
-from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
 from fastapi import Request, HTTPException, status
 
-# In-memory rate limit storage
-# Format: {identifier: [(timestamp, count), ...]}
-_rate_limit_store: Dict[str, list] = defaultdict(list)
+from app.core.config import settings
+from app.core.logging_config import app_logger
+from app.core.security import verify_token
+
+
+@dataclass(frozen=True)
+class Limit:
+    """requests per per_seconds; token buckets allow a burst of `requests`"""
+    requests: int
+    per_seconds: float = 60.0
+
+    @property
+    def rate(self) -> float:
+        return self.requests / self.per_seconds
+
+
+# (allowed, seconds until the next request would be allowed)
+Decision = Tuple[bool, float]
+
+
+def _take_token(tokens: float, updated: float, limit: Limit, now: float) -> Tuple[float, Decision]:
+    """Refill a bucket to now and try to take one token; returns (new tokens, decision)"""
+    tokens = min(float(limit.requests), tokens + max(0.0, now - updated) * limit.rate)
+    if tokens >= 1:
+        return tokens - 1, (True, 0.0)
+    return tokens, (False, (1 - tokens) / limit.rate)
+
+
+class MemoryBackend:
+    """Per-process token buckets, least recently used keys evicted beyond max_keys"""
+
+    def __init__(self, max_keys: int = 100000, clock: Callable[[], float] = time):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def hit(self, key: str, limit: Limit) -> Decision:
+        now = self.clock()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(limit.requests), now))
+            tokens, decision = _take_token(tokens, updated, limit, now)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return decision
+
+    async def peek(self, key: str, limit: Limit) -> Decision:
+        """Whether a hit would be allowed now, without taking a token"""
+        now = self.clock()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(limit.requests), now))
+        return _take_token(tokens, updated, limit, now)[1]
+
+    async def reset(self, key: str, limit: Limit) -> None:
+        """Start key over with a full bucket"""
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+class SharedMemoryBackend:
+    """
+    Token buckets in a memory-mapped file shared by every process on the host
+
+    The file is a fixed table of (key digest, tokens, updated) slots grouped
+    in buckets of SLOTS_PER_BUCKET; a key lives in the bucket its digest
+    points at, so memory never grows with the number of clients.
+    """
+
+    SLOT = struct.Struct("<Qdd")
+    SLOTS_PER_BUCKET = 4
+    # While another process holds the file: yield this many times, then sleep between tries
+    LOCK_SPINS = 8
+    LOCK_RETRY_SECONDS = 0.001
+
+    def __init__(self, path: Optional[str] = None, max_keys: int = 100000, clock: Callable[[], float] = time):
+        import fcntl  # POSIX only
+        self._fcntl = fcntl
+        self.path = path or _default_shared_path()
+        self.clock = clock
+        self.buckets = max(1, max_keys // self.SLOTS_PER_BUCKET)
+        size = self.buckets * self.SLOTS_PER_BUCKET * self.SLOT.size
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._file_lock():
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+    def _file_lock(self):
+        backend = self
+
+        class _Lock:
+            def __enter__(self):
+                backend._fcntl.flock(backend._fd, backend._fcntl.LOCK_EX)
+
+            def __exit__(self, *exc):
+                backend._fcntl.flock(backend._fd, backend._fcntl.LOCK_UN)
+
+        return _Lock()
+
+    def _try_lock(self) -> bool:
+        """Take the thread lock and the file lock without blocking; False if either is held"""
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._fcntl.flock(self._fd, self._fcntl.LOCK_EX | self._fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock.release()
+            return False
+        except BaseException:
+            self._lock.release()
+            raise
+        return True
+
+    def _unlock(self) -> None:
+        self._fcntl.flock(self._fd, self._fcntl.LOCK_UN)
+        self._lock.release()
+
+    async def _acquire(self) -> None:
+        # A blocking flock would stall the event loop while another worker holds it
+        attempt = 0
+        while not self._try_lock():
+            await asyncio.sleep(0 if attempt < self.LOCK_SPINS else self.LOCK_RETRY_SECONDS)
+            attempt += 1
+
+    def _slots(self, key: str) -> Tuple[int, List[int]]:
+        """(digest, offsets of the slots the key may live in)"""
+        # Digest 0 marks an empty slot
+        digest = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little") or 1
+        first = (digest % self.buckets) * self.SLOTS_PER_BUCKET
+        return digest, [(first + i) * self.SLOT.size for i in range(self.SLOTS_PER_BUCKET)]
+
+    async def hit(self, key: str, limit: Limit) -> Decision:
+        return await self._bucket(key, limit, take=True)
+
+    async def peek(self, key: str, limit: Limit) -> Decision:
+        """Whether a hit would be allowed now, without taking a token"""
+        return await self._bucket(key, limit, take=False)
+
+    async def _bucket(self, key: str, limit: Limit, take: bool) -> Decision:
+        digest, slots = self._slots(key)
+        await self._acquire()
+        try:
+            now = self.clock()
+            entries = [self.SLOT.unpack_from(self._map, offset) for offset in slots]
+            match = next((i for i, entry in enumerate(entries) if entry[0] == digest), None)
+            if match is None:
+                # Take an empty slot, else evict the least recently used key in this bucket
+                match = min(range(len(entries)), key=lambda i: (entries[i][0] != 0, entries[i][2]))
+                tokens, updated = float(limit.requests), now
+            else:
+                _, tokens, updated = entries[match]
+            tokens, decision = _take_token(tokens, updated, limit, now)
+            if take:
+                self.SLOT.pack_into(self._map, slots[match], digest, tokens, now)
+        finally:
+            self._unlock()
+        return decision
+
+    async def reset(self, key: str, limit: Limit) -> None:
+        """Start key over with a full bucket"""
+        digest, slots = self._slots(key)
+        await self._acquire()
+        try:
+            for offset in slots:
+                if self.SLOT.unpack_from(self._map, offset)[0] == digest:
+                    self.SLOT.pack_into(self._map, offset, 0, 0.0, 0.0)
+        finally:
+            self._unlock()
+
+
+def _default_shared_path() -> str:
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, "botaxxx-rate-limit")
+
+
+class RespClient:
+    """Minimal asyncio client for the Redis protocol (RESP2), one connection per event loop"""
+
+    def __init__(self, url: str, timeout: float = 1.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._connections: Dict[int, tuple] = {}
+
+    @staticmethod
+    def _encode(*args) -> bytes:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = str(arg).encode("utf-8")
+            parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+        return b"".join(parts)
+
+    @classmethod
+    async def _read_reply(cls, reader: asyncio.StreamReader):
+        line = (await reader.readline()).rstrip(b"\r\n")
+        if not line:
+            raise ConnectionError("connection closed")
+        kind, rest = line[:1], line[1:]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RuntimeError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            return (await reader.readexactly(length + 2))[:-2].decode()
+        if kind == b"*":
+            length = int(rest)
+            return None if length < 0 else [await cls._read_reply(reader) for _ in range(length)]
+        raise RuntimeError(f"unexpected reply {line!r}")
+
+    async def _connection(self):
+        loop_id = id(asyncio.get_running_loop())
+        connection = self._connections.get(loop_id)
+        if connection is None:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+            connection = (reader, writer, asyncio.Lock())
+            self._connections[loop_id] = connection
+            setup = ([("AUTH", self.password)] if self.password else []) + ([("SELECT", self.db)] if self.db else [])
+            if setup:
+                await self._send(connection, setup)
+        return connection
+
+    async def _send(self, connection, commands: List[tuple]) -> list:
+        reader, writer, lock = connection
+        async with lock:
+            writer.write(b"".join(self._encode(*command) for command in commands))
+            await writer.drain()
+            return [await asyncio.wait_for(self._read_reply(reader), self.timeout) for _ in commands]
+
+    async def pipeline(self, *commands: tuple) -> list:
+        """Send commands in one round trip and return their replies"""
+        connection = await self._connection()
+        try:
+            return await self._send(connection, list(commands))
+        except (OSError, ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            # Drop the connection; the next call reconnects
+            self._connections.pop(id(asyncio.get_running_loop()), None)
+            connection[1].close()
+            raise
+
+    async def close(self) -> None:
+        for _, writer, _ in self._connections.values():
+            writer.close()
+        self._connections.clear()
+
+
+_REDIS_ERRORS = (OSError, ConnectionError, RuntimeError, asyncio.TimeoutError, asyncio.IncompleteReadError)
+
+
+class RedisBackend:
+    """
+    Sliding-window counters in Redis: the estimate is this window's count plus
+    the previous window's count weighted by how much of it still overlaps.
+    Rejected requests are counted too. Fails open if Redis is unreachable.
+    """
+
+    def __init__(self, url: str, prefix: str = "rl:", clock: Callable[[], float] = time):
+        self.client = RespClient(url)
+        self.prefix = prefix
+        self.clock = clock
+
+    def _window(self, key: str, limit: Limit) -> Tuple[str, str, float]:
+        """(this window's key, the previous window's key, seconds into this window)"""
+        now = self.clock()
+        window = int(now // limit.per_seconds)
+        return f"{self.prefix}{key}:{window}", f"{self.prefix}{key}:{window - 1}", now - window * limit.per_seconds
+
+    @staticmethod
+    def _decide(current: int, previous: Optional[str], elapsed: float, limit: Limit) -> Decision:
+        overlap = 1 - elapsed / limit.per_seconds
+        estimate = int(previous or 0) * overlap + current
+        if estimate <= limit.requests:
+            return True, 0.0
+        return False, limit.per_seconds - elapsed
+
+    async def hit(self, key: str, limit: Limit) -> Decision:
+        current_key, previous_key, elapsed = self._window(key, limit)
+        try:
+            current, _, previous = await self.client.pipeline(
+                ("INCR", current_key),
+                ("EXPIRE", current_key, int(limit.per_seconds * 2) + 1),
+                ("GET", previous_key),
+            )
+        except _REDIS_ERRORS as e:
+            app_logger.warning(f"Rate limit backend unavailable, allowing request: {str(e)}")
+            return True, 0.0
+        return self._decide(current, previous, elapsed, limit)
+
+    async def peek(self, key: str, limit: Limit) -> Decision:
+        """Whether a hit would be allowed now, without counting one"""
+        current_key, previous_key, elapsed = self._window(key, limit)
+        try:
+            current, previous = await self.client.pipeline(("GET", current_key), ("GET", previous_key))
+        except _REDIS_ERRORS as e:
+            app_logger.warning(f"Rate limit backend unavailable, allowing request: {str(e)}")
+            return True, 0.0
+        return self._decide(int(current or 0) + 1, previous, elapsed, limit)
+
+    async def reset(self, key: str, limit: Limit) -> None:
+        """Forget key's counts"""
+        current_key, previous_key, _ = self._window(key, limit)
+        try:
+            await self.client.pipeline(("DEL", current_key, previous_key))
+        except _REDIS_ERRORS as e:
+            app_logger.warning(f"Rate limit backend unavailable, could not reset {key}: {str(e)}")
+
+
+def create_backend(name: Optional[str] = None):
+    """Build the backend named by RATE_LIMIT_BACKEND"""
+    name = name or settings.RATE_LIMIT_BACKEND
+    if name == "memory":
+        return MemoryBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+    if name == "shared":
+        return SharedMemoryBackend(path=settings.RATE_LIMIT_SHARED_PATH or None, max_keys=settings.RATE_LIMIT_MAX_KEYS)
+    if name == "redis":
+        return RedisBackend(settings.RATE_LIMIT_REDIS_URL)
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {name}")
+
+
+# Stricter limits for credential endpoints, per client IP
+ROUTE_LIMITS: Dict[str, Limit] = {
+    "/auth/login": Limit(5, 60),
+    "/auth/register": Limit(3, 60),
+    "/auth/telegram-login": Limit(10, 60),
+}
 
 
 def get_client_identifier(request: Request) -> str:
@@ -16,14 +384,140 @@ def get_client_identifier(request: Request) -> str:
     return "unknown"
 
 
+def _user_id_from_header(authorization: Optional[str]) -> Optional[str]:
+    """Subject of a valid bearer token, without touching the database"""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    payload = verify_token(authorization[7:].strip())
+    return str(payload["sub"]) if payload and payload.get("sub") is not None else None
+
+
+class RateLimiter:
+    """Apply route, per-user and per-IP limits to requests through a backend"""
+
+    def __init__(
+        self,
+        backend=None,
+        ip_limit: Optional[Limit] = None,
+        user_limit: Optional[Limit] = None,
+        route_limits: Optional[Dict[str, Limit]] = None,
+    ):
+        self.backend = backend if backend is not None else create_backend()
+        self.ip_limit = ip_limit or Limit(settings.RATE_LIMIT_PER_MINUTE)
+        self.user_limit = user_limit or Limit(settings.RATE_LIMIT_PER_USER_PER_MINUTE)
+        self.route_limits = ROUTE_LIMITS if route_limits is None else route_limits
+
+    def rules(self, path: str, client_ip: str, authorization: Optional[str]) -> List[Tuple[str, Limit]]:
+        rules = []
+        route = path.rstrip("/") or "/"
+        route_limit = self.route_limits.get(route)
+        if route_limit is not None:
+            rules.append((f"route:{route}:{client_ip}", route_limit))
+        user_id = _user_id_from_header(authorization)
+        if user_id is not None:
+            rules.append((f"user:{user_id}", self.user_limit))
+        else:
+            rules.append((f"ip:{client_ip}", self.ip_limit))
+        return rules
+
+    async def check(self, path: str, client_ip: str, authorization: Optional[str] = None) -> Optional[float]:
+        """None if the request may proceed, else seconds until it would be allowed"""
+        for key, limit in self.rules(path, client_ip, authorization):
+            allowed, retry_after = await self.backend.hit(key, limit)
+            if not allowed:
+                return retry_after
+        return None
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter built from settings on first use"""
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter()
+    return _limiter
+
+
+class LoginThrottle:
+    """
+    Failed password logins per email and per client IP
+
+    Checked before any bcrypt work, so guessing passwords costs the attacker
+    a 429 rather than the server a hash. Failures are kept in a rate-limit
+    backend (RATE_LIMIT_BACKEND unless one is passed) as buckets of
+    max_per_* attempts refilled over window_seconds, so with the shared or
+    redis backend the limit holds across workers and hosts.
+    """
+
+    def __init__(
+        self,
+        max_per_email: int = 5,
+        max_per_ip: int = 20,
+        window_seconds: float = 900,
+        backend=None
+    ):
+        self.limits = {
+            "email": Limit(max_per_email, window_seconds),
+            "ip": Limit(max_per_ip, window_seconds),
+        }
+        self._backend = backend
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = create_backend()
+        return self._backend
+
+    @staticmethod
+    def _keys(email: Optional[str], client_ip: Optional[str]) -> List[Tuple[str, str]]:
+        keys = []
+        if email:
+            keys.append(("email", f"login:email:{email.strip().lower()}"))
+        if client_ip:
+            keys.append(("ip", f"login:ip:{client_ip}"))
+        return keys
+
+    async def check(self, email: Optional[str], client_ip: Optional[str]) -> Optional[float]:
+        """None if another attempt is allowed, else seconds until it is"""
+        for kind, key in self._keys(email, client_ip):
+            allowed, retry_after = await self.backend.peek(key, self.limits[kind])
+            if not allowed:
+                return retry_after
+        return None
+
+    async def record_failure(self, email: Optional[str], client_ip: Optional[str]) -> None:
+        for kind, key in self._keys(email, client_ip):
+            await self.backend.hit(key, self.limits[kind])
+
+    async def reset(self, email: str) -> None:
+        """Forget an email's failures after a successful login"""
+        for kind, key in self._keys(email, None):
+            await self.backend.reset(key, self.limits[kind])
+
+    def clear(self) -> None:
+        """Drop the backend (tests); the next call builds a fresh one"""
+        self._backend = None
+
+
+login_throttle = LoginThrottle(
+    max_per_email=settings.LOGIN_MAX_FAILURES_PER_EMAIL,
+    max_per_ip=settings.LOGIN_MAX_FAILURES_PER_IP,
+    window_seconds=settings.LOGIN_FAILURE_WINDOW_SECONDS
+)
+
+
 def rate_limit(max_requests: int = 60, window_seconds: int = 60):
     """
     Rate limit decorator for FastAPI endpoints
-    
+
     Args:
         max_requests: Maximum number of requests allowed
         window_seconds: Time window in seconds
     """
+    limit = Limit(max_requests, window_seconds)
+
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
@@ -42,28 +536,15 @@ def rate_limit(max_requests: int = 60, window_seconds: int = 60):
             if not request:
                 return await func(*args, **kwargs)
 
-            identifier = get_client_identifier(request)
-            now = time()
-
-            # Clean old entries
-            _rate_limit_store[identifier] = [
-                (ts, count) for ts, count in _rate_limit_store[identifier]
-                if now - ts < window_seconds
-            ]
-
-            # Count requests in window
-            total_requests = sum(count for _, count in _rate_limit_store[identifier])
-
-            if total_requests >= max_requests:
+            key = f"route:{func.__module__}.{func.__name__}:{get_client_identifier(request)}"
+            allowed, retry_after = await get_rate_limiter().backend.hit(key, limit)
+            if not allowed:
                 raise HTTPException(
                     status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail=f"Rate limit exceeded: {max_requests} requests per {window_seconds} seconds"
+                    detail=f"Rate limit exceeded: {max_requests} requests per {window_seconds} seconds",
+                    headers={"Retry-After": str(max(1, ceil(retry_after)))}
                 )
 
-            # Add current request
-            _rate_limit_store[identifier].append((now, 1))
-
             return await func(*args, **kwargs)
         return wrapper
     return decorator
-
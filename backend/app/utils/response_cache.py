@@ -0,0 +1,237 @@
+"""
+Per-user versioned response cache and conditional GET support
+
+Entries are keyed by (user_id, endpoint, params, data_version). Every write in
+the services layer bumps users.data_version in the same transaction, so a
+cached body can never be served after a committed write: the next read
+builds a new key. Old versions simply age out of the LRU.
+
+The same key doubles as a strong ETag, so If-None-Match can be answered
+with 304 before the body is built, serialized or even looked up.
+"""
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.user import User
+
+
+class ResponseCache:
+    """Thread-safe bounded LRU cache with per-entry TTL and hit/miss counters"""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS
+)
+
+_adapters: Dict[Any, TypeAdapter] = {}
+
+# Private data: clients may store it but must revalidate every time
+_PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def _get_adapter(schema: Any) -> TypeAdapter:
+    adapter = _adapters.get(schema)
+    if adapter is None:
+        adapter = _adapters[schema] = TypeAdapter(schema)
+    return adapter
+
+
+# Session.info key: user ids (or ALL_USERS) whose cached principal is dropped on commit
+PRINCIPAL_INVALIDATIONS = "principal_invalidations"
+ALL_USERS = "*"
+# Marks a change to the set of users or their role/status (admin statistics)
+USER_SET_CHANGED = "+"
+
+
+def invalidate_principal(db: Session, user_id: Any = ALL_USERS) -> None:
+    """Drop the cached authenticated user (default: every user) once db's transaction commits"""
+    db.info.setdefault(PRINCIPAL_INVALIDATIONS, set()).add(user_id)
+
+
+def bump_data_version(db: Session, user_id: int) -> None:
+    """Invalidate cached reads for a user; call before committing any write"""
+    db.query(User).filter(User.id == user_id).update({User.data_version: User.data_version + 1})
+    invalidate_principal(db, user_id)
+
+
+def bump_data_versions(db: Session, *criteria) -> None:
+    """Invalidate cached reads for every user matching criteria (e.g. a broadcast)"""
+    db.query(User).filter(*criteria).update(
+        {User.data_version: User.data_version + 1},
+        synchronize_session=False
+    )
+    invalidate_principal(db)
+
+
+def _make_etag(*parts: Any) -> str:
+    return '"' + hashlib.sha1(repr(parts).encode("utf-8")).hexdigest() + '"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # If-None-Match uses weak comparison, so a W/ prefix still matches
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _not_modified(etag: str, cache_control: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control}
+    )
+
+
+def _cache_key(user: User, endpoint: str, params: Optional[Dict[str, Any]]) -> Tuple[Hashable, str]:
+    key = (user.id, endpoint, tuple(sorted((params or {}).items())), user.data_version)
+    return key, _make_etag(*key)
+
+
+def _serialize(data: Any, schema: Any) -> bytes:
+    adapter = _get_adapter(schema)
+    return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+
+def _json_response(body: bytes, etag: str, cache_control: str) -> Response:
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": cache_control}
+    )
+
+
+def cached_response(
+    request: Request,
+    user: User,
+    endpoint: str,
+    build: Callable[[], Any],
+    schema: Any = Any,
+    params: Optional[Dict[str, Any]] = None
+) -> Response:
+    """
+    Return the JSON body for this user/endpoint/params/version with a strong ETag
+
+    A matching If-None-Match returns 304 without touching the cache or the
+    database; otherwise the cached body is served, or built on a miss.
+
+    Args:
+        request: Incoming request (for If-None-Match)
+        user: Authenticated user (its data_version is part of the key)
+        endpoint: Logical endpoint name
+        build: Callable producing the response data (ORM objects are allowed)
+        schema: Response schema used to validate and serialize the data
+        params: Query parameters that affect the result
+    """
+    key, etag = _cache_key(user, endpoint, params)
+    if _etag_matches(request, etag):
+        return _not_modified(etag, _PRIVATE_CACHE_CONTROL)
+
+    body = response_cache.get(key) if settings.RESPONSE_CACHE_ENABLED else None
+    if body is None:
+        body = _serialize(build(), schema)
+        if settings.RESPONSE_CACHE_ENABLED:
+            response_cache.set(key, body)
+
+    return _json_response(body, etag, _PRIVATE_CACHE_CONTROL)
+
+
+async def cached_response_async(
+    request: Request,
+    user: User,
+    endpoint: str,
+    build: Callable[[], Awaitable[Any]],
+    schema: Any = Any,
+    params: Optional[Dict[str, Any]] = None
+) -> Response:
+    """cached_response for async routes; build is a coroutine function"""
+    key, etag = _cache_key(user, endpoint, params)
+    if _etag_matches(request, etag):
+        return _not_modified(etag, _PRIVATE_CACHE_CONTROL)
+
+    body = response_cache.get(key) if settings.RESPONSE_CACHE_ENABLED else None
+    if body is None:
+        body = _serialize(await build(), schema)
+        if settings.RESPONSE_CACHE_ENABLED:
+            response_cache.set(key, body)
+
+    return _json_response(body, etag, _PRIVATE_CACHE_CONTROL)
+
+
+def etag_response(
+    request: Request,
+    data: Any,
+    schema: Any = Any,
+    cache_control: str = _PRIVATE_CACHE_CONTROL
+) -> Response:
+    """Serialize data and answer with 304 if its content hash matches If-None-Match"""
+    body = _serialize(data, schema)
+    etag = _make_etag(body)
+    if _etag_matches(request, etag):
+        return _not_modified(etag, cache_control)
+    return _json_response(body, etag, cache_control)
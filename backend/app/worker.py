@@ -0,0 +1,116 @@
+"""
+Job worker - expands queued jobs and delivers their Telegram outbox
+
+    cd backend
+    python -m app.worker
+
+Run as many workers as needed (separate processes or hosts): each claims its
+own jobs and outbox batches (see app.services.jobs_service). Telegram limits
+the bot as a whole, so more workers add capacity for claiming, formatting and
+retries, not send rate: the global rate is shared between them (set
+TELEGRAM_RATE_LIMIT_BACKEND, or TELEGRAM_SENDER_PROCESSES to the number of
+sending processes).
+"""
+import asyncio
+import os
+import signal
+import socket
+import uuid
+from typing import Callable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.logging_config import app_logger
+from app.db.session import SessionLocal
+from app.services.jobs_service import (
+    claim_outbox_batch,
+    expand_next_job,
+    job_messages,
+    record_deliveries,
+)
+from app.services.telegram_service import (
+    TelegramDeliveryEngine,
+    close_delivery_engine,
+    format_telegram_message,
+    get_delivery_engine,
+)
+
+
+class JobWorker:
+    """Poll the jobs and job_outbox tables and process whatever can be claimed"""
+
+    def __init__(
+        self,
+        session_factory: Callable = SessionLocal,
+        delivery_engine: Optional[TelegramDeliveryEngine] = None,
+        worker_id: Optional[str] = None,
+        batch_size: int = settings.JOB_BATCH_SIZE,
+        poll_interval: float = settings.JOB_POLL_INTERVAL_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.delivery_engine = delivery_engine
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+
+    def _in_session(self, fn, *args):
+        with self.session_factory() as db:
+            return fn(db, *args)
+
+    async def run_once(self) -> bool:
+        """Expand one queued job and deliver one outbox batch; returns False when idle"""
+        expanded = False
+        try:
+            expanded = await run_in_threadpool(self._in_session, expand_next_job, self.worker_id) is not None
+        except Exception as e:
+            app_logger.error(f"Failed to expand job: {str(e)}", exc_info=True)
+
+        batch = await run_in_threadpool(self._in_session, claim_outbox_batch, self.worker_id, self.batch_size)
+        if not batch:
+            return expanded
+
+        payloads = await run_in_threadpool(self._in_session, job_messages, list({job_id for _, job_id, _ in batch}))
+        engine = self.delivery_engine or get_delivery_engine()
+        deliveries = []
+        for job_id, payload in payloads.items():
+            messages = [(outbox_id, chat_id) for outbox_id, owner, chat_id in batch if owner == job_id]
+            text = format_telegram_message(payload["message"], payload.get("title"))
+            results = await engine.deliver([chat_id for _, chat_id in messages], text)
+            deliveries.extend(
+                (outbox_id, job_id, result.ok, result.attempts, result.error)
+                for (outbox_id, _), result in zip(messages, results)
+            )
+        await run_in_threadpool(self._in_session, record_deliveries, self.worker_id, deliveries)
+        return True
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Process jobs until stop is set, sleeping poll_interval while idle"""
+        app_logger.info(f"Job worker {self.worker_id} started")
+        while not stop.is_set():
+            try:
+                busy = await self.run_once()
+            except Exception as e:
+                app_logger.error(f"Job worker error: {str(e)}", exc_info=True)
+                busy = False
+            if not busy:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        app_logger.info(f"Job worker {self.worker_id} stopped")
+
+
+async def _main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await JobWorker().run(stop)
+    finally:
+        await close_delivery_engine()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
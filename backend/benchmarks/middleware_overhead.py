@@ -0,0 +1,192 @@
+"""
+Benchmark the per-request latency added by the logging and rate-limit middlewares
+
+Builds the API in-process three times - without middlewares, with the
+previous BaseHTTPMiddleware implementations, and with the pure-ASGI ones -
+and times sequential requests to /health and /overview through
+httpx.ASGITransport, so no network or server is involved. Reports the median
+latency per stack and the overhead over the bare app.
+
+    cd backend
+    python -m benchmarks.middleware_overhead --requests 2000
+
+A throwaway SQLite database is seeded with one user. Logging goes to a null
+handler so the numbers measure the middleware, not the terminal. The rate
+limiter uses the in-memory backend with limits high enough never to trigger.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from math import ceil
+from typing import Callable, Dict, List
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False).name
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_file}"
+
+from fastapi import FastAPI, Request, Response  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.logging_config import app_logger  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.main import health  # noqa: E402
+from app.middlewares import LoggingMiddleware, RateLimitMiddleware  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.routers import include_api_routers  # noqa: E402
+from app.utils.rate_limit import Limit, MemoryBackend, RateLimiter, get_client_identifier  # noqa: E402
+
+
+class BaseHTTPLoggingMiddleware(BaseHTTPMiddleware):
+    """The previous LoggingMiddleware, kept here as the baseline"""
+
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        app_logger.info(
+            f"Request: {request.method} {request.url.path}",
+            extra={
+                "method": request.method,
+                "path": request.url.path,
+                "client": request.client.host if request.client else "unknown"
+            }
+        )
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        app_logger.info(
+            f"Response: {request.method} {request.url.path} - {response.status_code}",
+            extra={
+                "method": request.method,
+                "path": request.url.path,
+                "status_code": response.status_code,
+                "duration_ms": round(process_time * 1000, 2)
+            }
+        )
+        response.headers["X-Process-Time"] = str(process_time)
+        return response
+
+
+class BaseHTTPRateLimitMiddleware(BaseHTTPMiddleware):
+    """The previous RateLimitMiddleware dispatch on top of the current limiter, as the baseline"""
+
+    def __init__(self, app, limiter: RateLimiter):
+        super().__init__(app)
+        self.limiter = limiter
+
+    async def dispatch(self, request: Request, call_next):
+        retry_after = await self.limiter.check(
+            request.url.path, get_client_identifier(request), request.headers.get("authorization")
+        )
+        if retry_after is not None:
+            return Response(
+                content=json.dumps({"detail": "Rate limit exceeded"}),
+                status_code=429,
+                media_type="application/json",
+                headers={"Retry-After": str(max(1, ceil(retry_after)))}
+            )
+        return await call_next(request)
+
+
+def _limiter() -> RateLimiter:
+    never = Limit(10 ** 9, 60)
+    return RateLimiter(backend=MemoryBackend(), ip_limit=never, user_limit=never, route_limits={})
+
+
+def build_app(stack: str) -> FastAPI:
+    app = FastAPI()
+    if stack == "basehttp":
+        app.add_middleware(BaseHTTPRateLimitMiddleware, limiter=_limiter())
+        app.add_middleware(BaseHTTPLoggingMiddleware)
+    elif stack == "asgi":
+        app.add_middleware(RateLimitMiddleware, limiter=_limiter())
+        app.add_middleware(LoggingMiddleware)
+    include_api_routers(app)
+    app.get("/health")(health)
+    return app
+
+
+STACKS: Dict[str, Callable[[], FastAPI]] = {
+    "none": lambda: build_app("none"),
+    "basehttp": lambda: build_app("basehttp"),
+    "asgi": lambda: build_app("asgi"),
+}
+
+
+def seed() -> Dict[str, str]:
+    """Create tables and a benchmark user; returns its auth headers"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = User(name="Bench", email="bench@example.com")
+        db.add(user)
+        db.commit()
+        token = create_access_token(data={"sub": str(user.id)})
+    finally:
+        db.close()
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def measure(app: FastAPI, path: str, headers: Dict[str, str], requests: int, warmup: int) -> List[float]:
+    """Sequential request latencies in microseconds"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(warmup):
+            (await client.get(path, headers=headers)).raise_for_status()
+        latencies = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1e6)
+            response.raise_for_status()
+    return latencies
+
+
+async def run(requests: int, warmup: int, rounds: int) -> None:
+    headers = seed()
+    apps = {name: factory() for name, factory in STACKS.items()}
+    for path in ("/health", "/overview/"):
+        # Interleave stacks across rounds so drift affects them equally
+        samples: Dict[str, List[float]] = {name: [] for name in apps}
+        for _ in range(rounds):
+            for name, app in apps.items():
+                samples[name] += await measure(app, path, headers, requests // rounds, warmup)
+        bare = statistics.median(samples["none"])
+        print(f"\n{path}")
+        print(f"  {'stack':<10} {'p50 us':>10} {'p99 us':>10} {'overhead us':>12}")
+        for name, values in samples.items():
+            values.sort()
+            p50 = statistics.median(values)
+            p99 = values[int(len(values) * 0.99) - 1]
+            print(f"  {name:<10} {p50:>10.1f} {p99:>10.1f} {p50 - bare:>12.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per stack and route")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=4)
+    args = parser.parse_args()
+
+    settings.RESPONSE_CACHE_ENABLED = False
+    app_logger.handlers = [logging.NullHandler()]
+    app_logger.propagate = False
+    try:
+        asyncio.run(run(args.requests, args.warmup, args.rounds))
+    finally:
+        engine.dispose()
+        os.unlink(_db_file)
+
+
+if __name__ == "__main__":
+    main()
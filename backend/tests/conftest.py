@@ -1,6 +1,8 @@
+import os
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
 
 from app.db.base import Base
@@ -8,12 +10,23 @@ from app.db.session import get_db
 from app.main import app
 from app.models.user import User
 from app.core.security import hash_password, create_access_token
+from app.utils.response_cache import response_cache
+from app.services.admin_service import admin_stats_cache
+from app.utils.principal_cache import principal_cache
+from app.utils.rate_limit import login_throttle
 
 
-# Test database URL (use SQLite in-memory for tests)
-TEST_DATABASE_URL = "sqlite:///:memory:"
+# Test database URL (SQLite in-memory by default; set TEST_DATABASE_URL to run against Postgres)
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite:///:memory:")
 
-engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+if TEST_DATABASE_URL.startswith("sqlite"):
+    engine = create_engine(
+        TEST_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+else:
+    engine = create_engine(TEST_DATABASE_URL)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -39,6 +52,10 @@ def client(db):
             pass
 
     app.dependency_overrides[get_db] = override_get_db
+    response_cache.clear()
+    admin_stats_cache.clear()
+    principal_cache.clear()
+    login_throttle.clear()
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -64,3 +81,29 @@ def auth_headers(test_user):
     token = create_access_token(data={"sub": str(test_user.id)})
     return {"Authorization": f"Bearer {token}"}
 
+
+@pytest.fixture
+def admin_headers(db):
+    """Get authentication headers for an admin user"""
+    admin = User(name="Admin", email="admin@example.com", password_hash=hash_password("adminpassword1"), role="admin")
+    db.add(admin)
+    db.commit()
+    db.refresh(admin)
+    token = create_access_token(data={"sub": str(admin.id), "role": "admin"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+
+@pytest.fixture
+def query_counter():
+    """Record SQL statements executed against the test engine"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,89 @@
+"""
+Tests for admin endpoints
+"""
+import pytest
+from datetime import date
+from fastapi import status
+
+from app.models.alert import Alert
+from app.models.loan import Loan
+from app.models.savings import Savings
+from app.models.user import User
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def platform_data(db, test_user):
+    suspended = User(name="Suspended", email="suspended@example.com", is_active=False)
+    db.add(suspended)
+    db.add_all([
+        Savings(user_id=test_user.id, date=date(2024, 1, 1), type="IN", amount=1000.0),
+        Savings(user_id=test_user.id, date=date(2024, 1, 2), type="OUT", amount=250.0),
+        Loan(user_id=test_user.id, borrower_name="A", principal=400.0, start_date=date(2024, 1, 1)),
+        Loan(user_id=test_user.id, borrower_name="B", principal=900.0, start_date=date(2024, 1, 1), status="paid"),
+        Alert(user_id=test_user.id, message="one"),
+        Alert(user_id=test_user.id, message="two", is_read=True),
+    ])
+    db.commit()
+    return suspended
+
+
+def test_admin_stats_single_query(client, admin_headers, platform_data, query_counter):
+    """Test dashboard stats come from one statement and include platform totals"""
+    query_counter.clear()
+    response = client.get("/admin/stats", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    # Auth lookup plus the stats statement
+    assert len(query_counter) == 2
+    assert response.json() == {
+        "total_users": 3,
+        "active_users": 2,
+        "suspended_users": 1,
+        "admin_users": 1,
+        "total_savings_income": 1000.0,
+        "total_savings_expense": 250.0,
+        "savings_transactions": 2,
+        "active_loans": 1,
+        "active_loans_principal": 400.0,
+        "total_alerts": 2,
+        "unread_alerts": 1,
+    }
+
+
+def test_admin_stats_cached_until_users_change(client, admin_headers, platform_data, query_counter):
+    """Test stats are served from cache and invalidated by suspend, role change and delete"""
+    client.get("/admin/stats", headers=admin_headers)
+    query_counter.clear()
+    assert client.get("/admin/stats", headers=admin_headers).json()["active_users"] == 2
+    assert len(query_counter) == 0  # stats and the admin principal are both cached
+
+    client.put(f"/admin/users/{platform_data.id}/suspend", json={"suspend": False}, headers=admin_headers)
+    assert client.get("/admin/stats", headers=admin_headers).json()["active_users"] == 3
+
+    client.put(f"/admin/users/{platform_data.id}/role", json={"role": "admin"}, headers=admin_headers)
+    assert client.get("/admin/stats", headers=admin_headers).json()["admin_users"] == 2
+
+    client.delete(f"/admin/users/{platform_data.id}", headers=admin_headers)
+    stats = client.get("/admin/stats", headers=admin_headers).json()
+    assert stats["total_users"] == 2
+    assert client.get("/admin/users", headers=admin_headers).json()["total"] == 2
+
+
+def test_registration_in_another_worker_reaches_stats_and_list(client, admin_headers, platform_data, query_counter):
+    """Test a user added on another session invalidates cached stats and the list total is a real count"""
+    assert client.get("/admin/stats", headers=admin_headers).json()["total_users"] == 3
+    with TestingSessionLocal() as other:
+        other.add(User(name="New", email="new@example.com"))
+        other.commit()
+
+    query_counter.clear()
+    assert client.get("/admin/stats", headers=admin_headers).json()["total_users"] == 4
+    assert len(query_counter) == 1
+    assert client.get("/admin/users?limit=1", headers=admin_headers).json()["total"] == 4
+    assert client.get("/admin/users?search=new", headers=admin_headers).json()["total"] == 1
+
+
+def test_admin_stats_requires_admin(client, auth_headers):
+    """Test regular users cannot read dashboard stats"""
+    response = client.get("/admin/stats", headers=auth_headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
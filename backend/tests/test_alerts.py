@@ -0,0 +1,93 @@
+"""
+Tests for personal and fan-out-on-read broadcast alerts
+"""
+from datetime import datetime, timedelta
+
+from fastapi import status
+
+from app.models.alert import Alert, BroadcastReceipt
+from app.models.user import User
+
+
+def _add_alerts(db, test_user):
+    """Alternate personal and broadcast alerts, one hour apart, oldest first"""
+    signup = test_user.created_at
+    db.add(Alert(user_id=None, message="before signup", created_at=signup - timedelta(days=1)))
+    alerts = []
+    for i in range(6):
+        alert = Alert(
+            user_id=test_user.id if i % 2 else None,
+            message=f"alert {i}",
+            created_at=signup + timedelta(hours=i + 1)
+        )
+        db.add(alert)
+        alerts.append(alert)
+    db.commit()
+    return alerts
+
+
+def test_alerts_merge_personal_and_broadcasts(client, db, test_user, auth_headers):
+    """Test the list interleaves both kinds newest first and hides broadcasts older than the user"""
+    _add_alerts(db, test_user)
+
+    body = client.get("/users/me/alerts", headers=auth_headers).json()
+    assert [a["message"] for a in body["alerts"]] == [f"alert {i}" for i in range(5, -1, -1)]
+    assert (body["total"], body["unread_count"]) == (6, 6)
+
+    page = client.get("/users/me/alerts?cursor=&limit=4", headers=auth_headers).json()
+    assert [a["message"] for a in page["alerts"]] == ["alert 5", "alert 4", "alert 3", "alert 2"]
+    rest = client.get(f"/users/me/alerts?cursor={page['next_cursor']}&limit=4", headers=auth_headers).json()
+    assert [a["message"] for a in rest["alerts"]] == ["alert 1", "alert 0"]
+    assert rest["next_cursor"] is None
+
+    skipped = client.get("/users/me/alerts?skip=2&limit=3", headers=auth_headers).json()
+    assert [a["message"] for a in skipped["alerts"]] == ["alert 3", "alert 2", "alert 1"]
+
+
+def test_broadcast_read_state_is_per_user(client, db, test_user, auth_headers):
+    """Test reading broadcasts one by one and all at once without touching other users"""
+    alerts = _add_alerts(db, test_user)
+    other = User(name="Other", email="other@example.com", created_at=test_user.created_at)
+    db.add(other)
+    db.commit()
+
+    response = client.put(f"/users/me/alerts/{alerts[4].id}/read", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["alert"]["is_read"] is True
+    assert db.query(BroadcastReceipt).filter(BroadcastReceipt.user_id == test_user.id).count() == 1
+
+    body = client.get("/users/me/alerts", headers=auth_headers).json()
+    assert {a["message"]: a["is_read"] for a in body["alerts"]}["alert 4"] is True
+    assert body["unread_count"] == 5
+    unread = client.get("/users/me/alerts?unread_only=true", headers=auth_headers).json()
+    assert "alert 4" not in [a["message"] for a in unread["alerts"]]
+    assert unread["total"] == 5
+
+    client.put("/users/me/alerts/read-all", headers=auth_headers)
+    db.expire_all()
+    assert db.get(User, test_user.id).broadcast_read_id == alerts[4].id
+    assert db.query(BroadcastReceipt).count() == 0
+    assert client.get("/users/me/alerts", headers=auth_headers).json()["unread_count"] == 0
+
+    # A new broadcast is unread again, and shows up despite the cached list
+    db.add(Alert(user_id=None, message="new", created_at=datetime.utcnow() + timedelta(days=1)))
+    db.commit()
+    body = client.get("/users/me/alerts", headers=auth_headers).json()
+    assert (body["alerts"][0]["message"], body["alerts"][0]["is_read"], body["unread_count"]) == ("new", False, 1)
+
+    assert db.get(User, other.id).broadcast_read_id == 0
+
+
+def test_read_unknown_or_foreign_alert(client, db, test_user, auth_headers):
+    """Test alerts of other users and broadcasts from before signup cannot be marked read"""
+    other = User(name="Other", email="other@example.com")
+    db.add(other)
+    db.flush()
+    foreign = Alert(user_id=other.id, message="not yours")
+    old = Alert(user_id=None, message="old", created_at=test_user.created_at - timedelta(days=1))
+    db.add_all([foreign, old])
+    db.commit()
+
+    for alert_id in (foreign.id, old.id, 9999):
+        response = client.put(f"/users/me/alerts/{alert_id}/read", headers=auth_headers)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
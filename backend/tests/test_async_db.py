@@ -0,0 +1,218 @@
+"""
+Tests for the AsyncSession routes (DB_ASYNC_ENABLED)
+
+The async engine cannot share the in-memory SQLite connection used by the
+other tests, so these run against a SQLite file (or TEST_DATABASE_URL) with
+an app mounted in async mode.
+"""
+import inspect
+import pytest
+from datetime import date
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.security import hash_password, create_access_token
+from app.db.base import Base
+from app.db.session import get_db, get_async_db, to_async_url
+from app.models.user import User
+from app.models.user_telegram import UserTelegramID
+from app.routers import include_api_routers
+from app.services.overview_service import get_overview
+from app.utils.response_cache import response_cache
+from tests.conftest import TEST_DATABASE_URL
+
+
+@pytest.fixture
+def async_db_url(tmp_path):
+    if TEST_DATABASE_URL.startswith("sqlite"):
+        return f"sqlite:///{tmp_path / 'async.db'}"
+    return TEST_DATABASE_URL
+
+
+@pytest.fixture
+def sync_db(async_db_url):
+    """Sync session on the same database, for setup and assertions"""
+    engine = create_engine(async_db_url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autoflush=False, bind=engine)()
+    try:
+        yield db
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+@pytest.fixture
+def async_client(async_db_url, sync_db):
+    """Client for an app mounted with the async routes"""
+    async_engine = create_async_engine(to_async_url(async_db_url), poolclass=NullPool)
+    AsyncTestingSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncTestingSession() as db:
+            yield db
+
+    def override_get_db():
+        yield sync_db
+
+    async_app = FastAPI()
+    include_api_routers(async_app, use_async=True)
+    async_app.dependency_overrides[get_async_db] = override_get_async_db
+    async_app.dependency_overrides[get_db] = override_get_db
+    response_cache.clear()
+    with TestClient(async_app) as client:
+        yield client
+
+
+@pytest.fixture
+def async_user(sync_db):
+    user = User(name="Async User", email="async@example.com", password_hash=hash_password("testpassword123"))
+    sync_db.add(user)
+    sync_db.commit()
+    sync_db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def async_headers(async_user):
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': str(async_user.id)})}"}
+
+
+def test_async_routes_are_mounted(async_client):
+    """Test the async twins replace the sync routes and keep their order"""
+    routes = {(route.path, method): route for route in async_client.app.routes for method in getattr(route, "methods", [])}
+    assert routes[("/savings/", "GET")].endpoint.__name__ == "list_savings_async"
+    assert routes[("/auth/login", "POST")].endpoint.__name__ == "login_async"
+    # No async twin: still served by the sync route
+    assert routes[("/savings/export", "GET")].endpoint.__name__ == "export_savings_endpoint"
+
+
+def _dependencies(dependant):
+    for sub in dependant.dependencies:
+        yield sub.call
+        yield from _dependencies(sub)
+
+
+def test_shared_handlers_use_only_the_async_session_in_async_mode(async_client):
+    """Test the async versions of shared handlers have their sync dependencies swapped"""
+    async_routes = [
+        route for route in async_client.app.routes if getattr(route, "endpoint", None) is not None
+        and route.endpoint.__name__.endswith("_async")
+    ]
+    assert len(async_routes) > 20
+    for route in async_routes:
+        calls = set(_dependencies(route.dependant))
+        assert get_db not in calls and get_async_db in calls, route.path
+        user = inspect.signature(route.endpoint).parameters.get("user")
+        assert user is None or user.annotation is User, route.path
+
+
+def test_async_savings_flow(async_client, async_headers, sync_db, async_user):
+    """Test savings CRUD, paging and balance through the async routes"""
+    for day, type_, amount in [("2024-01-01", "IN", 1000.0), ("2024-01-02", "OUT", 200.0), ("2024-01-03", "IN", 50.0)]:
+        response = async_client.post(
+            "/savings/", json={"date": day, "type": type_, "amount": amount}, headers=async_headers
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+    savings_id = response.json()["id"]
+
+    balance = async_client.get("/savings/balance", headers=async_headers).json()
+    assert balance == {"total_balance": 850.0, "total_income": 1050.0, "total_expense": 200.0}
+
+    page = async_client.get("/savings/?cursor=&limit=2", headers=async_headers).json()
+    assert [item["date"] for item in page["items"]] == ["2024-01-03", "2024-01-02"]
+    rest = async_client.get(f"/savings/?cursor={page['next_cursor']}&limit=2", headers=async_headers).json()
+    assert [item["date"] for item in rest["items"]] == ["2024-01-01"]
+    assert rest["next_cursor"] is None
+
+    response = async_client.put(f"/savings/{savings_id}", json={"amount": 150.0}, headers=async_headers)
+    assert response.json()["amount"] == 150.0
+    assert async_client.get("/savings/balance", headers=async_headers).json()["total_income"] == 1150.0
+
+    assert async_client.delete(f"/savings/{savings_id}", headers=async_headers).status_code == status.HTTP_204_NO_CONTENT
+    assert async_client.get(f"/savings/{savings_id}", headers=async_headers).status_code == status.HTTP_404_NOT_FOUND
+    assert async_client.get("/savings/balance", headers=async_headers).json()["total_income"] == 1000.0
+
+    # Sync-only route next to the async ones
+    export = async_client.get("/savings/export", headers=async_headers)
+    assert export.status_code == status.HTTP_200_OK
+    assert len(export.text.splitlines()) == 3
+
+
+def test_async_loans_and_targets(async_client, async_headers):
+    """Test loans with payments and targets through the async routes"""
+    loan = async_client.post(
+        "/loans/", json={"borrower_name": "John", "principal": 1000.0, "start_date": "2024-01-01"}, headers=async_headers
+    ).json()
+    assert loan["remaining_amount"] == 1000.0
+    assert loan["payments"] == []
+
+    payment = async_client.post(
+        f"/loans/{loan['id']}/payments", json={"date": "2024-02-01", "amount": 300.0}, headers=async_headers
+    )
+    assert payment.status_code == status.HTTP_201_CREATED
+
+    fetched = async_client.get(f"/loans/{loan['id']}", headers=async_headers).json()
+    assert fetched["remaining_amount"] == 700.0
+    assert [p["amount"] for p in fetched["payments"]] == [300.0]
+    updated = async_client.put(f"/loans/{loan['id']}", json={"note": "updated"}, headers=async_headers).json()
+    assert updated["note"] == "updated"
+    assert updated["remaining_amount"] == 700.0
+    assert len(updated["payments"]) == 1
+    assert len(async_client.get(f"/loans/{loan['id']}/payments", headers=async_headers).json()) == 1
+    assert async_client.get("/loans/?status_filter=active", headers=async_headers).json()[0]["id"] == loan["id"]
+
+    target = async_client.post(
+        "/targets/", json={"name": "Bike", "target_amount": 500.0, "current_amount": 100.0}, headers=async_headers
+    ).json()
+    done = async_client.put(f"/targets/{target['id']}", json={"add_amount": 400.0}, headers=async_headers).json()
+    assert done["status"] == "done"
+    page = async_client.get("/targets/?cursor=&status_filter=done", headers=async_headers).json()
+    assert [t["id"] for t in page["items"]] == [target["id"]]
+
+
+def test_async_overview_matches_sync(async_client, async_headers, sync_db, async_user):
+    """Test the async overview returns the same figures as the sync service"""
+    today = date.today().isoformat()
+    async_client.post("/savings/", json={"date": today, "type": "IN", "amount": 300.0}, headers=async_headers)
+    async_client.post("/loans/", json={"borrower_name": "A", "principal": 80.0, "start_date": today}, headers=async_headers)
+    async_client.post("/targets/", json={"name": "T", "target_amount": 90.0, "current_amount": 40.0}, headers=async_headers)
+
+    overview = async_client.get("/overview/", headers=async_headers).json()
+    expected = get_overview(sync_db, async_user.id)
+    assert overview == expected
+    assert overview["total_active_loans_amount"] == 80.0
+
+    yearly = async_client.get(f"/overview/yearly?year={date.today().year}", headers=async_headers).json()
+    assert yearly["income"] == 300.0
+
+
+def test_async_auth(async_client, sync_db):
+    """Test register, login and Telegram login through the async routes"""
+    response = async_client.post(
+        "/auth/register", json={"name": "New", "email": "new@example.com", "password": "password123"}
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    user_id = response.json()["user_id"]
+    duplicate = async_client.post(
+        "/auth/register", json={"name": "New", "email": "new@example.com", "password": "password123"}
+    )
+    assert duplicate.status_code == status.HTTP_400_BAD_REQUEST
+
+    login = async_client.post("/auth/login", json={"email": "new@example.com", "password": "password123"})
+    assert login.status_code == status.HTTP_200_OK
+    token = login.json()["access_token"]
+    assert async_client.get("/savings/", headers={"Authorization": f"Bearer {token}"}).status_code == status.HTTP_200_OK
+
+    wrong = async_client.post("/auth/login", json={"email": "new@example.com", "password": "wrong-password"})
+    assert wrong.status_code == status.HTTP_401_UNAUTHORIZED
+
+    sync_db.add(UserTelegramID(user_id=user_id, telegram_id="12345"))
+    sync_db.commit()
+    assert async_client.post("/auth/telegram-login", json={"telegram_id": "12345"}).status_code == status.HTTP_200_OK
+    assert async_client.post("/auth/telegram-login", json={"telegram_id": "999"}).status_code == status.HTTP_404_NOT_FOUND
@@ -92,3 +92,63 @@ def test_telegram_login_not_found(client):
     )
     assert response.status_code == status.HTTP_404_NOT_FOUND
 
+
+
+def test_failed_logins_are_throttled_before_bcrypt(client, test_user, monkeypatch):
+    """Test repeated wrong passwords for an email get 429 without spending a hash"""
+    from app.core.password_pool import password_pool
+    submitted = []
+    submit = password_pool.submit
+    monkeypatch.setattr(password_pool, "submit", lambda fn, *args: submitted.append(fn) or submit(fn, *args))
+
+    wrong = {"email": test_user.email, "password": "wrongpassword"}
+    codes = [client.post("/auth/login", json=wrong).status_code for _ in range(5)]
+    assert codes == [status.HTTP_401_UNAUTHORIZED] * 5
+    assert len(submitted) == 5
+
+    response = client.post("/auth/login", json={"email": test_user.email, "password": "testpassword123"})
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(response.headers["Retry-After"]) > 0
+    assert len(submitted) == 5
+
+    # Other accounts from the same client are still allowed until the per-IP limit
+    response = client.post("/auth/login", json={"email": "other@example.com", "password": "x"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_login_rehashes_outdated_work_factor(client, db, test_user):
+    """Test a hash made with fewer bcrypt rounds is upgraded on successful login"""
+    from passlib.context import CryptContext
+    from app.core.config import settings
+    test_user.password_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("testpassword123")
+    db.commit()
+
+    response = client.post("/auth/login", json={"email": test_user.email, "password": "testpassword123"})
+    assert response.status_code == status.HTTP_200_OK
+    db.refresh(test_user)
+    assert test_user.password_hash.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    assert verify_password("testpassword123", test_user.password_hash)
+
+
+def test_password_pool_rejects_beyond_queue_limit():
+    """Test the pool refuses work with 503 once workers and backlog are full"""
+    import asyncio
+    import threading
+    from fastapi import HTTPException
+    from app.core.bounded_pool import BoundedPool
+
+    pool = BoundedPool("thread", workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        running = [pool.submit(release.wait) for _ in range(2)]
+        with pytest.raises(HTTPException) as exc:
+            pool.submit(release.wait)
+        assert exc.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        release.set()
+        for future in running:
+            future.result()
+        assert asyncio.run(pool.run_async(sum, [1, 2])) == 3
+        assert pool.pending == 0
+    finally:
+        release.set()
+        pool.shutdown()
@@ -0,0 +1,90 @@
+"""
+Tests for the authenticated-user cache and the verified-token LRU
+"""
+from time import time
+
+from fastapi import status
+
+from app.core import security
+from app.core.security import VerifiedTokenCache, create_access_token, verified_tokens, verify_token
+from app.utils.jwt import get_current_user
+from app.utils.principal_cache import InvalidationTable, PrincipalCache
+from app.utils.response_cache import ALL_USERS
+from tests.conftest import TestingSessionLocal
+
+
+def test_principal_cached_until_admin_changes_user(client, test_user, auth_headers, admin_headers, query_counter):
+    """Test the users lookup is skipped once cached and suspend, role and delete apply at once"""
+    client.get("/users/me", headers=auth_headers)
+    query_counter.clear()
+    assert client.get("/users/me", headers=auth_headers).json()["email"] == test_user.email
+    assert len(query_counter) == 0
+
+    client.put(f"/admin/users/{test_user.id}/suspend", json={"suspend": True}, headers=admin_headers)
+    assert client.get("/users/me", headers=auth_headers).status_code == status.HTTP_403_FORBIDDEN
+    client.put(f"/admin/users/{test_user.id}/suspend", json={"suspend": False}, headers=admin_headers)
+    assert client.get("/users/me", headers=auth_headers).status_code == status.HTTP_200_OK
+
+    assert client.get("/admin/stats", headers=auth_headers).status_code == status.HTTP_403_FORBIDDEN
+    client.put(f"/admin/users/{test_user.id}/role", json={"role": "admin"}, headers=admin_headers)
+    assert client.get("/admin/stats", headers=auth_headers).status_code == status.HTTP_200_OK
+
+    client.delete(f"/admin/users/{test_user.id}", headers=admin_headers)
+    assert client.get("/users/me", headers=auth_headers).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_profile_update_reaches_other_sessions(client, db, test_user, auth_headers, query_counter):
+    """Test a profile change is seen by requests on other sessions, and cached users stay writable"""
+    token = auth_headers["Authorization"].split()[1]
+    with TestingSessionLocal() as other:
+        assert get_current_user(token, other).name == "Test User"
+    client.put("/users/me", json={"name": "Renamed"}, headers=auth_headers)
+    with TestingSessionLocal() as other:
+        assert get_current_user(token, other).name == "Renamed"
+
+    # A cached user is a normal persistent instance: changes to it are saved
+    with TestingSessionLocal() as other:
+        query_counter.clear()
+        user = get_current_user(token, other)
+        assert len(query_counter) == 0
+        user.name = "Saved"
+        other.commit()
+    db.expire_all()
+    assert client.get("/users/me", headers=auth_headers).json()["name"] == "Saved"
+
+
+def test_invalidation_reaches_other_workers(db, test_user, tmp_path):
+    """Test an invalidation in one process drops the entry cached by another"""
+    path = str(tmp_path / "invalidation")
+    worker_a = PrincipalCache(InvalidationTable(path, slots=64))
+    worker_b = PrincipalCache(InvalidationTable(path, slots=64))
+
+    worker_b.store(test_user, worker_b.version(test_user.id))
+    assert worker_b.load(db, test_user.id) is test_user
+    worker_a.invalidate({test_user.id})
+    assert worker_b.load(db, test_user.id) is None
+
+    worker_b.store(test_user, worker_b.version(test_user.id))
+    worker_a.invalidate({ALL_USERS})
+    assert worker_b.load(db, test_user.id) is None
+
+
+def test_verified_tokens_are_decoded_once(monkeypatch):
+    """Test a token's signature is checked once and expired entries are not served"""
+    calls = []
+    decode = security.jwt.decode
+    monkeypatch.setattr(security.jwt, "decode", lambda *a, **kw: calls.append(1) or decode(*a, **kw))
+    verified_tokens.clear()
+
+    token = create_access_token(data={"sub": "7"})
+    assert verify_token(token)["sub"] == "7"
+    assert verify_token(token)["sub"] == "7"
+    assert len(calls) == 1
+    assert verify_token("not-a-token") is None
+
+    cache = VerifiedTokenCache(max_entries=1)
+    cache.set(b"old", {"sub": "1", "exp": time() - 1})
+    assert cache.get(b"old") is None
+    cache.set(b"a", {"sub": "1"})
+    cache.set(b"b", {"sub": "2"})
+    assert cache.get(b"a") is None and cache.get(b"b") == {"sub": "2"}
@@ -0,0 +1,167 @@
+"""
+Tests for avatar uploads: streamed copy, size cap and hashed WebP thumbnails
+"""
+import hashlib
+import io
+import os
+import threading
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.models.user import User
+from app.schemas.user import UserBase
+from app.core.bounded_pool import BoundedPool
+from app.services import avatar_service
+from app.services.avatar_service import copy_upload
+
+
+@pytest.fixture
+def avatar_dir(tmp_path, monkeypatch):
+    """Avatars written to a temporary directory, rendered on a thread pool"""
+    pool = BoundedPool("thread", 1, 4)
+    monkeypatch.setattr(settings, "AVATAR_DIR", str(tmp_path))
+    monkeypatch.setattr(avatar_service, "avatar_pool", pool)
+    yield tmp_path
+    pool.shutdown()
+
+
+def _webp_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(".webp"))
+
+
+def _png(width, height, color):
+    Image = pytest.importorskip("PIL.Image")
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_copy_upload_streams_in_chunks_and_enforces_cap():
+    """Test the upload is copied chunk by chunk, hashed, and refused past the cap"""
+    data = os.urandom(300 * 1024)
+    reads = []
+
+    class Source(io.BytesIO):
+        def read(self, size=-1):
+            reads.append(size)
+            return super().read(size)
+
+    path, digest, size = copy_upload(Source(data), max_bytes=len(data), chunk_size=64 * 1024)
+    try:
+        assert size == len(data)
+        assert digest == hashlib.sha256(data).hexdigest()
+        assert set(reads) == {64 * 1024}
+        with open(path, "rb") as f:
+            assert f.read() == data
+    finally:
+        os.unlink(path)
+
+    with pytest.raises(HTTPException) as exc:
+        copy_upload(io.BytesIO(data), max_bytes=len(data) - 1)
+    assert exc.value.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_upload_rejects_bad_files(client, auth_headers, avatar_dir, monkeypatch):
+    """Test wrong types, oversized and empty uploads are refused and leave no files behind"""
+    monkeypatch.setattr(settings, "AVATAR_MAX_BYTES", 1024)
+    cases = [
+        ("a.exe", b"MZ"),
+        ("big.png", b"x" * 2048),
+        ("empty.png", b""),
+    ]
+    for filename, content in cases:
+        response = client.post("/users/me/avatar", files={"avatar_file": (filename, content)}, headers=auth_headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "too large" in client.post(
+        "/users/me/avatar", files={"avatar_file": ("big.png", b"x" * 2048)}, headers=auth_headers
+    ).json()["detail"]
+    assert list(avatar_dir.iterdir()) == []
+
+
+def test_upload_stores_hashed_webp_thumbnails(client, db, test_user, auth_headers, avatar_dir):
+    """Test thumbnails are square WebP files named by content hash, replaced on a new upload"""
+    Image = pytest.importorskip("PIL.Image")
+    first = _png(600, 400, "red")
+
+    response = client.post("/users/me/avatar", files={"avatar_file": ("me.png", first)}, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    name = hashlib.sha256(first).hexdigest()[:avatar_service.NAME_LENGTH]
+    assert response.json()["avatar_url"] == f"/avatars/{name}_256.webp"
+    assert response.json()["avatar_thumbnails"] == {str(size): f"/avatars/{name}_{size}.webp" for size in (64, 128, 256)}
+    assert client.get("/users/me", headers=auth_headers).json()["avatar_thumbnails"]["64"] == f"/avatars/{name}_64.webp"
+    assert _webp_files(avatar_dir) == sorted(f"{name}_{size}.webp" for size in (64, 128, 256))
+    for size in (64, 128, 256):
+        with Image.open(avatar_dir / f"{name}_{size}.webp") as image:
+            assert image.format == "WEBP" and image.size == (size, size)
+
+    # Not an image, despite the extension
+    response = client.post("/users/me/avatar", files={"avatar_file": ("fake.png", b"not an image")}, headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    second = _png(300, 300, "blue")
+    response = client.post("/users/me/avatar", files={"avatar_file": ("me.png", second)}, headers=auth_headers)
+    new_name = hashlib.sha256(second).hexdigest()[:avatar_service.NAME_LENGTH]
+    assert response.json()["avatar_url"] == f"/avatars/{new_name}_256.webp"
+    assert _webp_files(avatar_dir) == sorted(f"{new_name}_{size}.webp" for size in (64, 128, 256))
+
+
+def test_old_files_are_only_deleted_when_owned_and_unused(db, test_user, avatar_dir):
+    """Test cleanup spares other users' legacy files and hashes still referenced"""
+    other = User(name="Other", email="other@example.com", password_hash="x", avatar_url="/avatars/user_999.png")
+    db.add(other)
+    db.commit()
+    for filename in ("user_999.png", f"user_{test_user.id}.png", "user_998.png"):
+        (avatar_dir / filename).write_bytes(b"old")
+
+    # Someone else's picture, whether or not it is still in use
+    avatar_service._delete_unused_legacy(db, test_user, "/avatars/user_999.png")
+    avatar_service._delete_unused_legacy(db, test_user, "/avatars/user_998.png")
+    assert (avatar_dir / "user_999.png").exists() and (avatar_dir / "user_998.png").exists()
+    avatar_service._delete_unused_legacy(db, test_user, f"/avatars/user_{test_user.id}.png")
+    assert not (avatar_dir / f"user_{test_user.id}.png").exists()
+
+    name = "ab" * (avatar_service.NAME_LENGTH // 2)
+    for size in (64, 128, 256):
+        (avatar_dir / f"{name}_{size}.webp").write_bytes(b"webp")
+    other.avatar_url = f"/avatars/{name}_256.webp"
+    db.commit()
+    avatar_service._delete_unused_hashed(db, name)
+    assert len(_webp_files(avatar_dir)) == 3
+    other.avatar_url = None
+    db.commit()
+    avatar_service._delete_unused_hashed(db, name)
+    assert _webp_files(avatar_dir) == []
+
+
+def test_name_lock_excludes_other_holders(avatar_dir):
+    """Test a content hash locked by one upload blocks cleanup of the same hash until released"""
+    name = "cd" * (avatar_service.NAME_LENGTH // 2)
+    handle = avatar_service._acquire_name(name)
+    acquired = threading.Event()
+
+    def other():
+        avatar_service._release_name(avatar_service._acquire_name(name))
+        acquired.set()
+
+    thread = threading.Thread(target=other)
+    thread.start()
+    assert not acquired.wait(0.2)
+    avatar_service._release_name(handle)
+    assert acquired.wait(5)
+    thread.join()
+
+
+def test_avatar_thumbnails_only_for_hashed_uploads():
+    """Test legacy and external avatar URLs expose no thumbnail sizes"""
+    name = "ef" * (avatar_service.NAME_LENGTH // 2)
+    assert avatar_service.avatar_thumbnails(f"/avatars/{name}_256.webp")[128] == f"/avatars/{name}_128.webp"
+    assert avatar_service.avatar_thumbnails("/avatars/user_1.png") == {}
+    assert avatar_service.avatar_thumbnails("https://lh3.googleusercontent.com/a/photo") == {}
+    assert avatar_service.avatar_thumbnails(None) == {}
+
+    user = User(id=1, name="A", email="a@example.com", avatar_url=f"/avatars/{name}_256.webp",
+                role="user", is_active=True, created_at=datetime.utcnow())
+    assert UserBase.model_validate(user).model_dump()["avatar_thumbnails"][64] == f"/avatars/{name}_64.webp"
@@ -0,0 +1,129 @@
+import pytest
+from fastapi import status
+from datetime import date
+from app.utils.response_cache import ResponseCache, response_cache
+
+
+def test_response_cache_lru_eviction():
+    """Test least recently used entries are evicted first"""
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_response_cache_ttl_and_counters(monkeypatch):
+    """Test expired entries miss and hit/miss counts are reported"""
+    import app.utils.response_cache as module
+    now = [1000.0]
+    monkeypatch.setattr(module, "monotonic", lambda: now[0])
+
+    cache = ResponseCache(max_entries=10, ttl_seconds=5)
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    now[0] += 6
+    assert cache.get("key") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 0
+
+
+def test_cached_read_skips_database(client, auth_headers, query_counter):
+    """Test a repeated read is served from cache without touching the database"""
+    client.post(
+        "/targets",
+        json={"name": "Laptop", "target_amount": 1000.0, "current_amount": 100.0},
+        headers=auth_headers
+    )
+
+    first = client.get("/targets/", headers=auth_headers)
+    query_counter.clear()
+    second = client.get("/targets/", headers=auth_headers)
+
+    assert second.json() == first.json()
+    assert len(query_counter) == 0  # the user comes from the principal cache too
+    assert response_cache.stats()["hits"] == 1
+
+
+def test_write_invalidates_cached_reads(client, auth_headers):
+    """Test writes bump the data version so reads never return stale data"""
+    def balance():
+        return client.get("/savings/balance", headers=auth_headers).json()["total_balance"]
+
+    assert balance() == 0.0
+    created = client.post(
+        "/savings",
+        json={"date": str(date.today()), "type": "IN", "amount": 250.0},
+        headers=auth_headers
+    ).json()
+    assert balance() == 250.0
+
+    client.put(f"/savings/{created['id']}", json={"amount": 300.0}, headers=auth_headers)
+    assert balance() == 300.0
+    assert client.get("/overview/", headers=auth_headers).json()["total_balance"] == 300.0
+
+    client.delete(f"/savings/{created['id']}", headers=auth_headers)
+    assert balance() == 0.0
+
+
+def test_if_none_match_returns_not_modified(client, auth_headers, query_counter):
+    """Test a matching ETag is answered with 304 and no body"""
+    first = client.get("/overview/", headers=auth_headers)
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    query_counter.clear()
+    second = client.get("/overview/", headers={**auth_headers, "If-None-Match": etag})
+    assert second.status_code == status.HTTP_304_NOT_MODIFIED
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+    assert len(query_counter) == 0
+
+    client.post(
+        "/savings",
+        json={"date": str(date.today()), "type": "IN", "amount": 50.0},
+        headers=auth_headers
+    )
+    third = client.get("/overview/", headers={**auth_headers, "If-None-Match": etag})
+    assert third.status_code == status.HTTP_200_OK
+    assert third.headers["etag"] != etag
+
+
+def test_alert_read_changes_etag(client, db, test_user, auth_headers):
+    """Test marking alerts as read invalidates the cached alert list"""
+    from app.models.alert import Alert
+    db.add(Alert(user_id=test_user.id, title="Hi", message="Hello"))
+    db.commit()
+
+    first = client.get("/users/me/alerts", headers=auth_headers)
+    assert first.json()["unread_count"] == 1
+
+    client.put("/users/me/alerts/read-all", headers=auth_headers)
+    second = client.get(
+        "/users/me/alerts", headers={**auth_headers, "If-None-Match": first.headers["etag"]}
+    )
+    assert second.status_code == status.HTTP_200_OK
+    assert second.json()["unread_count"] == 0
+
+
+def test_bank_master_data_is_publicly_cacheable(client, db):
+    """Test bank list carries a public Cache-Control and a content ETag"""
+    from app.models.bank import Bank
+    db.add(Bank(name="Test Bank", code="TST", country="ID", is_active=True))
+    db.commit()
+
+    first = client.get("/banks/banks")
+    assert first.status_code == status.HTTP_200_OK
+    assert first.headers["cache-control"] == "public, max-age=3600"
+    assert first.json()["banks"][0]["code"] == "TST"
+
+    second = client.get("/banks/banks", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == status.HTTP_304_NOT_MODIFIED
@@ -0,0 +1,85 @@
+"""
+Tests that async handlers keep blocking work off the event loop
+"""
+import ast
+import asyncio
+import logging
+import pathlib
+import time
+
+import pytest
+
+from app.core.logging_config import app_logger
+from app.core.loop_lag import LoopLagMonitor
+
+ROUTERS_DIR = pathlib.Path(__file__).parent.parent / "app" / "routers"
+# CPU-bound calls that must not run on the loop either
+BLOCKING_CALLS = {"hash_password", "verify_password"}
+
+
+def _call_name(call: ast.Call) -> str:
+    func = call.func
+    return func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", "")
+
+
+def _blocking_calls(handler: ast.AsyncFunctionDef):
+    """Yield calls in handler's own body that would block the loop"""
+    awaited = set()
+    todo = list(handler.body)
+    while todo:
+        node = todo.pop()
+        # Nested functions and lambdas run elsewhere (threadpool, cache builder)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            continue
+        if isinstance(node, ast.Await) and isinstance(node.value, ast.Call):
+            awaited.add(id(node.value))
+        if isinstance(node, ast.Call) and id(node) not in awaited:
+            uses_db = isinstance(node.func, ast.Attribute) and getattr(node.func.value, "id", None) == "db"
+            passes_db = any(getattr(arg, "id", None) == "db" for arg in node.args)
+            if uses_db or passes_db or _call_name(node) in BLOCKING_CALLS:
+                yield f"line {node.lineno}: {ast.unparse(node)[:80]}"
+        todo.extend(ast.iter_child_nodes(node))
+
+
+def _async_handlers():
+    for path in sorted(ROUTERS_DIR.glob("*.py")):
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        for node in tree.body:
+            if isinstance(node, ast.AsyncFunctionDef) and node.decorator_list:
+                yield f"{path.name}:{node.name}", node
+
+
+@pytest.mark.parametrize("name,handler", list(_async_handlers()), ids=[name for name, _ in _async_handlers()])
+def test_async_handlers_do_not_block(name, handler):
+    """Test async handlers only reach the sync session or bcrypt through the threadpool"""
+    assert list(_blocking_calls(handler)) == []
+
+
+def test_loop_lag_monitor_reports_blocking_call():
+    """Test the monitor logs how long the loop was blocked and where"""
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    app_logger.addHandler(handler)
+
+    def blocking_handler():
+        time.sleep(0.3)
+
+    async def scenario():
+        monitor = LoopLagMonitor(threshold_ms=50)
+        monitor.start()
+        await asyncio.sleep(0.1)
+        blocking_handler()
+        await asyncio.sleep(0.1)
+        monitor.stop()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        app_logger.removeHandler(handler)
+
+    warnings = [r for r in records if r.levelno == logging.WARNING]
+    assert len(warnings) == 1
+    # The ping can go out up to one threshold after the block starts
+    assert warnings[0].duration_ms >= 200
+    assert "in blocking_handler" in warnings[0].getMessage()
@@ -0,0 +1,148 @@
+"""
+Tests for the background job queue, outbox and worker
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+
+from app.models.alert import Alert
+from app.models.job import Job, JobOutbox
+from app.models.user import User
+from app.models.user_telegram import UserTelegramID
+from app.services import jobs_service
+from app.services.jobs_service import claim_outbox_batch, enqueue_job, expand_next_job, record_deliveries
+from app.worker import JobWorker
+from tests.conftest import TestingSessionLocal
+from tests.test_telegram import FakeTelegramAPI
+
+
+def _drain(api, batch_size=2):
+    """Run a worker against the fake Telegram API until there is nothing left to do"""
+    async def scenario():
+        engine = api.engine(global_rate=1000)
+        worker = JobWorker(session_factory=TestingSessionLocal, delivery_engine=engine, batch_size=batch_size)
+        try:
+            while await worker.run_once():
+                pass
+        finally:
+            await engine.aclose()
+    asyncio.run(scenario())
+
+
+def test_broadcast_is_queued_and_delivered_by_worker(client, db, test_user, admin_headers):
+    """Test the broadcast endpoint only enqueues; the worker saves alerts and sends"""
+    db.add_all([
+        UserTelegramID(user_id=test_user.id, telegram_id="100"),
+        UserTelegramID(user_id=test_user.id, telegram_id="101"),
+        User(name="Legacy", email="legacy@example.com", telegram_id="200"),
+        User(name="Suspended", email="suspended@example.com", telegram_id="300", is_active=False),
+    ])
+    db.commit()
+
+    response = client.post("/admin/broadcast", json={"title": "Hi", "message": "Hello all"}, headers=admin_headers)
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    job_id = response.json()["job_id"]
+    assert response.json()["users_count"] == 3
+    assert db.query(Alert).count() == 0
+
+    job = client.get(f"/admin/jobs/{job_id}", headers=admin_headers).json()
+    assert job["status"] == "queued"
+
+    api = FakeTelegramAPI(unknown_chats={"101"})
+    _drain(api)
+
+    job = client.get(f"/admin/jobs/{job_id}", headers=admin_headers).json()
+    assert job["status"] == "done"
+    assert (job["total"], job["sent"], job["failed"], job["pending"]) == (3, 2, 1, 0)
+    assert job["result"] == {"users_count": 3, "alerts_created": 1}
+    assert sorted(chat_id for chat_id, _ in api.calls) == ["100", "101", "200"]
+    assert db.query(Alert).filter(Alert.message == "Hello all").one().user_id is None
+    assert db.query(JobOutbox).filter(JobOutbox.status == "failed").one().error == "Bad Request: chat not found"
+
+
+def test_send_alert_writes_outbox_directly(client, db, test_user, admin_headers):
+    """Test a single-user alert is saved at once and its messages go straight to the outbox"""
+    db.add(UserTelegramID(user_id=test_user.id, telegram_id="100"))
+    db.commit()
+
+    response = client.post(
+        "/admin/send-alert", json={"user_id": test_user.id, "message": "Just you"}, headers=admin_headers
+    )
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    body = response.json()
+    assert body["telegram_total"] == 1
+    assert db.query(Alert).filter(Alert.id == body["alert_id"]).one().user_id == test_user.id
+    assert client.get(f"/admin/jobs/{body['job_id']}", headers=admin_headers).json()["status"] == "running"
+
+    _drain(FakeTelegramAPI())
+    job = client.get(f"/admin/jobs/{body['job_id']}", headers=admin_headers).json()
+    assert (job["status"], job["sent"]) == ("done", 1)
+
+    assert client.get("/admin/jobs/9999", headers=admin_headers).status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_send_alert_is_saved_with_its_job(client, db, test_user, admin_headers, monkeypatch):
+    """Test the alert is not committed when queueing its delivery fails"""
+    db.add(UserTelegramID(user_id=test_user.id, telegram_id="100"))
+    db.commit()
+
+    def broken_outbox(*args):
+        raise RuntimeError("outbox unavailable")
+
+    monkeypatch.setattr(jobs_service, "_write_outbox", broken_outbox)
+    with pytest.raises(RuntimeError):
+        client.post("/admin/send-alert", json={"user_id": test_user.id, "message": "Lost?"}, headers=admin_headers)
+    db.rollback()
+    assert db.query(Alert).count() == 0
+
+
+def test_broadcast_expansion_query_count_is_constant(db, query_counter):
+    """Test recipients and the alert take a fixed number of statements however many users exist"""
+    users = [User(name=f"U{i}", email=f"u{i}@example.com", telegram_id=str(i) if i % 2 else None) for i in range(200)]
+    db.add_all(users)
+    db.flush()
+    # Same chat in both the legacy column and the multi-ID table is sent once
+    db.add_all([UserTelegramID(user_id=user.id, telegram_id=str(i)) for i, user in enumerate(users) if i % 4 == 1])
+    db.add(UserTelegramID(user_id=users[0].id, telegram_id="extra"))
+    db.commit()
+    job = enqueue_job(db, "broadcast", {"title": None, "message": "hi"})
+
+    query_counter.clear()
+    assert expand_next_job(db, "worker-1") == job.id
+    assert len(query_counter) <= 10
+
+    job = db.get(Job, job.id)
+    assert job.total == 101
+    assert job.result == {"users_count": 200, "alerts_created": 1}
+    assert db.query(Alert).count() == 1
+
+
+def test_workers_claim_disjoint_batches(db):
+    """Test concurrent workers never share outbox rows and abandoned claims are taken over"""
+    job = enqueue_job(db, "user_alert", {"message": "x"}, chat_ids=[str(i) for i in range(5)])
+
+    first = claim_outbox_batch(db, "worker-1", 3)
+    second = claim_outbox_batch(db, "worker-2", 3)
+    assert len(first) == 3 and len(second) == 2
+    assert not {row[0] for row in first} & {row[0] for row in second}
+    assert claim_outbox_batch(db, "worker-3", 3) == []
+
+    # worker-1 died: its claims expire and another worker picks them up
+    db.query(JobOutbox).filter(JobOutbox.locked_by == "worker-1").update(
+        {JobOutbox.locked_at: datetime.utcnow() - timedelta(hours=1)}
+    )
+    db.commit()
+    taken_over = claim_outbox_batch(db, "worker-3", 5)
+    assert sorted(taken_over) == sorted(first)
+    assert db.get(Job, job.id).total == 5
+
+    # worker-1 comes back late: its results for rows worker-3 now owns are ignored
+    record_deliveries(db, "worker-1", [(outbox_id, job_id, True, 1, None) for outbox_id, job_id, _ in first])
+    assert db.query(JobOutbox).filter(JobOutbox.status == "sent").count() == 0
+    assert db.get(Job, job.id).sent == 0
+    record_deliveries(db, "worker-3", [(outbox_id, job_id, True, 1, None) for outbox_id, job_id, _ in taken_over])
+    db.expire_all()
+    assert db.query(JobOutbox).filter(JobOutbox.status == "sent").count() == 3
+    assert db.get(Job, job.id).sent == 3
@@ -1,6 +1,6 @@
 import pytest
 from fastapi import status
-from datetime import date
+from datetime import date, timedelta
 from app.models.loan import Loan, LoanPayment
 
 
@@ -12,7 +12,7 @@ def test_create_loan(client, auth_headers):
             "borrower_name": "John Doe",
             "principal": 1000.0,
             "start_date": str(date.today()),
-            "due_date": str(date(2024, 12, 31)),
+            "due_date": str(date.today() + timedelta(days=30)),
             "note": "Test loan"
         },
         headers=auth_headers
@@ -129,3 +129,83 @@ def test_get_loan_payments(client, auth_headers, db, test_user):
     assert len(data) >= 1
     assert data[0]["amount"] == 200.0
 
+
+
+def _add_loans(db, user_id, count):
+    for i in range(count):
+        loan = Loan(
+            user_id=user_id,
+            borrower_name=f"Borrower {i}",
+            principal=1000.0,
+            start_date=date.today(),
+            status="active"
+        )
+        db.add(loan)
+        db.flush()
+        db.add(LoanPayment(loan_id=loan.id, date=date.today(), amount=100.0))
+        db.add(LoanPayment(loan_id=loan.id, date=date.today(), amount=50.0))
+    db.commit()
+
+
+def test_loan_queries_do_not_grow_with_loans(db, test_user, query_counter):
+    """Test listing loans and the active total run a constant number of queries"""
+    from app.services.loans_service import get_loans, get_loan_by_id, get_total_active_loans_amount
+
+    def count_queries(fn):
+        db.expire_all()
+        query_counter.clear()
+        result = fn()
+        return len(query_counter), result
+
+    user_id = test_user.id
+    _add_loans(db, user_id, 1)
+    few, _ = count_queries(lambda: get_loans(db, user_id))
+    few_total, _ = count_queries(lambda: get_total_active_loans_amount(db, user_id))
+
+    _add_loans(db, user_id, 9)
+    many, loans = count_queries(lambda: get_loans(db, user_id))
+    many_total, total = count_queries(lambda: get_total_active_loans_amount(db, user_id))
+
+    assert many == few == 2
+    assert many_total == few_total == 1
+    assert all(loan.remaining_amount == 850.0 for loan in loans)
+    assert all(len(loan.payments) == 2 for loan in loans)
+    assert total == 8500.0
+
+    loan_id = loans[0].id
+    single, loan = count_queries(lambda: get_loan_by_id(db, loan_id, user_id))
+    assert single == 2
+    assert loan.remaining_amount == 850.0
+
+
+def test_remaining_amount_never_negative(db, test_user):
+    """Test overpaid loans report zero remaining"""
+    from app.utils.calculations import calculate_loan_remaining
+    loan = Loan(user_id=test_user.id, borrower_name="X", principal=100.0, start_date=date.today())
+    db.add(loan)
+    db.flush()
+    db.add(LoanPayment(loan_id=loan.id, date=date.today(), amount=150.0))
+    db.commit()
+
+    assert calculate_loan_remaining(db, loan.id) == 0.0
+
+
+def test_export_loans_csv(client, auth_headers, db, test_user):
+    """Test loan export includes paid and remaining amounts"""
+    loan = Loan(
+        user_id=test_user.id,
+        borrower_name="John Doe",
+        principal=1000.0,
+        start_date=date(2024, 1, 1),
+        status="active"
+    )
+    db.add(loan)
+    db.flush()
+    db.add(LoanPayment(loan_id=loan.id, date=date(2024, 2, 1), amount=300.0))
+    db.commit()
+
+    response = client.get("/loans/export", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    lines = response.text.splitlines()
+    assert lines[0] == "id,borrower_name,principal,paid,remaining_amount,start_date,due_date,status,note"
+    assert lines[1] == f"{loan.id},John Doe,1000.0,300.0,700.0,2024-01-01,,active,"
@@ -0,0 +1,68 @@
+"""
+Tests for the queued JSON logging pipeline
+"""
+import io
+import json
+import logging
+
+from app.core import logging_config
+from app.core.logging_config import (
+    JSONFormatter, NonBlockingQueueHandler, SamplingFilter, app_logger, flush_logging, parse_sample_rates, setup_logging
+)
+
+
+def _queue_handlers():
+    return [h for h in app_logger.handlers if isinstance(h, NonBlockingQueueHandler)]
+
+
+def test_setup_logging_is_idempotent():
+    """Test repeated setup does not attach more handlers or listeners"""
+    listener = logging_config._listener
+    assert setup_logging() is app_logger
+    setup_logging()
+    assert len(_queue_handlers()) == 1
+    assert logging_config._listener is listener
+
+
+def test_records_are_written_by_listener(monkeypatch):
+    """Test records cross the queue and come out as JSON with the request fields"""
+    stream = io.StringIO()
+    monkeypatch.setattr(logging_config._listener.handlers[0], "stream", stream)
+
+    app_logger.info("Response: %s %s - %d", "GET", "/overview", 200, extra={
+        "method": "GET", "path": "/overview", "status_code": 200, "duration_ms": 1.5
+    })
+    flush_logging()
+
+    line = json.loads(stream.getvalue().splitlines()[-1])
+    assert line["message"] == "Response: GET /overview - 200"
+    assert (line["method"], line["path"], line["status_code"], line["duration_ms"]) == ("GET", "/overview", 200, 1.5)
+
+
+def test_full_queue_drops_instead_of_blocking():
+    """Test a full queue counts dropped records rather than waiting"""
+    import queue
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    record = logging.makeLogRecord({"msg": "x"})
+    handler.handle(record)
+    handler.handle(record)
+    assert (handler.queue.qsize(), handler.dropped) == (1, 1)
+
+
+def test_sampling_keeps_every_nth_info_record_per_path():
+    """Test sampled paths keep one record in n, other paths and warnings are untouched"""
+    sampler = SamplingFilter(parse_sample_rates("/health=0.25, /off=0"))
+
+    def kept(path, level=logging.INFO, count=8):
+        return sum(sampler.filter(logging.makeLogRecord({"path": path, "levelno": level})) for _ in range(count))
+
+    assert kept("/health") == 2
+    assert kept("/health", logging.WARNING) == 8
+    assert kept("/off") == 0
+    assert kept("/overview") == 8
+
+
+def test_formatter_uses_record_time():
+    """Test the timestamp is the time of the log call, not of formatting"""
+    record = logging.makeLogRecord({"msg": "hi", "created": 0.0})
+    assert json.loads(JSONFormatter().format(record))["timestamp"] == "1970-01-01T00:00:00"
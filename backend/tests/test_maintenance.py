@@ -0,0 +1,95 @@
+"""
+Tests for maintenance mode state and its request gate
+"""
+import os
+import time
+
+import pytest
+from fastapi import status
+
+from app.core.maintenance import MaintenanceState, maintenance
+from app.core.security import create_access_token
+from app.middlewares import maintenance_middleware
+from app.models.user import User
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def maintenance_file(tmp_path, monkeypatch):
+    """Point the process-wide maintenance state at a temporary file, and the gate at the test database"""
+    path = str(tmp_path / "maintenance_mode.txt")
+    monkeypatch.setattr(maintenance, "path", path)
+    monkeypatch.setattr(maintenance_middleware, "SessionLocal", TestingSessionLocal)
+    maintenance.refresh()
+    yield path
+    maintenance.set(False)
+
+
+def test_maintenance_gates_non_admin_requests(client, test_user, auth_headers, admin_headers, maintenance_file):
+    """Test the admin toggle, the public status and who gets through while it is on"""
+    response = client.put("/admin/maintenance", json={"enabled": True, "message": "Back soon"}, headers=admin_headers)
+    assert response.json() == {"is_maintenance": True, "message": "Back soon"}
+    assert client.get("/maintenance").json() == {"is_maintenance": True, "message": "Back soon"}
+
+    response = client.get("/overview/", headers=auth_headers)
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json() == {"detail": "Back soon"}
+    assert client.get("/overview/").status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert client.get("/overview/", headers=admin_headers).status_code == status.HTTP_200_OK
+    assert client.get("/health").status_code == status.HTTP_200_OK
+
+    login = client.post("/auth/login", json={"email": test_user.email, "password": "testpassword123"})
+    assert login.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    client.put("/admin/maintenance", json={"enabled": False}, headers=admin_headers)
+    assert not os.path.exists(maintenance_file)
+    assert client.get("/overview/", headers=auth_headers).status_code == status.HTTP_200_OK
+
+
+def test_requests_read_the_flag_from_memory(client, auth_headers, maintenance_file):
+    """Test requests use the cached flag: a file change is only seen after a refresh"""
+    with open(maintenance_file, "w", encoding="utf-8") as f:
+        f.write("Upgrading")
+    assert client.get("/overview/", headers=auth_headers).status_code == status.HTTP_200_OK
+
+    assert maintenance.refresh()
+    assert not maintenance.refresh()  # unchanged file is not reread
+    assert client.get("/overview/", headers=auth_headers).status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+def test_other_workers_see_changes_within_a_second(tmp_path):
+    """Test a second process's state picks up a toggle through polling"""
+    path = str(tmp_path / "maintenance_mode.txt")
+    writer = MaintenanceState(path)
+    other = MaintenanceState(path, poll_seconds=0.05)
+    other.start()
+    try:
+        writer.set(True, "Upgrading")
+        deadline = time.monotonic() + 1
+        while other.status() != (True, "Upgrading") and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert other.status() == (True, "Upgrading")
+
+        writer.set(False)
+        deadline = time.monotonic() + 1
+        while other.status()[0] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert other.status() == (False, "")
+    finally:
+        other.stop()
+
+
+def test_gate_checks_the_admins_current_role(client, db, test_user, auth_headers, admin_headers, maintenance_file):
+    """Test the gate ignores stale role claims: promotions and demotions apply at once"""
+    maintenance.set(True, "Back soon")
+    # A user token claiming admin, and an admin token issued without the claim
+    forged = {"Authorization": f"Bearer {create_access_token(data={'sub': str(test_user.id), 'role': 'admin'})}"}
+    assert client.get("/overview/", headers=forged).status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    admin = db.query(User).filter(User.email == "admin@example.com").one()
+    unclaimed = {"Authorization": f"Bearer {create_access_token(data={'sub': str(admin.id)})}"}
+    assert client.get("/overview/", headers=unclaimed).status_code == status.HTTP_200_OK
+
+    client.put(f"/admin/users/{test_user.id}/role", json={"role": "admin"}, headers=admin_headers)
+    assert client.get("/overview/", headers=auth_headers).status_code == status.HTTP_200_OK
+    client.put(f"/admin/users/{test_user.id}/role", json={"role": "user"}, headers=admin_headers)
+    assert client.get("/overview/", headers=auth_headers).status_code == status.HTTP_503_SERVICE_UNAVAILABLE
@@ -0,0 +1,39 @@
+"""
+Tests for the request logging middleware
+"""
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.logging_config import app_logger
+from app.middlewares import LoggingMiddleware
+
+
+def test_logging_middleware_streams_and_logs(monkeypatch):
+    """Test streamed bodies pass through with X-Process-Time and both log lines are written"""
+    app = FastAPI()
+    app.add_middleware(LoggingMiddleware)
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((f"chunk {i}\n" for i in range(3)), media_type="text/plain")
+
+    @app.get("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    records = []
+    monkeypatch.setattr(app_logger, "info", lambda msg, **kw: records.append((msg, kw.get("extra"))))
+    monkeypatch.setattr(app_logger, "error", lambda msg, **kw: records.append((msg, kw.get("extra"))))
+    client = TestClient(app, raise_server_exceptions=False)
+
+    response = client.get("/stream")
+    assert response.text == "chunk 0\nchunk 1\nchunk 2\n"
+    assert float(response.headers["X-Process-Time"]) >= 0
+    assert [msg for msg, _ in records] == ["Request: GET /stream", "Response: GET /stream - 200"]
+    assert records[0][1]["client"] == "testclient"
+    assert records[1][1]["status_code"] == 200 and "duration_ms" in records[1][1]
+
+    records.clear()
+    assert client.get("/boom").status_code == 500
+    assert records[-1][0] == "Error: GET /boom - boom"
@@ -0,0 +1,174 @@
+"""
+Tests for Google OAuth login against a local fake OpenID provider
+"""
+import asyncio
+import base64
+import time
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import FastAPI, Form, status
+from jose import JWTError, jwt
+
+from app.core.config import settings
+from app.models.user import User
+from app.settings import oauth_google
+from app.settings.oauth_google import GoogleOAuthClient
+
+ISSUER = "https://accounts.test"
+
+
+def _b64(number: int) -> str:
+    data = number.to_bytes((number.bit_length() + 7) // 8, "big")
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+class FakeOpenIDProvider:
+    """Discovery, JWKS and token endpoints issuing RS256 id_tokens for scripted codes"""
+
+    def __init__(self, client_id="client-1"):
+        self.client_id = client_id
+        self.requests = []
+        self.users = {}
+        self.unverified = set()
+        self.kid = "key-1"
+        self._rotate()
+        self.app = FastAPI()
+        self.app.get("/.well-known/openid-configuration")(self.discovery)
+        self.app.get("/certs")(self.certs)
+        self.app.post("/token")(self.token)
+
+    def _rotate(self):
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.pem = self.private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+
+    def rotate_key(self, kid):
+        self.kid = kid
+        self._rotate()
+
+    async def discovery(self):
+        self.requests.append("discovery")
+        return {
+            "issuer": ISSUER,
+            "authorization_endpoint": "http://oauth.test/authorize",
+            "token_endpoint": "http://oauth.test/token",
+            "jwks_uri": "http://oauth.test/certs",
+            "userinfo_endpoint": "http://oauth.test/userinfo",
+        }
+
+    async def certs(self):
+        self.requests.append("certs")
+        numbers = self.private_key.public_key().public_numbers()
+        return {"keys": [{"kty": "RSA", "alg": "RS256", "use": "sig", "kid": self.kid, "n": _b64(numbers.n), "e": _b64(numbers.e)}]}
+
+    async def token(self, code: str = Form(...)):
+        self.requests.append("token")
+        await asyncio.sleep(0.01)
+        sub, email = self.users[code]
+        now = int(time.time())
+        claims = {"iss": ISSUER, "aud": self.client_id, "sub": sub, "email": email, "name": email.split("@")[0],
+                  "email_verified": email not in self.unverified, "iat": now, "exp": now + 300}
+        id_token = jwt.encode(claims, self.pem.decode(), algorithm="RS256", headers={"kid": self.kid})
+        return {"access_token": f"at-{code}", "token_type": "Bearer", "id_token": id_token}
+
+    def client(self, **kwargs) -> GoogleOAuthClient:
+        http = httpx.AsyncClient(transport=httpx.ASGITransport(app=self.app), base_url="http://oauth.test")
+        return GoogleOAuthClient(self.client_id, "secret", "http://api.test/auth/google/callback",
+                                 discovery_url="http://oauth.test/.well-known/openid-configuration", client=http, **kwargs)
+
+
+def test_concurrent_logins_share_cached_metadata_and_keys():
+    """Test many logins at once fetch discovery and keys once and verify every id_token"""
+    provider = FakeOpenIDProvider()
+    provider.users = {f"code-{i}": (f"sub-{i}", f"user{i}@example.com") for i in range(20)}
+
+    async def scenario():
+        oauth = provider.client()
+        try:
+            results = await asyncio.gather(*(oauth.user_info(f"code-{i}") for i in range(20)))
+            # Keys rotate: an unknown kid triggers one JWKS refresh
+            provider.rotate_key("key-2")
+            rotated = await oauth.user_info("code-0")
+        finally:
+            await oauth.aclose()
+        return results, rotated
+
+    results, rotated = asyncio.run(scenario())
+    assert [r["id"] for r in results] == [f"sub-{i}" for i in range(20)]
+    assert results[3] == {"id": "sub-3", "email": "user3@example.com", "name": "user3", "picture": None}
+    assert rotated["id"] == "sub-0"
+    assert provider.requests.count("discovery") == 1
+    assert provider.requests.count("certs") == 2
+    assert provider.requests.count("token") == 21
+
+
+def test_id_token_for_another_client_is_rejected():
+    """Test an id_token whose audience is a different client fails verification"""
+    provider = FakeOpenIDProvider(client_id="client-1")
+    provider.users = {"code": ("sub", "user@example.com")}
+
+    async def scenario():
+        oauth = provider.client()
+        oauth.client_id = "someone-else"
+        try:
+            await oauth.user_info("code")
+        finally:
+            await oauth.aclose()
+
+    with pytest.raises(JWTError):
+        asyncio.run(scenario())
+
+
+def test_google_callback_logs_in_with_fake_provider(client, db, monkeypatch):
+    """Test the callback route creates the user and redirects with a token"""
+    provider = FakeOpenIDProvider()
+    provider.users = {"abc": ("google-42", "oauth@example.com")}
+    monkeypatch.setattr(settings, "GOOGLE_CLIENT_ID", "client-1")
+    monkeypatch.setattr(settings, "GOOGLE_CLIENT_SECRET", "secret")
+    monkeypatch.setattr(oauth_google, "_oauth", provider.client())
+
+    response = client.get("/auth/google/callback?code=abc", follow_redirects=False)
+    assert response.status_code == status.HTTP_302_FOUND
+    assert "?token=" in response.headers["location"]
+    assert db.query(User).filter(User.google_id == "google-42").one().email == "oauth@example.com"
+
+    response = client.get("/auth/google/callback?code=unknown", follow_redirects=False)
+    assert response.headers["location"].endswith("/login?error=oauth_failed")
+
+
+def test_google_login_redirects_to_discovered_authorization_endpoint(client, monkeypatch):
+    """Test the login URL comes from the discovery document, not a hardcoded host"""
+    provider = FakeOpenIDProvider()
+    monkeypatch.setattr(settings, "GOOGLE_CLIENT_ID", "client-1")
+    monkeypatch.setattr(settings, "GOOGLE_CLIENT_SECRET", "secret")
+    monkeypatch.setattr(settings, "GOOGLE_REDIRECT_URI", "http://api.test/auth/google/callback")
+    monkeypatch.setattr(oauth_google, "_oauth", provider.client())
+
+    response = client.get("/auth/google", follow_redirects=False)
+    assert response.status_code == status.HTTP_307_TEMPORARY_REDIRECT
+    assert response.headers["location"].startswith("http://oauth.test/authorize?client_id=client-1&")
+    assert provider.requests == ["discovery"]
+
+
+def test_google_callback_refuses_unverified_email(client, db, monkeypatch):
+    """Test an unverified email neither creates nor links an account"""
+    existing = User(email="victim@example.com", name="Victim", password_hash="x")
+    db.add(existing)
+    db.commit()
+    provider = FakeOpenIDProvider()
+    provider.users = {"new": ("google-1", "new@example.com"), "takeover": ("google-2", "victim@example.com")}
+    provider.unverified = {"new@example.com", "victim@example.com"}
+    monkeypatch.setattr(settings, "GOOGLE_CLIENT_ID", "client-1")
+    monkeypatch.setattr(settings, "GOOGLE_CLIENT_SECRET", "secret")
+    monkeypatch.setattr(oauth_google, "_oauth", provider.client())
+
+    for code in ("new", "takeover"):
+        response = client.get(f"/auth/google/callback?code={code}", follow_redirects=False)
+        assert response.headers["location"].endswith("/login?error=email_not_verified")
+    assert db.query(User).filter(User.email == "new@example.com").count() == 0
+    db.refresh(existing)
+    assert existing.google_id is None
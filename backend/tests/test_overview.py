@@ -0,0 +1,129 @@
+import pytest
+from fastapi import status
+from datetime import date, timedelta
+from app.models.savings import Savings
+from app.schemas.savings import SavingsCreateRequest
+from app.services.savings_service import create_savings
+from app.models.savings_rollup import SavingsMonthlyRollup
+from app.db.backfill_monthly_rollup import backfill_monthly_rollup
+
+
+def _add_savings(db, user_id, day, type_, amount):
+    db.add(Savings(user_id=user_id, date=day, type=type_, category="Test", amount=amount))
+
+
+def test_overview_totals(client, auth_headers, db, test_user):
+    """Test overview balance, monthly and daily buckets"""
+    today = date.today()
+    _add_savings(db, test_user.id, today, "IN", 1000.0)
+    _add_savings(db, test_user.id, today, "OUT", 250.0)
+    _add_savings(db, test_user.id, today - timedelta(days=2), "IN", 100.0)
+    _add_savings(db, test_user.id, date(today.year - 2, 1, 1), "IN", 5000.0)
+    db.commit()
+
+    response = client.get("/overview", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+
+    assert data["total_balance"] == 5850.0
+    assert len(data["monthly_summaries"]) == 6
+    assert len(data["daily_trend"]) == 7
+
+    current_month = data["monthly_summaries"][-1]
+    assert current_month["month"] == today.month
+    assert current_month["year"] == today.year
+    assert data["total_expense_month"] == 250.0
+
+    last_day = data["daily_trend"][-1]
+    assert last_day["date"] == today.isoformat()
+    assert last_day["income"] == 1000.0
+    assert last_day["expense"] == 250.0
+    assert last_day["net"] == 750.0
+    assert data["daily_trend"][-3]["income"] == 100.0
+
+    # Old transactions count toward balance only
+    assert sum(m["income"] for m in data["monthly_summaries"]) == 1100.0
+
+
+def test_overview_query_count_is_constant(client, auth_headers, db, test_user, query_counter):
+    """Test overview runs a fixed number of queries regardless of history size"""
+    def count_overview_queries():
+        query_counter.clear()
+        response = client.get("/overview/", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        return len(query_counter)
+
+    today = date.today()
+    create_savings(db, test_user.id, SavingsCreateRequest(date=today, type="IN", amount=10.0))
+    baseline = count_overview_queries()
+
+    for i in range(200):
+        create_savings(db, test_user.id, SavingsCreateRequest(
+            date=today - timedelta(days=i), type="IN" if i % 2 else "OUT", amount=10.0
+        ))
+
+    assert count_overview_queries() == baseline
+    # user lookup + balance ledger + monthly rollup + daily buckets + loans total + targets total
+    assert baseline <= 6
+
+
+def _rollup(db, user_id, day):
+    db.expire_all()
+    return db.get(SavingsMonthlyRollup, (user_id, day.year, day.month))
+
+
+def test_monthly_rollup_moves_between_buckets(client, auth_headers, db, test_user):
+    """Test editing date or type moves the amount between rollup buckets"""
+    this_month = date.today().replace(day=1)
+    last_month = (this_month - timedelta(days=1)).replace(day=1)
+
+    created = client.post(
+        "/savings",
+        json={"date": str(this_month), "type": "IN", "amount": 400.0},
+        headers=auth_headers
+    ).json()
+    assert _rollup(db, test_user.id, this_month).income == 400.0
+    assert _rollup(db, test_user.id, this_month).tx_count == 1
+
+    client.put(
+        f"/savings/{created['id']}",
+        json={"date": str(last_month), "type": "OUT"},
+        headers=auth_headers
+    )
+    assert _rollup(db, test_user.id, this_month).income == 0.0
+    assert _rollup(db, test_user.id, this_month).tx_count == 0
+    assert _rollup(db, test_user.id, last_month).expense == 400.0
+    assert _rollup(db, test_user.id, last_month).tx_count == 1
+
+    client.delete(f"/savings/{created['id']}", headers=auth_headers)
+    assert _rollup(db, test_user.id, last_month).expense == 0.0
+    assert _rollup(db, test_user.id, last_month).tx_count == 0
+
+
+def test_yearly_overview(client, auth_headers, db, test_user):
+    """Test yearly report reads month buckets from the rollup"""
+    for month, amount in [(1, 100.0), (3, 250.0)]:
+        create_savings(db, test_user.id, SavingsCreateRequest(date=date(2023, month, 15), type="IN", amount=amount))
+    create_savings(db, test_user.id, SavingsCreateRequest(date=date(2023, 3, 1), type="OUT", amount=50.0))
+
+    response = client.get("/overview/yearly?year=2023", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert len(data["months"]) == 12
+    assert data["income"] == 350.0
+    assert data["net"] == 300.0
+    assert data["months"][2]["expense"] == 50.0
+
+
+def test_backfill_monthly_rollup(db, test_user):
+    """Test backfill rebuilds rollups from raw savings rows"""
+    _add_savings(db, test_user.id, date(2022, 5, 1), "IN", 10.0)
+    _add_savings(db, test_user.id, date(2022, 5, 20), "IN", 15.0)
+    _add_savings(db, test_user.id, date(2022, 6, 2), "OUT", 5.0)
+    db.commit()
+
+    assert backfill_monthly_rollup(db, batch_size=1) == 1
+    may = _rollup(db, test_user.id, date(2022, 5, 1))
+    assert may.income == 25.0
+    assert may.tx_count == 2
+    assert _rollup(db, test_user.id, date(2022, 6, 1)).expense == 5.0
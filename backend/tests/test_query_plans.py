@@ -0,0 +1,150 @@
+"""
+Query plan checks for the composite indexes
+
+Seeds a synthetic dataset, records the SELECTs each service query issues and
+asserts that EXPLAIN shows the expected index for them. Runs on SQLite by
+default, and on Postgres when TEST_DATABASE_URL points at one.
+"""
+import re
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event, insert
+
+from app.models.alert import Alert
+from app.models.bank import Bank, BankAccount
+from app.models.loan import Loan
+from app.models.savings import Savings
+from app.models.target import Target
+from app.models.user import User
+from app.models.user_telegram import UserTelegramID
+from app.services.banks_service import get_bank_accounts
+from app.services.loans_service import get_loans_page, get_total_active_loans_amount
+from app.services.overview_service import get_daily_totals
+from app.services.savings_service import get_savings_page
+from app.services.targets_service import get_targets_page
+from app.utils.calculations import calculate_savings_balance
+from tests.conftest import engine
+
+SEED_USERS = 50
+SAVINGS_PER_USER = 200
+
+
+@pytest.fixture
+def seeded(db, test_user):
+    """Insert ~17k rows spread over SEED_USERS users"""
+    first_day = date(2024, 1, 1)
+    db.execute(insert(User), [
+        {"name": f"User {i}", "email": f"user{i}@example.com", "password_hash": "x",
+         "role": "user", "is_active": True, "data_version": 0, "created_at": datetime(2024, 1, 1) + timedelta(hours=i)}
+        for i in range(SEED_USERS - 1)
+    ])
+    user_ids = [row[0] for row in db.query(User.id).all()]
+    bank = Bank(name="Seed Bank", code="seed", country="ID", is_active=True)
+    db.add(bank)
+    db.flush()
+
+    db.execute(insert(Savings), [
+        {"user_id": uid, "date": first_day + timedelta(days=i % 365), "type": "IN" if i % 3 else "OUT",
+         "amount": float(i), "created_at": datetime(2024, 1, 1)}
+        for uid in user_ids for i in range(SAVINGS_PER_USER)
+    ])
+    db.execute(insert(Loan), [
+        {"user_id": uid, "borrower_name": f"B{i}", "principal": 100.0, "start_date": first_day + timedelta(days=i),
+         "status": "active" if i % 2 else "paid", "created_at": datetime(2024, 1, 1)}
+        for uid in user_ids for i in range(20)
+    ])
+    db.execute(insert(Target), [
+        {"user_id": uid, "name": f"T{i}", "target_amount": 100.0, "current_amount": 0.0,
+         "deadline": first_day + timedelta(days=i), "status": "active", "created_at": datetime(2024, 1, 1)}
+        for uid in user_ids for i in range(10)
+    ])
+    db.execute(insert(Alert), [
+        {"user_id": uid, "message": f"M{i}", "is_read": bool(i % 2), "created_at": datetime(2024, 1, 1) + timedelta(hours=i)}
+        for uid in user_ids for i in range(50)
+    ])
+    db.execute(insert(BankAccount), [
+        {"user_id": uid, "bank_id": bank.id, "account_holder_name": "X", "account_number": str(i),
+         "is_active": True, "is_primary": i == 0, "created_at": datetime(2024, 1, 1), "updated_at": datetime(2024, 1, 1)}
+        for uid in user_ids for i in range(3)
+    ])
+    db.execute(insert(UserTelegramID), [
+        {"user_id": uid, "telegram_id": f"tg{uid}", "created_at": datetime(2024, 1, 1)} for uid in user_ids
+    ])
+    db.commit()
+    # Give the planner real statistics
+    db.connection().exec_driver_sql("ANALYZE")
+    return test_user.id
+
+
+@contextmanager
+def capture_selects():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def explain(db, statement, parameters) -> str:
+    conn = db.connection()
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+        return "\n".join(str(row[-1]) for row in rows)
+    # Seed tables are small for Postgres; check the index is usable, not that it is cheapest
+    conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    rows = conn.exec_driver_sql("EXPLAIN " + statement, parameters).all()
+    return "\n".join(row[0] for row in rows)
+
+
+def telegram_lookup(db, telegram_id):
+    # Same lookup as auth_service.telegram_login
+    return db.query(UserTelegramID).filter(UserTelegramID.telegram_id == telegram_id).first()
+
+
+CASES = [
+    ("savings page", lambda db, c, h, uid: get_savings_page(db, uid, "", 20),
+     "savings", "ix_savings_user_id_date"),
+    ("savings balance", lambda db, c, h, uid: calculate_savings_balance(db, uid),
+     "savings", "ix_savings_user_id_date"),
+    ("daily totals", lambda db, c, h, uid: get_daily_totals(db, uid, date(2024, 3, 1), date(2024, 3, 7)),
+     "savings", "ix_savings_user_id_date"),
+    ("loans page", lambda db, c, h, uid: get_loans_page(db, uid, "", 20),
+     "loans", "ix_loans_user_id_start_date"),
+    ("active loans total", lambda db, c, h, uid: get_total_active_loans_amount(db, uid),
+     "loans", "ix_loans_user_id_status"),
+    ("targets page", lambda db, c, h, uid: get_targets_page(db, uid, "", 20),
+     "targets", "ix_targets_user_id_deadline"),
+    ("bank accounts", lambda db, c, h, uid: get_bank_accounts(db, uid),
+     "bank_accounts", "ix_bank_accounts_user_id_is_active_is_primary"),
+    ("unread alerts", lambda db, c, h, uid: c.get("/users/me/alerts?unread_only=true", headers=h),
+     "alerts", "ix_alerts_user_id_is_read_created_at"),
+    ("alerts page", lambda db, c, h, uid: c.get("/users/me/alerts?cursor=", headers=h),
+     "alerts", "ix_alerts_user_id_created_at"),
+    ("telegram login lookup", lambda db, c, h, uid: telegram_lookup(db, f"tg{uid}"),
+     "user_telegram_ids", "ix_user_telegram_ids_telegram_id"),
+]
+
+
+@pytest.mark.parametrize("name,run,table,index", CASES, ids=[case[0] for case in CASES])
+def test_service_query_uses_index(seeded, db, client, auth_headers, name, run, table, index):
+    """Test no query on the table scans it fully and the composite index is used"""
+    with capture_selects() as statements:
+        run(db, client, auth_headers, seeded)
+
+    reads_table = re.compile(rf"FROM {table}\b")
+    plans = [explain(db, sql, params) for sql, params in statements if reads_table.search(sql)]
+    assert plans, f"{name}: no query against {table} was issued"
+
+    # SQLite prints "SCAN t" (no USING INDEX) and Postgres "Seq Scan on t" for full scans
+    full_scan = re.compile(rf"(SCAN {table}\b(?! USING))|(Seq Scan on {table}\b)")
+    for plan in plans:
+        assert not full_scan.search(plan), f"{name}: full scan of {table}\n{plan}"
+    assert any(index in plan for plan in plans), f"{name}: {index} not used\n" + "\n".join(plans)
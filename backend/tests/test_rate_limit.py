@@ -0,0 +1,266 @@
+"""
+Tests for the rate limiter, its backends and middleware
+"""
+import asyncio
+import fcntl
+import os
+
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+
+from app.core.security import create_access_token
+from app.middlewares.rate_limit_middleware import RateLimitMiddleware
+from app.utils.rate_limit import Limit, LoginThrottle, MemoryBackend, RateLimiter, RedisBackend, SharedMemoryBackend
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+async def _hits(backend, key, limit, count):
+    return [(await backend.hit(key, limit))[0] for _ in range(count)]
+
+
+def test_memory_token_bucket_refills_and_evicts():
+    """Test bursts up to the limit, refill over time and LRU eviction beyond max_keys"""
+    clock = Clock()
+    backend = MemoryBackend(max_keys=2, clock=clock)
+    limit = Limit(3, 60)
+
+    async def scenario():
+        assert await _hits(backend, "a", limit, 4) == [True, True, True, False]
+        allowed, retry_after = await backend.hit("a", limit)
+        assert not allowed and 0 < retry_after <= 20
+        clock.now += 20
+        assert await _hits(backend, "a", limit, 2) == [True, False]
+
+        await backend.hit("b", limit)
+        await backend.hit("c", limit)
+        assert len(backend) == 2
+        # "a" was least recently used and starts over with a full bucket
+        assert await _hits(backend, "a", limit, 3) == [True, True, True]
+    asyncio.run(scenario())
+
+
+def test_shared_memory_backend_is_shared_between_instances(tmp_path):
+    """Test two processes' worth of backends on one file see the same buckets"""
+    clock = Clock()
+    path = str(tmp_path / "buckets")
+    first = SharedMemoryBackend(path=path, max_keys=64, clock=clock)
+    second = SharedMemoryBackend(path=path, max_keys=64, clock=clock)
+    limit = Limit(4, 60)
+
+    async def scenario():
+        assert await _hits(first, "ip:1", limit, 2) == [True, True]
+        assert await _hits(second, "ip:1", limit, 3) == [True, True, False]
+        assert await _hits(first, "ip:2", limit, 1) == [True]
+        clock.now += 15
+        assert await _hits(first, "ip:1", limit, 2) == [True, False]
+    try:
+        asyncio.run(scenario())
+    finally:
+        first.close()
+        second.close()
+
+
+def test_shared_memory_backend_is_bounded(tmp_path):
+    """Test the table never grows: a full slot group evicts its least recently used key"""
+    clock = Clock()
+    backend = SharedMemoryBackend(path=str(tmp_path / "buckets"), max_keys=4, clock=clock)
+    limit = Limit(1, 60)
+
+    async def scenario():
+        for i in range(50):
+            clock.now += 1
+            assert (await backend.hit(f"ip:{i}", limit))[0]
+        # Most recent keys are still limited
+        assert not (await backend.hit("ip:49", limit))[0]
+    try:
+        asyncio.run(scenario())
+        assert (tmp_path / "buckets").stat().st_size == 4 * SharedMemoryBackend.SLOT.size
+    finally:
+        backend.close()
+
+
+def test_shared_memory_backend_waits_for_the_file_lock_without_blocking_the_loop(tmp_path):
+    """Test a hit waiting on another process's lock lets other tasks run meanwhile"""
+    path = str(tmp_path / "buckets")
+    backend = SharedMemoryBackend(path=path, max_keys=64)
+    # A separate open file description stands in for another worker
+    other = os.open(path, os.O_RDWR)
+    fcntl.flock(other, fcntl.LOCK_EX)
+
+    async def scenario():
+        hit = asyncio.create_task(backend.hit("ip:1", Limit(1, 60)))
+        ticks = 0
+        for _ in range(20):
+            await asyncio.sleep(0.005)
+            ticks += 1
+        assert not hit.done() and ticks == 20
+        fcntl.flock(other, fcntl.LOCK_UN)
+        assert (await asyncio.wait_for(hit, 5))[0]
+    try:
+        asyncio.run(scenario())
+    finally:
+        os.close(other)
+        backend.close()
+
+
+class FakeRedis:
+    """In-test server speaking enough of the Redis protocol for the limiter"""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = []
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                args = []
+                for _ in range(int(line[1:])):
+                    length = int((await reader.readline())[1:])
+                    args.append((await reader.readexactly(length + 2))[:-2].decode())
+                self.commands.append(args)
+                name = args[0].upper()
+                if name == "INCR":
+                    self.data[args[1]] = int(self.data.get(args[1], 0)) + 1
+                    writer.write(f":{self.data[args[1]]}\r\n".encode())
+                elif name == "DEL":
+                    removed = sum(self.data.pop(key, None) is not None for key in args[1:])
+                    writer.write(f":{removed}\r\n".encode())
+                elif name == "EXPIRE":
+                    writer.write(b":1\r\n")
+                elif name == "GET":
+                    value = self.data.get(args[1])
+                    writer.write(b"$-1\r\n" if value is None else f"${len(str(value))}\r\n{value}\r\n".encode())
+                else:
+                    writer.write(b"-ERR unknown command\r\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+def test_redis_backend_sliding_window():
+    """Test the sliding-window estimate against a RESP stand-in, and failing open without it"""
+    clock = Clock(6000.0)
+    fake = FakeRedis()
+    limit = Limit(3, 60)
+
+    async def scenario():
+        server = await asyncio.start_server(fake.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        backend = RedisBackend(f"redis://127.0.0.1:{port}/0", clock=clock)
+        try:
+            assert await _hits(backend, "ip:1", limit, 4) == [True, True, True, False]
+            # Half into the next window, half of the previous 4 still counts
+            clock.now += 90
+            assert await _hits(backend, "ip:1", limit, 2) == [True, False]
+            assert fake.commands[0] == ["INCR", "rl:ip:1:100"]
+            assert fake.commands[1] == ["EXPIRE", "rl:ip:1:100", "121"]
+        finally:
+            await backend.client.close()
+            server.close()
+            await server.wait_closed()
+
+        down = RedisBackend(f"redis://127.0.0.1:{port}/0", clock=clock)
+        assert await down.hit("ip:1", limit) == (True, 0.0)
+    asyncio.run(scenario())
+
+
+def test_redis_backend_peek_and_reset():
+    """Test peeking does not count a hit and reset forgets both windows"""
+    clock = Clock(6000.0)
+    fake = FakeRedis()
+    limit = Limit(2, 60)
+
+    async def scenario():
+        server = await asyncio.start_server(fake.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        backend = RedisBackend(f"redis://127.0.0.1:{port}/0", clock=clock)
+        try:
+            assert await _hits(backend, "login:1", limit, 2) == [True, True]
+            assert not (await backend.peek("login:1", limit))[0]
+            assert not (await backend.peek("login:1", limit))[0]
+            assert fake.data["rl:login:1:100"] == 2
+            await backend.reset("login:1", limit)
+            assert (await backend.peek("login:1", limit))[0]
+        finally:
+            await backend.client.close()
+            server.close()
+            await server.wait_closed()
+    asyncio.run(scenario())
+
+
+def test_login_throttle_is_shared_between_workers(tmp_path):
+    """Test failures recorded by one worker lock the email out in another, until a success resets it"""
+    clock = Clock()
+    path = str(tmp_path / "buckets")
+    backends = [SharedMemoryBackend(path=path, max_keys=64, clock=clock) for _ in range(2)]
+    first, second = (LoginThrottle(max_per_email=3, max_per_ip=10, window_seconds=300, backend=b) for b in backends)
+
+    async def scenario():
+        for throttle in (first, second, first):
+            assert await throttle.check("A@example.com", "1.2.3.4") is None
+            await throttle.record_failure("a@example.com", "1.2.3.4")
+        retry_after = await second.check("a@example.com", "5.6.7.8")
+        assert retry_after is not None and 0 < retry_after <= 100
+        # Peeking never uses up attempts; the IP alone is still under its limit
+        assert await second.check(None, "1.2.3.4") is None
+        await first.reset("a@example.com")
+        assert await second.check("a@example.com", "1.2.3.4") is None
+    try:
+        asyncio.run(scenario())
+    finally:
+        for backend in backends:
+            backend.close()
+
+
+def _app(limiter):
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+
+    @app.get("/overview")
+    def overview():
+        return {"ok": True}
+
+    @app.post("/auth/login")
+    def login():
+        return {"ok": True}
+
+    return app
+
+
+def test_middleware_route_user_and_ip_limits():
+    """Test route limits, per-user limits for bearer tokens and the per-IP default"""
+    limiter = RateLimiter(
+        backend=MemoryBackend(),
+        ip_limit=Limit(3, 60),
+        user_limit=Limit(5, 60),
+        route_limits={"/auth/login": Limit(2, 60)},
+    )
+    client = TestClient(_app(limiter))
+
+    assert [client.post("/auth/login").status_code for _ in range(3)] == [200, 200, 429]
+
+    # The two allowed login attempts also spent the IP budget
+    assert client.get("/overview").status_code == status.HTTP_200_OK
+    response = client.get("/overview")
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.json() == {"detail": "Rate limit exceeded"}
+    assert int(response.headers["Retry-After"]) >= 1
+
+    # Authenticated users get their own, larger budget regardless of IP
+    for user_id in ("1", "2"):
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': user_id})}"}
+        codes = [client.get("/overview", headers=headers).status_code for _ in range(6)]
+        assert codes == [200] * 5 + [429]
+
+    # An invalid token counts against the IP
+    assert client.get("/overview", headers={"Authorization": "Bearer nope"}).status_code == 429
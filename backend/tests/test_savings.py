@@ -2,6 +2,10 @@ import pytest
 from fastapi import status
 from datetime import date
 from app.models.savings import Savings
+from app.models.user_balance import UserBalance
+from app.db.reconcile_balances import reconcile_balances
+from app.services.ledger_service import apply_savings_delta, ensure_user_ledger, get_monthly_summary
+from tests.conftest import TestingSessionLocal
 
 
 def test_create_savings_income(client, auth_headers):
@@ -142,3 +146,252 @@ def test_delete_savings(client, auth_headers, db, test_user):
     deleted = db.query(Savings).filter(Savings.id == savings.id).first()
     assert deleted is None
 
+
+
+def test_balance_ledger_tracks_writes(client, auth_headers, db, test_user):
+    """Test the balance ledger follows create, update and delete"""
+    income = client.post(
+        "/savings",
+        json={"date": str(date.today()), "type": "IN", "amount": 1000.0},
+        headers=auth_headers
+    ).json()
+    expense = client.post(
+        "/savings",
+        json={"date": str(date.today()), "type": "OUT", "amount": 300.0},
+        headers=auth_headers
+    ).json()
+
+    balance = client.get("/savings/balance", headers=auth_headers).json()
+    assert balance["total_balance"] == 700.0
+
+    # Changing the type moves the amount between income and expense
+    client.put(f"/savings/{expense['id']}", json={"type": "IN", "amount": 200.0}, headers=auth_headers)
+    balance = client.get("/savings/balance", headers=auth_headers).json()
+    assert balance["total_income"] == 1200.0
+    assert balance["total_expense"] == 0.0
+
+    client.delete(f"/savings/{income['id']}", headers=auth_headers)
+    balance = client.get("/savings/balance", headers=auth_headers).json()
+    assert balance["total_balance"] == 200.0
+
+    ledger = db.get(UserBalance, test_user.id)
+    db.refresh(ledger)
+    assert ledger.total_income == 200.0
+
+
+def test_ledger_rows_created_by_concurrent_writer(db, test_user, monkeypatch):
+    """Test ledger and month rows another writer created after our lookup are reused, not re-inserted"""
+    today = date.today()
+    with TestingSessionLocal() as other:
+        ensure_user_ledger(other, test_user.id)
+        apply_savings_delta(other, test_user.id, "IN", 100.0, today, 1)
+        other.commit()
+
+    # This session looked before the other one committed and saw no row
+    get = db.get
+    looked = []
+
+    def stale_get(model, key):
+        if model is UserBalance and not looked:
+            looked.append(key)
+            return None
+        return get(model, key)
+
+    monkeypatch.setattr(db, "get", stale_get)
+    ensure_user_ledger(db, test_user.id)
+    apply_savings_delta(db, test_user.id, "IN", 50.0, today, 1)
+    db.commit()
+
+    assert db.get(UserBalance, test_user.id).total_income == 150.0
+    summary = get_monthly_summary(db, test_user.id, today.year, today.month)
+    assert summary["income"] == 150.0
+
+
+def test_reconcile_balances(client, auth_headers, db, test_user):
+    """Test reconciliation detects and fixes ledger drift"""
+    client.post(
+        "/savings",
+        json={"date": str(date.today()), "type": "IN", "amount": 500.0},
+        headers=auth_headers
+    )
+    assert reconcile_balances(db) == []
+
+    # Simulate a manual edit that bypasses the service layer
+    db.add(Savings(user_id=test_user.id, date=date.today(), type="OUT", amount=100.0))
+    db.commit()
+
+    mismatches = reconcile_balances(db)
+    assert len(mismatches) == 1
+    assert mismatches[0][0] == test_user.id
+
+    reconcile_balances(db, fix=True)
+    assert reconcile_balances(db) == []
+    assert client.get("/savings/balance", headers=auth_headers).json()["total_balance"] == 400.0
+
+    # Moving a row to another month keeps the totals but breaks the rollups
+    moved = db.query(Savings).filter(Savings.type == "OUT").one()
+    moved.date = date(2020, 1, 15)
+    db.commit()
+    mismatches = reconcile_balances(db)
+    assert [(m[0], m[3]) for m in mismatches] == [(test_user.id, False)]
+
+    reconcile_balances(db, fix=True)
+    assert reconcile_balances(db) == []
+    assert get_monthly_summary(db, test_user.id, 2020, 1)["expense"] == 100.0
+    assert get_monthly_summary(db, test_user.id, date.today().year, date.today().month)["expense"] == 0.0
+
+    reconcile_balances(db, rebuild=True)
+    assert reconcile_balances(db) == []
+
+
+def test_list_savings_cursor_pagination(client, auth_headers, db, test_user):
+    """Test cursor pages walk every row once, in the same order as offset mode"""
+    for i in range(7):
+        # Several rows share a date so the id tie-breaker matters
+        db.add(Savings(user_id=test_user.id, date=date(2024, 1, 1 + i // 3), type="IN", amount=float(i + 1)))
+    db.commit()
+
+    expected = [s["id"] for s in client.get("/savings/?limit=100", headers=auth_headers).json()]
+
+    seen, cursor = [], ""
+    while True:
+        page = client.get("/savings/", params={"cursor": cursor, "limit": 3}, headers=auth_headers).json()
+        seen.extend(s["id"] for s in page["items"])
+        if page["next_cursor"] is None:
+            break
+        cursor = page["next_cursor"]
+
+    assert seen == expected
+    assert len(seen) == 7
+
+
+def test_list_savings_invalid_cursor(client, auth_headers):
+    """Test a malformed cursor is rejected"""
+    response = client.get("/savings/", params={"cursor": "not-a-cursor"}, headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_bulk_import_csv(client, auth_headers, db, test_user):
+    """Test CSV import inserts valid rows, reports bad ones and updates the ledger"""
+    csv_body = (
+        "date,type,category,amount,note\n"
+        "2024-01-05,IN,Salary,1000,\n"
+        "2024-01-06,OUT,,200,Groceries\n"
+        "2024-02-01,XX,,50,\n"
+        "not-a-date,IN,,10,\n"
+        "2024-02-03,OUT,Rent,-5,\n"
+        "2024-02-10,IN,,300,\n"
+    )
+    response = client.post(
+        "/savings/bulk",
+        files={"file": ("export.csv", csv_body, "text/csv")},
+        headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["imported"] == 3
+    assert data["failed"] == 3
+    assert [e["line"] for e in data["errors"]] == [4, 5, 6]
+
+    assert db.query(Savings).filter(Savings.user_id == test_user.id).count() == 3
+    balance = client.get("/savings/balance", headers=auth_headers).json()
+    assert balance["total_income"] == 1300.0
+    assert balance["total_expense"] == 200.0
+    yearly = client.get("/overview/yearly?year=2024", headers=auth_headers).json()
+    assert yearly["months"][0]["expense"] == 200.0
+    assert yearly["months"][1]["income"] == 300.0
+
+
+def test_bulk_import_ndjson_in_batches(db, test_user):
+    """Test NDJSON import across several batches keeps ledger and rows in step"""
+    import io
+    import json
+    from app.services.savings_import_service import import_savings, iter_ndjson_records
+
+    lines = [json.dumps({"date": f"2024-{1 + i % 12:02d}-01", "type": "IN", "amount": 1.0}) for i in range(250)]
+    lines.insert(10, "{broken")
+    stream = io.BytesIO("\n".join(lines).encode("utf-8"))
+
+    result = import_savings(db, test_user.id, iter_ndjson_records(stream), batch_size=100)
+
+    assert result["imported"] == 250
+    assert [e["line"] for e in result["errors"]] == [11]
+    assert result["errors"][0]["errors"][0].startswith("Invalid JSON")
+    assert db.get(UserBalance, test_user.id).total_income == 250.0
+    assert reconcile_balances(db) == []
+
+
+def test_bulk_import_stores_blank_text_as_null(db, test_user):
+    """Test empty category and note are NULL whichever insert path is used"""
+    import io
+    import json
+    from app.services.savings_import_service import import_savings, iter_ndjson_records
+
+    stream = io.BytesIO(json.dumps({"date": "2024-01-01", "type": "IN", "amount": 5, "category": "", "note": ""}).encode())
+    assert import_savings(db, test_user.id, iter_ndjson_records(stream))["imported"] == 1
+    row = db.query(Savings).filter(Savings.user_id == test_user.id).one()
+    assert row.category is None and row.note is None
+
+
+def test_bulk_import_limits(db, test_user):
+    """Test oversized files and files with too many rows are refused without importing anything"""
+    import io
+    from fastapi import HTTPException
+    from app.services.savings_import_service import check_import_size, import_savings, iter_csv_records
+
+    body = ("date,type,amount\n" + "".join(f"2024-01-{1 + i:02d},IN,1\n" for i in range(5))).encode()
+    with pytest.raises(HTTPException) as exc:
+        import_savings(db, test_user.id, iter_csv_records(io.BytesIO(body)), max_rows=4)
+    assert "Too many rows" in exc.value.detail
+    assert db.query(Savings).filter(Savings.user_id == test_user.id).count() == 0
+
+    stream = io.BytesIO(body)
+    check_import_size(stream, max_bytes=len(body))
+    assert stream.tell() == 0
+    with pytest.raises(HTTPException) as exc:
+        check_import_size(stream, max_bytes=len(body) - 1)
+    assert exc.value.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_export_savings_csv_with_date_range(client, auth_headers, db, test_user):
+    """Test CSV export streams a header and the rows inside the date range, oldest first"""
+    for day, type_, amount in [(date(2024, 3, 1), "OUT", 50.0), (date(2024, 1, 1), "IN", 1000.0),
+                               (date(2024, 2, 1), "IN", 200.0)]:
+        db.add(Savings(user_id=test_user.id, date=day, type=type_, amount=amount, note="a, b"))
+    db.commit()
+
+    response = client.get("/savings/export?start_date=2024-02-01&end_date=2024-03-31", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="savings_2024-02-01_2024-03-31.csv"' in response.headers["content-disposition"]
+    lines = response.text.splitlines()
+    assert lines[0] == "id,date,type,category,amount,note"
+    assert [line.split(",")[1] for line in lines[1:]] == ["2024-02-01", "2024-03-01"]
+    assert lines[1].endswith('200.0,"a, b"')
+
+    inverted = client.get("/savings/export?start_date=2024-03-01&end_date=2024-02-01", headers=auth_headers)
+    assert inverted.status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get("/savings/export?format=xml", headers=auth_headers).status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_export_savings_ndjson_gzip(client, auth_headers, db, test_user):
+    """Test gzip NDJSON export decodes to one JSON object per transaction"""
+    import gzip
+    import json
+
+    for i in range(3000):
+        db.add(Savings(user_id=test_user.id, date=date(2024, 1, 1 + i % 28), type="IN", amount=float(i)))
+    db.commit()
+
+    response = client.get("/savings/export?format=ndjson&gzip=true", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"] == "application/x-ndjson"
+    # The test client decodes Content-Encoding itself; decode again only if it did not
+    body = response.content
+    if body[:2] == b"\x1f\x8b":
+        body = gzip.decompress(body)
+    rows = [json.loads(line) for line in body.decode("utf-8").splitlines()]
+    assert len(rows) == 3000
+    assert rows[0]["date"] == "2024-01-01"
+    assert sum(row["amount"] for row in rows) == sum(float(i) for i in range(3000))
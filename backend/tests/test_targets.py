@@ -120,3 +120,23 @@ def test_delete_target(client, auth_headers, db, test_user):
     deleted = db.query(Target).filter(Target.id == target.id).first()
     assert deleted is None
 
+
+
+def test_list_targets_cursor_pagination(client, auth_headers, db, test_user):
+    """Test cursor pages order by deadline with undated targets last"""
+    for i, deadline in enumerate([None, date(2030, 1, 1), date(2025, 1, 1), None]):
+        db.add(Target(
+            user_id=test_user.id, name=f"Target {i}", target_amount=100.0,
+            current_amount=0.0, deadline=deadline, status="active"
+        ))
+    db.commit()
+
+    names, cursor = [], ""
+    while True:
+        page = client.get("/targets/", params={"cursor": cursor, "limit": 1}, headers=auth_headers).json()
+        names.extend(t["name"] for t in page["items"])
+        if page["next_cursor"] is None:
+            break
+        cursor = page["next_cursor"]
+
+    assert names == ["Target 2", "Target 1", "Target 0", "Target 3"]
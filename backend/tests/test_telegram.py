@@ -0,0 +1,132 @@
+"""
+Tests for the Telegram delivery engine against a local fake Bot API
+"""
+import asyncio
+from time import monotonic
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.services.telegram_service import SharedTokenBucket, TelegramDeliveryEngine, TokenBucket
+from app.utils.rate_limit import SharedMemoryBackend
+
+
+class FakeTelegramAPI:
+    """Minimal sendMessage endpoint that records calls and scripts failures per chat"""
+
+    def __init__(self, flood_chats=(), unknown_chats=(), retry_after=1):
+        self.calls = []
+        self.flood_chats = set(flood_chats)
+        self.unknown_chats = set(unknown_chats)
+        self.retry_after = retry_after
+        self.app = FastAPI()
+        self.app.post("/bot{token}/sendMessage")(self.send_message)
+
+    async def send_message(self, token: str, request: Request):
+        chat_id = (await request.json())["chat_id"]
+        self.calls.append((chat_id, monotonic()))
+        if chat_id in self.flood_chats:
+            self.flood_chats.discard(chat_id)
+            return JSONResponse(
+                {"ok": False, "error_code": 429, "description": "Too Many Requests",
+                 "parameters": {"retry_after": self.retry_after}},
+                status_code=429
+            )
+        if chat_id in self.unknown_chats:
+            return JSONResponse({"ok": False, "error_code": 400, "description": "Bad Request: chat not found"}, status_code=400)
+        return {"ok": True, "result": {"chat": {"id": chat_id}}}
+
+    def engine(self, **kwargs) -> TelegramDeliveryEngine:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=self.app), base_url="http://telegram.test")
+        return TelegramDeliveryEngine("TEST_TOKEN", client=client, **kwargs)
+
+
+def _deliver(engine, chat_ids, text="hello"):
+    async def scenario():
+        try:
+            return await engine.deliver(chat_ids, text)
+        finally:
+            await engine.aclose()
+    return asyncio.run(scenario())
+
+
+def test_broadcast_collects_per_recipient_results():
+    """Test every recipient gets a result in input order, failures are not retried"""
+    api = FakeTelegramAPI(unknown_chats={"3"})
+    results = _deliver(api.engine(concurrency=4, global_rate=1000), [str(i) for i in range(10)])
+    assert [r.chat_id for r in results] == [str(i) for i in range(10)]
+    assert [r.ok for r in results] == [i != 3 for i in range(10)]
+    assert results[3].error == "Bad Request: chat not found"
+    assert results[3].attempts == 1
+    assert len(api.calls) == 10
+
+
+def test_retry_after_pauses_all_sends():
+    """Test a 429 is retried after retry_after and holds back the other workers too"""
+    api = FakeTelegramAPI(flood_chats={"0"}, retry_after=1)
+    results = _deliver(api.engine(concurrency=2, global_rate=1000), ["0", "1", "2", "3"])
+    assert all(r.ok for r in results)
+    assert results[0].attempts == 2
+    flood_at = api.calls[0][1]
+    later = [at for chat_id, at in api.calls[1:] if at > flood_at + 0.05]
+    # Everything sent after the 429 waited out retry_after
+    assert later and min(later) - flood_at >= 0.95
+
+
+def test_global_and_per_chat_rate_limits():
+    """Test sends are spread out by the global and per-chat token buckets"""
+    api = FakeTelegramAPI()
+    started = monotonic()
+    _deliver(api.engine(concurrency=8, global_rate=20), [str(i) for i in range(30)])
+    # 20 tokens of burst, then 10 more at 20/s
+    assert monotonic() - started >= 0.45
+
+    api = FakeTelegramAPI()
+    _deliver(api.engine(concurrency=4, global_rate=1000, per_chat_rate=5), ["42", "42", "42"])
+    times = [at for _, at in api.calls]
+    assert times[2] - times[0] >= 0.35
+
+
+def test_token_bucket_serves_waiters_in_order():
+    """Test waiting callers acquire one after another at the bucket rate"""
+    async def scenario():
+        bucket = TokenBucket(rate=50, capacity=1)
+        order = []
+
+        async def take(i):
+            await bucket.acquire()
+            order.append(i)
+
+        started = monotonic()
+        await asyncio.gather(*(take(i) for i in range(6)))
+        return order, monotonic() - started
+
+    order, elapsed = asyncio.run(scenario())
+    assert order == list(range(6))
+    assert elapsed >= 0.09
+
+
+def test_global_rate_is_shared_between_processes(tmp_path):
+    """Test two engines drawing from one shared bucket send at the bot's rate, not twice it"""
+    api = FakeTelegramAPI()
+    path = str(tmp_path / "telegram-rate")
+
+    async def scenario():
+        engines = [
+            api.engine(concurrency=8, global_bucket=SharedTokenBucket(SharedMemoryBackend(path, max_keys=16), "telegram:global", 10))
+            for _ in range(2)
+        ]
+        try:
+            await asyncio.gather(*(
+                engine.deliver([f"{n}-{i}" for i in range(10)], "hello") for n, engine in enumerate(engines)
+            ))
+        finally:
+            for engine in engines:
+                await engine.aclose()
+
+    asyncio.run(scenario())
+    times = sorted(sent_at for _, sent_at in api.calls)
+    assert len(times) == 20
+    # A burst of 10, then the other 10 at 10 per second
+    assert times[-1] - times[0] >= 0.8
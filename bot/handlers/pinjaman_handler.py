@@ -2,7 +2,9 @@ from datetime import date
 from telegram import Update
 from telegram.ext import ContextTypes
 from utils.state_manager import state_manager
-from utils.keyboards import get_pinjaman_menu_keyboard, get_main_menu_keyboard, get_cancel_keyboard
+from utils.keyboards import (
+    get_pinjaman_menu_keyboard, get_pinjaman_list_keyboard, get_main_menu_keyboard, get_cancel_keyboard
+)
 from utils.formatter import format_loan
 from services.api_client import APIClient
 
@@ -42,9 +44,16 @@ async def pinjaman_list_callback(update: Update, context: ContextTypes.DEFAULT_T
             await update.message.reply_text(error_msg)
         return
 
+    # "Next Page" continues from the cursor saved by the previous page
+    cursor = ""
+    if query and query.data == "pinjaman_list_next":
+        cursor = state_manager.get_data(user_id, "loans_cursor", "")
+
     api_client = APIClient(token=token)
     try:
-        loans = await api_client.list_loans(limit=10)
+        page = await api_client.list_loans_page(cursor=cursor, limit=5)
+        loans = page["items"]
+        state_manager.set_data(user_id, "loans_cursor", page["next_cursor"] or "")
         if not loans:
             msg = "No loans found."
             if query:
@@ -54,24 +63,25 @@ async def pinjaman_list_callback(update: Update, context: ContextTypes.DEFAULT_T
                 await update.message.reply_text(msg, reply_markup=get_pinjaman_menu_keyboard())
             return
 
-        text = "📋 Loans:\n\n"
-        for loan in loans[:5]:
+        text = "📋 Loans:\n\n" if not cursor else "📋 More Loans:\n\n"
+        for loan in loans:
             text += f"{format_loan(loan)}\n\n"
+        list_keyboard = get_pinjaman_list_keyboard(has_next=page["next_cursor"] is not None)
 
         if query:
             try:
                 await query.answer()
-                await query.edit_message_text(text, reply_markup=get_pinjaman_menu_keyboard())
+                await query.edit_message_text(text, reply_markup=list_keyboard)
             except Exception as edit_error:
                 if "not modified" in str(edit_error).lower():
                     await query.answer()
                 else:
                     try:
-                        await query.message.reply_text(text, reply_markup=get_pinjaman_menu_keyboard())
+                        await query.message.reply_text(text, reply_markup=list_keyboard)
                     except:
                         pass
         elif update.message:
-            await update.message.reply_text(text, reply_markup=get_pinjaman_menu_keyboard())
+            await update.message.reply_text(text, reply_markup=list_keyboard)
     except Exception as e:
         error_msg = f"❌ Error: {str(e)}"
         if query:
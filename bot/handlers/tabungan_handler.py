@@ -2,7 +2,9 @@ from datetime import date
 from telegram import Update
 from telegram.ext import ContextTypes
 from utils.state_manager import state_manager
-from utils.keyboards import get_tabungan_menu_keyboard, get_main_menu_keyboard, get_cancel_keyboard
+from utils.keyboards import (
+    get_tabungan_menu_keyboard, get_tabungan_list_keyboard, get_main_menu_keyboard, get_cancel_keyboard
+)
 from utils.formatter import format_savings, format_rupiah
 from services.api_client import APIClient
 
@@ -44,9 +46,16 @@ async def tabungan_list_callback(update: Update, context: ContextTypes.DEFAULT_T
             await update.message.reply_text(error_msg)
         return
 
+    # "Next Page" continues from the cursor saved by the previous page
+    cursor = ""
+    if query and query.data == "tabungan_list_next":
+        cursor = state_manager.get_data(user_id, "savings_cursor", "")
+
     api_client = APIClient(token=token)
     try:
-        savings = await api_client.list_savings(limit=10)
+        page = await api_client.list_savings_page(cursor=cursor, limit=5)
+        savings = page["items"]
+        state_manager.set_data(user_id, "savings_cursor", page["next_cursor"] or "")
         if not savings:
             msg = "No savings transactions found."
             if query:
@@ -56,24 +65,25 @@ async def tabungan_list_callback(update: Update, context: ContextTypes.DEFAULT_T
                 await update.message.reply_text(msg, reply_markup=get_tabungan_menu_keyboard())
             return
 
-        text = "📋 Recent Savings:\n\n"
-        for s in savings[:5]:
+        text = "📋 Recent Savings:\n\n" if not cursor else "📋 More Savings:\n\n"
+        for s in savings:
             text += f"{format_savings(s)}\n\n"
+        list_keyboard = get_tabungan_list_keyboard(has_next=page["next_cursor"] is not None)
 
         if query:
             try:
                 await query.answer()
-                await query.edit_message_text(text, reply_markup=get_tabungan_menu_keyboard())
+                await query.edit_message_text(text, reply_markup=list_keyboard)
             except Exception as edit_error:
                 if "not modified" in str(edit_error).lower():
                     await query.answer()
                 else:
                     try:
-                        await query.message.reply_text(text, reply_markup=get_tabungan_menu_keyboard())
+                        await query.message.reply_text(text, reply_markup=list_keyboard)
                     except:
                         pass
         elif update.message:
-            await update.message.reply_text(text, reply_markup=get_tabungan_menu_keyboard())
+            await update.message.reply_text(text, reply_markup=list_keyboard)
     except Exception as e:
         error_msg = f"❌ Error: {str(e)}"
         if query:
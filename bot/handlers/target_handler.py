@@ -1,7 +1,9 @@
 from telegram import Update
 from telegram.ext import ContextTypes
 from utils.state_manager import state_manager
-from utils.keyboards import get_target_menu_keyboard, get_main_menu_keyboard, get_cancel_keyboard
+from utils.keyboards import (
+    get_target_menu_keyboard, get_target_list_keyboard, get_main_menu_keyboard, get_cancel_keyboard
+)
 from utils.formatter import format_target
 from services.api_client import APIClient
 
@@ -41,9 +43,16 @@ async def target_list_callback(update: Update, context: ContextTypes.DEFAULT_TYP
             await update.message.reply_text(error_msg)
         return
 
+    # "Next Page" continues from the cursor saved by the previous page
+    cursor = ""
+    if query and query.data == "target_list_next":
+        cursor = state_manager.get_data(user_id, "targets_cursor", "")
+
     api_client = APIClient(token=token)
     try:
-        targets = await api_client.list_targets(limit=10)
+        page = await api_client.list_targets_page(cursor=cursor, limit=5)
+        targets = page["items"]
+        state_manager.set_data(user_id, "targets_cursor", page["next_cursor"] or "")
         if not targets:
             msg = "No targets found."
             if query:
@@ -53,24 +62,25 @@ async def target_list_callback(update: Update, context: ContextTypes.DEFAULT_TYP
                 await update.message.reply_text(msg, reply_markup=get_target_menu_keyboard())
             return
 
-        text = "📋 Targets:\n\n"
-        for target in targets[:5]:
+        text = "📋 Targets:\n\n" if not cursor else "📋 More Targets:\n\n"
+        for target in targets:
             text += f"{format_target(target)}\n\n"
+        list_keyboard = get_target_list_keyboard(has_next=page["next_cursor"] is not None)
 
         if query:
             try:
                 await query.answer()
-                await query.edit_message_text(text, reply_markup=get_target_menu_keyboard())
+                await query.edit_message_text(text, reply_markup=list_keyboard)
             except Exception as edit_error:
                 if "not modified" in str(edit_error).lower():
                     await query.answer()
                 else:
                     try:
-                        await query.message.reply_text(text, reply_markup=get_target_menu_keyboard())
+                        await query.message.reply_text(text, reply_markup=list_keyboard)
                     except:
                         pass
         elif update.message:
-            await update.message.reply_text(text, reply_markup=get_target_menu_keyboard())
+            await update.message.reply_text(text, reply_markup=list_keyboard)
     except Exception as e:
         error_msg = f"❌ Error: {str(e)}"
         if query:
@@ -168,19 +168,19 @@ def main():
 
     # Tabungan handlers
     application.add_handler(CallbackQueryHandler(tabungan_menu_callback, pattern="^menu_tabungan$"))
-    application.add_handler(CallbackQueryHandler(tabungan_list_callback, pattern="^tabungan_list$"))
+    application.add_handler(CallbackQueryHandler(tabungan_list_callback, pattern="^tabungan_list(_next)?$"))
     application.add_handler(CallbackQueryHandler(tabungan_add_income_callback, pattern="^tabungan_add_income$"))
     application.add_handler(CallbackQueryHandler(tabungan_add_expense_callback, pattern="^tabungan_add_expense$"))
 
     # Pinjaman handlers
     application.add_handler(CallbackQueryHandler(pinjaman_menu_callback, pattern="^menu_pinjaman$"))
-    application.add_handler(CallbackQueryHandler(pinjaman_list_callback, pattern="^pinjaman_list$"))
+    application.add_handler(CallbackQueryHandler(pinjaman_list_callback, pattern="^pinjaman_list(_next)?$"))
     application.add_handler(CallbackQueryHandler(pinjaman_add_callback, pattern="^pinjaman_add$"))
     application.add_handler(CallbackQueryHandler(pinjaman_add_payment_callback, pattern="^pinjaman_add_payment$"))
 
     # Target handlers
     application.add_handler(CallbackQueryHandler(target_menu_callback, pattern="^menu_target$"))
-    application.add_handler(CallbackQueryHandler(target_list_callback, pattern="^target_list$"))
+    application.add_handler(CallbackQueryHandler(target_list_callback, pattern="^target_list(_next)?$"))
     application.add_handler(CallbackQueryHandler(target_add_callback, pattern="^target_add$"))
     application.add_handler(CallbackQueryHandler(target_update_callback, pattern="^target_update$"))
 
@@ -84,6 +84,17 @@ class APIClient:
             response.raise_for_status()
             return response.json()
 
+    async def list_savings_page(self, cursor: str = "", limit: int = 10) -> Dict[str, Any]:
+        """List one page of savings transactions by cursor; returns {"items": [...], "next_cursor": ...}"""
+        async with httpx.AsyncClient(follow_redirects=True) as client:
+            response = await client.get(
+                f"{self.base_url}/savings/",
+                params={"cursor": cursor, "limit": limit},
+                headers=self._get_headers(),
+            )
+            response.raise_for_status()
+            return response.json()
+
     async def create_savings(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a savings transaction"""
         async with httpx.AsyncClient(follow_redirects=True) as client:
@@ -115,6 +126,17 @@ class APIClient:
             response.raise_for_status()
             return response.json()
 
+    async def list_loans_page(self, cursor: str = "", limit: int = 10) -> Dict[str, Any]:
+        """List one page of loans by cursor; returns {"items": [...], "next_cursor": ...}"""
+        async with httpx.AsyncClient(follow_redirects=True) as client:
+            response = await client.get(
+                f"{self.base_url}/loans/",
+                params={"cursor": cursor, "limit": limit},
+                headers=self._get_headers(),
+            )
+            response.raise_for_status()
+            return response.json()
+
     async def create_loan(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a loan"""
         async with httpx.AsyncClient(follow_redirects=True) as client:
@@ -147,6 +169,17 @@ class APIClient:
             response.raise_for_status()
             return response.json()
 
+    async def list_targets_page(self, cursor: str = "", limit: int = 10) -> Dict[str, Any]:
+        """List one page of targets by cursor; returns {"items": [...], "next_cursor": ...}"""
+        async with httpx.AsyncClient(follow_redirects=True) as client:
+            response = await client.get(
+                f"{self.base_url}/targets/",
+                params={"cursor": cursor, "limit": limit},
+                headers=self._get_headers(),
+            )
+            response.raise_for_status()
+            return response.json()
+
     async def create_target(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a target"""
         async with httpx.AsyncClient(follow_redirects=True) as client:
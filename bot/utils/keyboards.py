@@ -28,6 +28,15 @@ def get_tabungan_menu_keyboard():
     return InlineKeyboardMarkup(keyboard)
 
 
+def get_tabungan_list_keyboard(has_next: bool = False):
+    """Get tabungan list keyboard, with a next page button when more rows exist"""
+    keyboard = []
+    if has_next:
+        keyboard.append([InlineKeyboardButton("▶️ Next Page", callback_data="tabungan_list_next")])
+    keyboard.extend(get_tabungan_menu_keyboard().inline_keyboard)
+    return InlineKeyboardMarkup(keyboard)
+
+
 def get_pinjaman_menu_keyboard():
     """Get pinjaman submenu keyboard"""
     keyboard = [
@@ -39,6 +48,15 @@ def get_pinjaman_menu_keyboard():
     return InlineKeyboardMarkup(keyboard)
 
 
+def get_pinjaman_list_keyboard(has_next: bool = False):
+    """Get pinjaman list keyboard, with a next page button when more rows exist"""
+    keyboard = []
+    if has_next:
+        keyboard.append([InlineKeyboardButton("▶️ Next Page", callback_data="pinjaman_list_next")])
+    keyboard.extend(get_pinjaman_menu_keyboard().inline_keyboard)
+    return InlineKeyboardMarkup(keyboard)
+
+
 def get_target_menu_keyboard():
     """Get target submenu keyboard"""
     keyboard = [
@@ -50,6 +68,15 @@ def get_target_menu_keyboard():
     return InlineKeyboardMarkup(keyboard)
 
 
+def get_target_list_keyboard(has_next: bool = False):
+    """Get target list keyboard, with a next page button when more rows exist"""
+    keyboard = []
+    if has_next:
+        keyboard.append([InlineKeyboardButton("▶️ Next Page", callback_data="target_list_next")])
+    keyboard.extend(get_target_menu_keyboard().inline_keyboard)
+    return InlineKeyboardMarkup(keyboard)
+
+
 def get_bank_menu_keyboard():
     """Get rekening bank submenu keyboard"""
     keyboard = [
@@ -13,6 +13,7 @@ export interface UserDetail {
   email: string;
   telegram_id: string | null;
   avatar_url: string | null;
+  avatar_thumbnails?: Record<string, string>;
   role: string;
   is_active: boolean;
   created_at: string;
@@ -46,6 +47,21 @@ export interface SendAlertToUserRequest {
   title?: string;
 }
 
+export interface AdminJob {
+  id: number;
+  type: string;
+  status: 'queued' | 'running' | 'done' | 'failed';
+  total: number;
+  sent: number;
+  failed: number;
+  pending: number;
+  result: { users_count?: number; alerts_created?: number } | null;
+  error: string | null;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+}
+
 export interface Bank {
   id: number;
   name: string;
@@ -120,16 +136,21 @@ export const adminAPI = {
     return response.data;
   },
 
-  broadcastAlert: async (request: BroadcastAlertRequest): Promise<{ message: string; users_count: number; telegram_sent: number; telegram_failed: number; telegram_total: number; content: string }> => {
+  broadcastAlert: async (request: BroadcastAlertRequest): Promise<{ message: string; job_id: number; status: string; users_count: number; content: string }> => {
     const response = await axiosClient.post('/admin/broadcast', request);
     return response.data;
   },
 
-  sendAlertToUser: async (request: SendAlertToUserRequest): Promise<{ message: string; user_id: number; user_name: string; user_email: string; telegram_sent: number; telegram_failed: number; telegram_total: number }> => {
+  sendAlertToUser: async (request: SendAlertToUserRequest): Promise<{ message: string; user_id: number; user_name: string; user_email: string; alert_id: number; job_id: number; telegram_total: number }> => {
     const response = await axiosClient.post('/admin/send-alert', request);
     return response.data;
   },
 
+  getJob: async (jobId: number): Promise<AdminJob> => {
+    const response = await axiosClient.get(`/admin/jobs/${jobId}`);
+    return response.data;
+  },
+
   listBanks: async (): Promise<{ banks: Bank[] }> => {
     const response = await axiosClient.get('/admin/banks');
     return response.data;
@@ -6,6 +6,7 @@ export interface User {
   email: string;
   telegram_id: string | null;
   avatar_url: string | null;
+  avatar_thumbnails?: Record<string, string>;
   role: string;
   is_active: boolean;
   created_at: string;
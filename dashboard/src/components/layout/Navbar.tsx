@@ -1,6 +1,7 @@
 import React from 'react';
 import { useAuth } from '../../hooks/useAuth';
 import { AlertBell } from '../AlertBell';
+import { avatarSrc } from '../../utils/avatar';
 
 const MenuIcon = ({ className }: { className?: string }) => (
   <svg className={className} fill="none" stroke="currentColor" viewBox="0 0 24 24">
@@ -42,7 +43,7 @@ export const Navbar: React.FC<NavbarProps> = ({ onMenuClick }) => {
               <div className="relative w-8 h-8 md:w-9 md:h-9">
                 {user.avatar_url ? (
                   <img
-                    src={user.avatar_url}
+                    src={avatarSrc(user, 72) ?? undefined}
                     alt={user.name}
                     className="w-full h-full rounded-full object-cover border-2 border-primary-500/30 shadow-lg"
                     onError={(e) => {
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Link, useLocation, useNavigate } from 'react-router-dom';
 import { useAuth } from '../../hooks/useAuth';
+import { avatarSrc } from '../../utils/avatar';
 
 // SVG Icons
 const BarChartIcon = ({ className }: { className?: string }) => (
@@ -570,7 +571,7 @@ export const Sidebar: React.FC<SidebarProps> = ({ isMobileOpen = false, onMobile
         <div className={`flex items-center gap-3 ${isCollapsed ? 'justify-center' : ''}`}>
           {user?.avatar_url ? (
             <img
-              src={user.avatar_url}
+              src={avatarSrc(user, 80) ?? undefined}
               alt={user.name}
               className="w-10 h-10 rounded-full object-cover border-2 border-pink-500/30 flex-shrink-0"
               onError={(e) => {
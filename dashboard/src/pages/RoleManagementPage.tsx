@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { adminAPI, UserDetail } from '../api/adminAPI';
+import { avatarSrc } from '../utils/avatar';
 import { Button } from '../components/ui/Button';
 import { Input } from '../components/ui/Input';
 
@@ -194,7 +195,7 @@ export const RoleManagementPage: React.FC = () => {
                           {user.avatar_url ? (
                             <img
                               className="h-10 w-10 rounded-full object-cover border-2 border-slate-600"
-                              src={user.avatar_url}
+                              src={avatarSrc(user, 80) ?? undefined}
                               alt={user.name}
                               onError={(e) => {
                                 const target = e.target as HTMLImageElement;
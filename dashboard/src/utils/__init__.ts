@@ -1,2 +1,3 @@
 export * from './formatRupiah';
 export * from './date';
+export * from './avatar';
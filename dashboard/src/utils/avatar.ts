@@ -0,0 +1,14 @@
+interface AvatarOwner {
+  avatar_url: string | null;
+  avatar_thumbnails?: Record<string, string>;
+}
+
+// Smallest uploaded thumbnail covering `pixels` (display size x device pixel ratio);
+// external and older avatars only have avatar_url
+export function avatarSrc(user: AvatarOwner, pixels: number): string | null {
+  const sizes = Object.keys(user.avatar_thumbnails ?? {})
+    .map(Number)
+    .sort((a, b) => a - b);
+  const size = sizes.find((s) => s >= pixels) ?? sizes[sizes.length - 1];
+  return size !== undefined ? user.avatar_thumbnails![String(size)] : user.avatar_url;
+}
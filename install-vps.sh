@@ -697,6 +697,28 @@ StandardError=append:/var/log/botaxxx/backend.error.log
 WantedBy=multi-user.target
 EOF
 
+# Job worker service (broadcasts and alerts)
+cat > /etc/systemd/system/botaxxx-worker.service << EOF
+[Unit]
+Description=BOTAXXX Job Worker
+After=network.target postgresql.service botaxxx-backend.service
+
+[Service]
+Type=simple
+User=$APP_USER
+Group=$APP_USER
+WorkingDirectory=$APP_DIR/backend
+Environment="PATH=$APP_DIR/backend/venv/bin"
+ExecStart=$APP_DIR/backend/venv/bin/python -m app.worker
+Restart=always
+RestartSec=10
+StandardOutput=append:/var/log/botaxxx/worker.log
+StandardError=append:/var/log/botaxxx/worker.error.log
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
 # Bot service
 cat > /etc/systemd/system/botaxxx-bot.service << EOF
 [Unit]
@@ -721,11 +743,12 @@ EOF
 
 # Enable and start services
 systemctl daemon-reload
-systemctl enable botaxxx-backend botaxxx-bot || print_warning "Failed to enable services"
+systemctl enable botaxxx-backend botaxxx-worker botaxxx-bot || print_warning "Failed to enable services"
 
 # Start backend first
 print_info "Starting backend service..."
 systemctl start botaxxx-backend || print_error "Failed to start backend"
+systemctl start botaxxx-worker || print_warning "Failed to start job worker"
 
 # Wait for backend to be ready
 print_info "Waiting for backend to be ready..."
@@ -844,6 +867,12 @@ server {
     location / {
         try_files \$uri \$uri/ /index.html;
     }
+
+    # Avatars are content-hashed: a new picture gets a new URL, so cache forever
+    location /avatars/ {
+        alias $APP_DIR/dashboard/public/avatars/;
+        add_header Cache-Control "public, max-age=31536000, immutable";
+    }
     
     # API proxy fallback (if frontend not built)
     location /api {
@@ -908,6 +937,12 @@ server {
     location / {
         try_files \$uri \$uri/ /index.html;
     }
+
+    # Avatars are content-hashed: a new picture gets a new URL, so cache forever
+    location /avatars/ {
+        alias $APP_DIR/dashboard/public/avatars/;
+        add_header Cache-Control "public, max-age=31536000, immutable";
+    }
 }
 EOF
     else
@@ -944,6 +979,12 @@ server {
     location / {
         try_files \$uri \$uri/ /index.html;
     }
+
+    # Avatars are content-hashed: a new picture gets a new URL, so cache forever
+    location /avatars/ {
+        alias $APP_DIR/dashboard/public/avatars/;
+        add_header Cache-Control "public, max-age=31536000, immutable";
+    }
 }
 EOF
     fi